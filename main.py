@@ -2,10 +2,16 @@ import argparse
 import json
 import os
 import sys
+from datetime import date
 
 import config
 from src.banco_de_dados import BancoDeDados
+from src.cache_projecao import CacheProjecao
+from src.cenarios import VarreduraCenarios, carrega_cenarios
 from src.cmbh import CMBH
+from src.exportador_excel import EscritorExcelStreaming, para_excel_formatado
+from src.fluxo_pessoal import FluxoPessoal, PoliticaReposicao
+from src.progressoes_horizontais import progressoes_horizontais
 
 
 def main(
@@ -14,6 +20,9 @@ def main(
     ano_fim,
     diretorio_resultado,
     recalcula_projecao=False,
+    processos=1,
+    diretorio_cache=None,
+    reposicao: PoliticaReposicao | None = None,
 ):
     """Executa a lógica principal de exportação.
 
@@ -21,13 +30,64 @@ def main(
     Portanto, essa função espera que `config.param` já esteja definido pelo chamador.
     O helper CLI `run_from_argv` realiza o carregamento de parâmetros (do Aeros ou JSON)
     antes de chamar esta função.
+
+    Se `diretorio_cache` for informado, a projeção (importada ou recalculada) é
+    salva nele e reaproveitada enquanto a planilha e os parâmetros forem os mesmos.
+
+    Com `reposicao`, a projeção recalculada inclui os substitutos dos servidores
+    que se aposentarem no intervalo (ver `src.fluxo_pessoal`), e o quadro de
+    pessoal por competência é exportado em quadro_pessoal.xlsx.
     """
-    cmbh: CMBH = CMBH.from_excel(
-        caminho_projecao_excel, importa_folhas=not recalcula_projecao
-    )
+    if reposicao and not recalcula_projecao:
+        raise ValueError("A reposição de vagas exige o recálculo da projeção.")
+
+    cmbh: CMBH | None = None
+    if diretorio_cache:
+        cache = CacheProjecao(diretorio_cache)
+        # Os anos, as letras adquiridas e a data do cálculo (que define os
+        # reajustes da tabela) só influenciam a projeção quando ela é recalculada
+        recalculo = (
+            (
+                ano_inicio,
+                ano_fim,
+                CacheProjecao.resumo_progressoes(progressoes_horizontais),
+                date.today(),
+            )
+            if recalcula_projecao
+            else ()
+        )
+        chave = cache.chave(
+            caminho_projecao_excel,
+            config.param,
+            recalcula_projecao,
+            *recalculo,
+            *((reposicao,) if reposicao else ()),
+        )
+        cmbh = cache.carrega(chave)
+
+    if cmbh is None:
+        cmbh = CMBH.from_excel(
+            caminho_projecao_excel, importa_folhas=not recalcula_projecao
+        )
+        if reposicao:
+            fluxo = FluxoPessoal(reposicao).projeta(
+                list(cmbh.funcionarios.values()), ano_inicio, ano_fim
+            )
+            cmbh.funcionarios.update({f.cm: f for f in fluxo.admitidos})
+        if recalcula_projecao:
+            cmbh.calcula_projecao(ano_inicio, ano_fim, processos=processos)
+        if diretorio_cache:
+            cache.salva(chave, cmbh)
+
     if recalcula_projecao:
-        cmbh.calcula_projecao(ano_inicio, ano_fim)
         cmbh.exporta_progressoes(diretorio_resultado)
+    if reposicao:
+        quadro = FluxoPessoal.quadro(
+            list(cmbh.funcionarios.values()), ano_inicio, ano_fim
+        )
+        arquivo_quadro = os.path.join(diretorio_resultado, "quadro_pessoal.xlsx")
+        with EscritorExcelStreaming(arquivo_quadro) as writer:
+            para_excel_formatado(quadro, writer, sheet_name="Quadro", index=False)
 
     cmbh.exporta(diretorio_resultado, ano_inicio, ano_fim)
     print(
@@ -36,6 +96,31 @@ def main(
     )
 
 
+def main_cenarios(
+    caminho_projecao_excel,
+    ano_inicio,
+    ano_fim,
+    diretorio_resultado,
+    arquivo_cenarios,
+    processos=1,
+):
+    """Calcula os cenários de `arquivo_cenarios` e exporta a planilha comparativa.
+
+    A planilha de projeção é importada uma única vez; os parâmetros de cada
+    cenário são aplicados sobre `config.param` (ver `src.cenarios`)."""
+    cenarios = carrega_cenarios(arquivo_cenarios, config.param)
+    cmbh = CMBH.from_excel(caminho_projecao_excel, importa_folhas=False)
+
+    varredura = VarreduraCenarios(
+        list(cmbh.funcionarios.values()), ano_inicio, ano_fim, processos=processos
+    )
+    totais = varredura.calcula(cenarios)
+
+    arquivo_resultado = os.path.join(diretorio_resultado, "cenarios.xlsx")
+    VarreduraCenarios.exporta(cenarios, totais, arquivo_resultado)
+    print(f"{len(cenarios)} cenários exportados para {arquivo_resultado}.")
+
+
 def run_from_argv(argv=None):
     """Analisa os argumentos da CLI e executa.
 
@@ -59,6 +144,43 @@ def run_from_argv(argv=None):
         action="store_true",
         help="Se informado, recalcula a projeção antes de exportar",
     )
+    parser.add_argument(
+        "--processos",
+        type=int,
+        default=1,
+        help="Número de processos usados no recálculo da projeção (0 usa todos)",
+    )
+    parser.add_argument(
+        "--cenarios",
+        dest="arquivo_cenarios",
+        help="Arquivo JSON de cenários: recalcula a projeção para cada um e exporta "
+        "a planilha comparativa cenarios.xlsx",
+    )
+    parser.add_argument(
+        "--reposicao",
+        type=float,
+        nargs="?",
+        const=1.0,
+        metavar="TAXA",
+        help="Repõe as vagas abertas por aposentadorias no intervalo com novos "
+        "servidores (TAXA: fração das vagas repostas, padrão 1); exige "
+        "--recalcula-projecao",
+    )
+    parser.add_argument(
+        "--cache",
+        dest="diretorio_cache",
+        help="Diretório do cache da projeção, reaproveitada entre execuções",
+    )
+    parser.add_argument(
+        "--cache-consultas",
+        dest="diretorio_cache_consultas",
+        help="Diretório de cache das consultas ao Aeros (válido por um dia)",
+    )
+    parser.add_argument(
+        "--progressoes-horizontais",
+        dest="progressoes_horizontais",
+        help="Arquivo CSV ou Excel com as letras adquiridas, usado no lugar do Aeros",
+    )
     parser.add_argument(
         "--parametros-json",
         dest="parametros_json",
@@ -67,6 +189,11 @@ def run_from_argv(argv=None):
 
     args = parser.parse_args(argv)
 
+    if args.diretorio_cache_consultas:
+        BancoDeDados.configura_cache(args.diretorio_cache_consultas)
+    if args.progressoes_horizontais:
+        progressoes_horizontais.carrega(args.progressoes_horizontais)
+
     # Load parameters: from JSON if provided, else from Aeros database
     if args.parametros_json:
         json_path = args.parametros_json
@@ -92,6 +219,21 @@ def run_from_argv(argv=None):
             print(f"Falha ao carregar parâmetros do Aeros: {exc}")
             return 1
 
+    if args.arquivo_cenarios:
+        try:
+            main_cenarios(
+                args.caminho_projecao_excel,
+                args.ano_inicio,
+                args.ano_fim,
+                args.diretorio_resultado,
+                args.arquivo_cenarios,
+                processos=args.processos or None,
+            )
+        except Exception as exc:
+            print(f"Erro ao calcular os cenários: {exc}")
+            return 1
+        return 0
+
     try:
         main(
             args.caminho_projecao_excel,
@@ -99,6 +241,13 @@ def run_from_argv(argv=None):
             args.ano_fim,
             args.diretorio_resultado,
             recalcula_projecao=args.recalcula_projecao,
+            processos=args.processos or None,
+            diretorio_cache=args.diretorio_cache,
+            reposicao=(
+                PoliticaReposicao(taxa_reposicao=args.reposicao)
+                if args.reposicao is not None
+                else None
+            ),
         )
     except Exception as exc:
         print(f"Erro ao executar exportação: {exc}")
@@ -1,21 +1,105 @@
 import argparse
+import os
 import sys
 from datetime import date, datetime
 
+from dateutil.relativedelta import relativedelta
+
+from reenquadramento.avaliacoes import avaliacoes_reenquadramento
+from reenquadramento.dados_faltantes_aeros import dados_faltantes_reenquadramento
 from reenquadramento.trajetoria_simulada import TrajetoriasSimuladas
+from src.banco_de_dados import BancoDeDados
+from src.exportador_excel import EscritorExcelStreaming, para_excel_formatado
 
 
 def reenquadramento(
     caminho_projecao_excel: str,
     data_migracao: date,
     caminho_saida_reenquadramento: str = "resultado_reenquadramento.xlsx",
+    servidores_por_arquivo: int | None = None,
+    tabela: bool = False,
+    processos: int | None = 1,
 ):
-    """Executa a lógica principal do reenquadramento."""
+    """Executa a lógica principal do reenquadramento.
+
+    Por padrão escreve uma planilha por servidor, no leiaute do modelo; com
+    `servidores_por_arquivo`, divide as planilhas em vários arquivos. Com
+    `tabela`, escreve as trajetórias em formato longo, em uma única tabela."""
 
     calculadora = TrajetoriasSimuladas.from_excel(caminho_projecao_excel, data_migracao)
     print("Calculando trajetórias simuladas...")
-    calculadora.calcula()
-    calculadora.exporta_para_excel(caminho_excel=caminho_saida_reenquadramento)
+    calculadora.calcula(processos=processos)
+    _avisa_sem_dados_aeros(calculadora)
+    if tabela:
+        calculadora.exporta_tabela(caminho_saida_reenquadramento)
+    else:
+        calculadora.exporta_para_excel(
+            caminho_saida_reenquadramento,
+            servidores_por_arquivo=servidores_por_arquivo,
+            processos=processos,
+        )
+
+
+def _avisa_sem_dados_aeros(calculadora: TrajetoriasSimuladas) -> None:
+    sem_dados = calculadora.sem_dados_aeros()
+    if sem_dados:
+        print(
+            f"Atenção: {len(sem_dados)} servidores sem dados no Aeros, calculados "
+            f"sem nome, sem licenças e com a letra base: {sem_dados}"
+        )
+
+
+def reenquadramento_varias_datas(
+    caminho_projecao_excel: str,
+    datas_migracao: list[date],
+    caminho_saida_reenquadramento: str = "resumo_reenquadramento.xlsx",
+    processos: int | None = 1,
+):
+    """Reenquadra todos os servidores em cada data de migração e exporta uma
+    tabela-resumo com a classe, o nível e a letra finais por CM e data.
+
+    A planilha de projeção, as avaliações e os dados faltantes do Aeros são
+    carregados uma única vez para todas as datas."""
+
+    datas_migracao = sorted(set(datas_migracao))
+    calculadora = TrajetoriasSimuladas.from_excel(
+        caminho_projecao_excel, datas_migracao[0]
+    )
+    print(f"Calculando trajetórias simuladas para {len(datas_migracao)} datas...")
+    trajetorias = calculadora.calcula_datas(datas_migracao, processos=processos)
+    _avisa_sem_dados_aeros(calculadora)
+    resumo = TrajetoriasSimuladas.resumo(trajetorias)
+    with EscritorExcelStreaming(caminho_saida_reenquadramento) as writer:
+        para_excel_formatado(resumo, writer, sheet_name="Resumo", index=False)
+
+
+def datas_migracao(
+    datas: str, data_fim: str | None = None, intervalo_meses: int = 1
+) -> list[date]:
+    """Interpreta as datas de migração da CLI (DD/MM/YYYY).
+
+    `datas` pode ser uma data ou uma lista separada por vírgulas. Com `data_fim`,
+    gera as datas de `datas` (uma única data) até `data_fim`, de
+    `intervalo_meses` em `intervalo_meses` meses."""
+
+    def converte(texto: str) -> date:
+        return datetime.strptime(texto.strip(), "%d/%m/%Y").date()
+
+    resultado = [converte(texto) for texto in datas.split(",")]
+    if data_fim is None:
+        return resultado
+    if len(resultado) != 1:
+        raise ValueError("Informe uma única data inicial para gerar um intervalo")
+    if intervalo_meses <= 0:
+        raise ValueError("O intervalo entre as datas deve ser de pelo menos 1 mês")
+
+    inicio, fim = resultado[0], converte(data_fim)
+    resultado = []
+    meses = 0
+    while (data := inicio + relativedelta(months=meses)) <= fim:
+        resultado.append(data)
+        meses += intervalo_meses
+    return resultado
 
 
 def run_from_argv(argv=None):
@@ -31,19 +115,93 @@ def run_from_argv(argv=None):
     parser.add_argument(
         "caminho_projecao_excel", help="Caminho do arquivo de projeção (xlsx)"
     )
-    parser.add_argument("data_migracao", help="Data de migração (DD/MM/YYYY)")
+    parser.add_argument(
+        "data_migracao",
+        help="Data de migração (DD/MM/YYYY) ou lista de datas separadas por vírgula",
+    )
     parser.add_argument(
         "caminho_saida_reenquadramento",
         help="Caminho e nome do arquivo que conterá os resultados de reenquadramento",
     )
+    parser.add_argument(
+        "--ate",
+        default=None,
+        help="Data final (DD/MM/YYYY): calcula de data_migracao até ela",
+    )
+    parser.add_argument(
+        "--intervalo-meses",
+        type=int,
+        default=1,
+        help="Meses entre as datas de migração geradas com --ate (padrão: 1)",
+    )
+    parser.add_argument(
+        "--servidores-por-arquivo",
+        type=int,
+        default=None,
+        help="Divide as planilhas por servidor em arquivos com até N servidores",
+    )
+    parser.add_argument(
+        "--tabela",
+        action="store_true",
+        help="Escreve as trajetórias em uma única tabela, uma linha por progressão",
+    )
+    parser.add_argument(
+        "--processos",
+        type=int,
+        default=1,
+        help="Número de processos usados no cálculo e na exportação (0 usa todos)",
+    )
+
+    parser.add_argument(
+        "--notas",
+        help="Planilha de notas das avaliações (padrão: reenquadramento/notas.xlsx)",
+    )
+    parser.add_argument(
+        "--dados-faltantes",
+        dest="dados_faltantes",
+        help="Arquivo CSV ou Excel com os dados faltantes, usado no lugar do Aeros",
+    )
+    parser.add_argument(
+        "--cache",
+        dest="diretorio_cache",
+        help="Diretório de cache das notas lidas e das consultas ao Aeros (estas "
+        "válidas por um dia)",
+    )
 
     args = parser.parse_args(argv)
 
-    reenquadramento(
-        args.caminho_projecao_excel,
-        datetime.strptime(args.data_migracao, "%d/%m/%Y").date(),
-        args.caminho_saida_reenquadramento,
-    )
+    if args.diretorio_cache:
+        BancoDeDados.configura_cache(os.path.join(args.diretorio_cache, "consultas"))
+        avaliacoes_reenquadramento.diretorio_cache = os.path.join(
+            args.diretorio_cache, "notas"
+        )
+    if args.notas:
+        avaliacoes_reenquadramento.caminho_excel = args.notas
+    if args.dados_faltantes:
+        dados_faltantes_reenquadramento.carrega(args.dados_faltantes)
+
+    try:
+        datas = datas_migracao(args.data_migracao, args.ate, args.intervalo_meses)
+    except ValueError as erro:
+        parser.error(str(erro))
+
+    if len(datas) == 1:
+        reenquadramento(
+            args.caminho_projecao_excel,
+            datas[0],
+            args.caminho_saida_reenquadramento,
+            servidores_por_arquivo=args.servidores_por_arquivo,
+            tabela=args.tabela,
+            processos=args.processos or None,
+        )
+    else:
+        # Várias datas: uma tabela-resumo no lugar das planilhas por servidor
+        reenquadramento_varias_datas(
+            args.caminho_projecao_excel,
+            datas,
+            args.caminho_saida_reenquadramento,
+            processos=args.processos or None,
+        )
     return 0
 
 
@@ -1,6 +1,18 @@
+import hashlib
+import os
+import pickle
 from dataclasses import dataclass
 from datetime import date
 
+import numpy as np
+import pandas as pd
+
+# Planilha de notas, relativa ao diretório de execução
+CAMINHO_NOTAS = os.path.join("reenquadramento", "notas.xlsx")
+
+# Versão do formato de `Avaliacoes` salvo no cache em disco
+VERSAO_CACHE = 2
+
 
 @dataclass
 class Avaliacao:
@@ -9,29 +21,143 @@ class Avaliacao:
 
 
 class Avaliacoes:
-    def __init__(self):
-        self.avaliacoes = {}  # {cm: List[Avaliacao]}
+    """Notas das avaliações de desempenho, por CM, em ordem de início do
+    interstício.
+
+    As notas de todos os servidores ficam em um único vetor contíguo, ordenado por
+    (cm, início); as do CM `cms[k]` ocupam `notas[offsets[k]:offsets[k + 1]]`.
+    `notas_do_cm` devolve essa fatia sem cópia."""
+
+    def __init__(
+        self,
+        cms: np.ndarray | None = None,
+        offsets: np.ndarray | None = None,
+        inicios: np.ndarray | None = None,
+        notas: np.ndarray | None = None,
+    ):
+        self.cms = np.array([], dtype=np.int64) if cms is None else cms
+        self.offsets = np.zeros(1, dtype=np.int64) if offsets is None else offsets
+        self.inicios = (
+            np.array([], dtype="datetime64[ns]") if inicios is None else inicios
+        )
+        self.notas = np.array([], dtype=float) if notas is None else notas
 
     @classmethod
-    def from_excel(cls, caminho_excel: str = "reenquadramento\\notas.xlsx"):
+    def from_excel(cls, caminho_excel: str = CAMINHO_NOTAS):
         """Carrega avaliações a partir de um arquivo Excel."""
-        import pandas as pd
+        return cls.from_dataframe(
+            pd.read_excel(
+                caminho_excel, sheet_name="Sheet0", usecols=["cm", "inicio", "nota"]
+            )
+        )
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame):
+        """Carrega avaliações de um DataFrame com as colunas cm, inicio e nota.
+
+        Avaliações sem início ficam depois das demais do CM, na ordem do
+        DataFrame."""
+        df = pd.DataFrame(
+            {
+                "cm": df["cm"].astype(np.int64),
+                "inicio": pd.to_datetime(df["inicio"]),
+                "nota": df["nota"].astype(float),
+            }
+        ).sort_values(["cm", "inicio"], kind="stable", na_position="last")
 
-        df = pd.read_excel(caminho_excel, sheet_name="Sheet0")
+        quantidades = df.groupby("cm", sort=True).size()
+        offsets = np.zeros(len(quantidades) + 1, dtype=np.int64)
+        np.cumsum(quantidades.to_numpy(), out=offsets[1:])
+        return cls(
+            cms=quantidades.index.to_numpy(dtype=np.int64),
+            offsets=offsets,
+            inicios=df["inicio"].to_numpy(dtype="datetime64[ns]"),
+            notas=df["nota"].to_numpy(),
+        )
 
-        instancia = cls()
+    def _fatia(self, cm: int) -> slice | None:
+        k = int(np.searchsorted(self.cms, cm))
+        if k == len(self.cms) or self.cms[k] != cm:
+            return None
+        return slice(self.offsets[k], self.offsets[k + 1])
 
-        for _, row in df.iterrows():
-            cm: int = int(row["cm"])
-            intersticio: date = row["inicio"]
-            nota: float = float(row["nota"])
+    def notas_do_cm(self, cm: int) -> np.ndarray:
+        """Notas do CM em ordem de início do interstício (vazio se não houver)."""
+        fatia = self._fatia(cm)
+        return self.notas[fatia] if fatia is not None else self.notas[:0]
 
-            instancia.avaliacoes.setdefault(cm, []).append(
-                Avaliacao(inicio_intersticio=intersticio, nota=nota)
+    def do_cm(self, cm: int) -> list[Avaliacao] | None:
+        """Retorna as avaliações de um funcionário pelo seu cm, ou None se não
+        houver nenhuma."""
+        fatia = self._fatia(cm)
+        if fatia is None:
+            return None
+        return [
+            Avaliacao(
+                inicio_intersticio=None if np.isnat(inicio) else pd.Timestamp(inicio),
+                nota=nota,
             )
+            for inicio, nota in zip(self.inicios[fatia], self.notas[fatia].tolist())
+        ]
+
+
+class CarregadorAvaliacoes:
+    """Avaliações usadas no reenquadramento, lidas da planilha de notas somente
+    quando usadas pela primeira vez, a não ser que tenham sido informadas antes
+    por `carrega`.
+
+    Com `diretorio_cache`, as avaliações lidas ficam também em disco, em um
+    pickle identificado pelo hash do conteúdo da planilha: uma planilha já lida
+    não é interpretada de novo em outra execução."""
+
+    def __init__(
+        self, caminho_excel: str = CAMINHO_NOTAS, diretorio_cache: str | None = None
+    ) -> None:
+        self.caminho_excel = caminho_excel
+        self.diretorio_cache = diretorio_cache
+        self._avaliacoes = None  # type: Avaliacoes | None
+
+    @property
+    def avaliacoes(self) -> Avaliacoes:
+        if self._avaliacoes is None:
+            self._avaliacoes = self._le_planilha()
+        return self._avaliacoes
+
+    def carrega(self, dados: Avaliacoes | pd.DataFrame | str) -> None:
+        """Informa as avaliações: já carregadas, em um DataFrame (cm, inicio, nota)
+        ou no caminho de outra planilha de notas, lida imediatamente."""
+        if isinstance(dados, str):
+            self.caminho_excel = dados
+            self._avaliacoes = self._le_planilha()
+        elif isinstance(dados, pd.DataFrame):
+            self._avaliacoes = Avaliacoes.from_dataframe(dados)
+        else:
+            self._avaliacoes = dados
+
+    def _le_planilha(self) -> Avaliacoes:
+        if not self.diretorio_cache:
+            return Avaliacoes.from_excel(self.caminho_excel)
+
+        hash_ = hashlib.sha256()
+        with open(self.caminho_excel, "rb") as arquivo:
+            for bloco in iter(lambda: arquivo.read(1 << 20), b""):
+                hash_.update(bloco)
+        caminho_cache = os.path.join(
+            self.diretorio_cache,
+            f"avaliacoes-v{VERSAO_CACHE}-{hash_.hexdigest()}.pkl",
+        )
+        if os.path.exists(caminho_cache):
+            with open(caminho_cache, "rb") as arquivo:
+                return pickle.load(arquivo)
+
+        avaliacoes = Avaliacoes.from_excel(self.caminho_excel)
+        os.makedirs(self.diretorio_cache, exist_ok=True)
+        temporario = f"{caminho_cache}.{os.getpid()}.tmp"
+        with open(temporario, "wb") as arquivo:
+            pickle.dump(avaliacoes, arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporario, caminho_cache)
+        return avaliacoes
 
-        return instancia
 
-    def do_cm(self, cm: int) -> list[Avaliacao]:
-        """Retorna a avaliação de um funcionário pelo seu cm."""
-        return self.avaliacoes.get(cm)
+# Instância compartilhada; lida da planilha de notas somente no primeiro uso
+avaliacoes_reenquadramento = CarregadorAvaliacoes()
@@ -10,17 +10,27 @@ class DadosFaltantesAeros:
     nome: str
     qtde_dias_licenca: int
     letra_maxima: str
+    encontrado_no_aeros: bool = True  # False: CM sem registro na consulta
 
 
-def obtem_dados_faltantes_aeros() -> dict[int, DadosFaltantesAeros]:
+def obtem_dados_faltantes_aeros(
+    banco_de_dados: BancoDeDados = BancoDeDados,
+) -> dict[int, DadosFaltantesAeros]:
     """
     Obtém dados faltantes do Aeros para o reenquadramento.
     Retorna um dicionário com os dados necessários.
     """
-    df_dados_faltantes = BancoDeDados().realiza_consulta_arquivo(
+    df_dados_faltantes = banco_de_dados().realiza_consulta_arquivo(
         "dados_faltantes_reenquadramento.sql"
     )
+    return converte_dados_faltantes(df_dados_faltantes)
 
+
+def converte_dados_faltantes(
+    df_dados_faltantes: pd.DataFrame,
+) -> dict[int, DadosFaltantesAeros]:
+    """Converte as linhas da consulta `dados_faltantes_reenquadramento.sql` (cm,
+    nome, qtde_dias_licenca, letra_maxima) em {cm: DadosFaltantesAeros}."""
     dados_faltantes_aeros = {}
     for _, row in df_dados_faltantes.iterrows():
         cm: int = int(row["cm"])
@@ -38,6 +48,43 @@ def obtem_dados_faltantes_aeros() -> dict[int, DadosFaltantesAeros]:
             letra_maxima=letra_maxima,
         )
 
-    dados_faltantes_aeros[545].qtde_dias_licenca = 680
+    if 545 in dados_faltantes_aeros:
+        dados_faltantes_aeros[545].qtde_dias_licenca = 680
 
     return dados_faltantes_aeros
+
+
+class CarregadorDadosFaltantes:
+    """Dados faltantes do reenquadramento (nome, licenças e letra máxima), obtidos
+    do Aeros somente quando usados pela primeira vez, a não ser que tenham sido
+    informados antes por `carrega`.
+
+    A consulta usa o cache em disco de `BancoDeDados.configura_cache`, se ligado."""
+
+    def __init__(self, banco_de_dados: BancoDeDados = BancoDeDados) -> None:
+        self.banco_de_dados = banco_de_dados
+        self._dados = None  # type: dict[int, DadosFaltantesAeros] | None
+
+    @property
+    def dados(self) -> dict[int, DadosFaltantesAeros]:
+        if self._dados is None:
+            self._dados = obtem_dados_faltantes_aeros(self.banco_de_dados)
+        return self._dados
+
+    def carrega(
+        self, dados: dict[int, DadosFaltantesAeros] | pd.DataFrame | str
+    ) -> None:
+        """Informa os dados faltantes: já convertidos, em um DataFrame com as
+        colunas da consulta ou em um arquivo CSV ou Excel com essas colunas."""
+        if isinstance(dados, str):
+            if dados.endswith((".xlsx", ".xls")):
+                dados = pd.read_excel(dados)
+            else:
+                dados = pd.read_csv(dados)
+        if isinstance(dados, pd.DataFrame):
+            dados = converte_dados_faltantes(dados)
+        self._dados = dados
+
+
+# Instância compartilhada; consultada no Aeros somente no primeiro uso
+dados_faltantes_reenquadramento = CarregadorDadosFaltantes()
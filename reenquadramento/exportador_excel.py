@@ -0,0 +1,131 @@
+import os
+from copy import copy
+
+import openpyxl
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+
+from src.exportador_excel import EscritorExcelStreaming
+
+CAMINHO_MODELO = os.path.join(os.path.dirname(__file__), "modelo.xlsx")
+
+# Atributos de formatação copiados de cada célula do modelo
+_ESTILOS = ("font", "border", "fill", "number_format", "protection", "alignment")
+
+
+class ModeloReenquadramento:
+    """Leiaute estático da planilha de reenquadramento (`modelo.xlsx`).
+
+    O modelo é lido uma única vez: textos, estilos, dimensões, células mescladas
+    e configuração de página. `escreve` reproduz o leiaute em uma planilha nova
+    de um workbook write-only (ver `EscritorExcelStreaming`), com os valores de
+    um servidor por cima, sem copiar o modelo célula a célula para cada CM."""
+
+    def __init__(self, caminho: str = CAMINHO_MODELO):
+        if not os.path.exists(caminho):
+            raise FileNotFoundError(f"Modelo não encontrado: {caminho}")
+        workbook = openpyxl.load_workbook(caminho)
+        planilha = workbook[workbook.sheetnames[0]]
+
+        # {(linha, coluna): (valor, {atributo: estilo})}
+        self.celulas = {}
+        for linha in planilha.iter_rows():
+            for celula in linha:
+                if celula.value is None and not celula.has_style:
+                    continue
+                estilo = {
+                    atributo: copy(getattr(celula, atributo)) for atributo in _ESTILOS
+                }
+                self.celulas[celula.row, celula.column] = (celula.value, estilo)
+
+        self.larguras = {
+            letra: dimensao.width
+            for letra, dimensao in planilha.column_dimensions.items()
+            if dimensao.width
+        }
+        self.alturas = {
+            linha: dimensao.height
+            for linha, dimensao in planilha.row_dimensions.items()
+            if dimensao.height
+        }
+        self.mescladas = [str(intervalo) for intervalo in planilha.merged_cells.ranges]
+        self.formato = copy(planilha.sheet_format)
+        self.propriedades = copy(planilha.sheet_properties)
+        self.margens = copy(planilha.page_margins)
+        self.pagina = copy(planilha.page_setup)
+        self.impressao = copy(planilha.print_options)
+
+        # Estilos do modelo já registrados no último workbook usado em `escreve`:
+        # (workbook, {(linha, coluna): StyleArray})
+        self._estilos_registrados = (None, {})
+
+    def _estilos_no_workbook(self, planilha) -> dict:
+        """Registra os estilos do modelo no workbook da planilha uma única vez,
+        para que cada célula escrita só copie os índices dos estilos."""
+        workbook, estilos = self._estilos_registrados
+        if workbook is not planilha.parent:
+            estilos = {}
+            for posicao, (_, estilo) in self.celulas.items():
+                celula = WriteOnlyCell(planilha)
+                for atributo, estilo_atributo in estilo.items():
+                    setattr(celula, atributo, estilo_atributo)
+                estilos[posicao] = celula._style
+            self._estilos_registrados = (planilha.parent, estilos)
+        return estilos
+
+    def escreve(
+        self, workbook: Workbook, titulo: str, valores: dict[tuple[int, int], object]
+    ) -> None:
+        """Cria a planilha `titulo` em `workbook` (write-only) com o leiaute do
+        modelo e os `valores` ({(linha, coluna): valor}) sobre ele."""
+        planilha = workbook.create_sheet(title=titulo)
+        for letra, largura in self.larguras.items():
+            planilha.column_dimensions[letra].width = largura
+        for linha, altura in self.alturas.items():
+            planilha.row_dimensions[linha].height = altura
+        for intervalo in self.mescladas:
+            planilha.merged_cells.add(intervalo)
+        planilha.sheet_format = copy(self.formato)
+        planilha.sheet_properties = copy(self.propriedades)
+        planilha.page_margins = copy(self.margens)
+        planilha.page_setup = copy(self.pagina)
+        planilha.print_options = copy(self.impressao)
+
+        estilos = self._estilos_no_workbook(planilha)
+
+        # No modo write-only as linhas são escritas em ordem, cada uma de uma vez
+        por_linha = {}
+        for linha, coluna in self.celulas.keys() | valores.keys():
+            por_linha.setdefault(linha, []).append(coluna)
+        for linha in range(1, max(por_linha, default=0) + 1):
+            celulas = []
+            for coluna in sorted(por_linha.get(linha, [])):
+                while len(celulas) < coluna - 1:
+                    celulas.append(None)
+                valor, _ = self.celulas.get((linha, coluna), (None, None))
+                celula = WriteOnlyCell(planilha)
+                # O estilo vem antes do valor: datas mantêm o formato do modelo
+                if (linha, coluna) in estilos:
+                    celula._style = copy(estilos[linha, coluna])
+                celula.value = valores.get((linha, coluna), valor)
+                celulas.append(celula)
+            planilha.append(celulas)
+        # Encerra a planilha: o XML fica só no arquivo temporário até o `save`
+        planilha.close()
+
+
+def escreve_planilhas(
+    caminho_excel: str,
+    planilhas: list[tuple[str, dict[tuple[int, int], object]]],
+    caminho_modelo: str = CAMINHO_MODELO,
+) -> str:
+    """Escreve um arquivo Excel com uma planilha no leiaute do modelo para cada
+    (título, valores) de `planilhas`. Retorna o caminho do arquivo.
+
+    Recebe o caminho do modelo, e não o modelo já lido, para poder ser executada
+    em outro processo."""
+    modelo = ModeloReenquadramento(caminho_modelo)
+    with EscritorExcelStreaming(caminho_excel) as writer:
+        for titulo, valores in planilhas:
+            modelo.escreve(writer.book, titulo, valores)
+    return caminho_excel
@@ -0,0 +1,265 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from enum import Enum
+
+import numpy as np
+
+from reenquadramento.avaliacoes import Avaliacoes
+from src.funcionario import Funcionario
+from src.nivel import NUMERO_MAXIMO, Nivel
+from src.regras_reenquadramento import (
+    NOTA_MINIMA_DUAS_PROGRESSOES,
+    NOTA_MINIMA_PROGRESSAO,
+    NOTA_PADRAO,
+    _antes,
+    _mes,
+    simula_passos,
+    tempos_da_carreira,
+)
+
+
+@dataclass
+class ProgressaoSimulada:
+    data: date
+    nivel: Nivel
+    especial_concedida: bool
+    nota_media_especial: float
+    nota_avaliacao: float
+
+
+class MotivoDecisao(Enum):
+    PROGRESSAO_NAO_CONCEDIDA = "Progressão não concedida"
+    SOMENTE_UMA_PROGRESSAO = "Somente uma progressão"
+    ESPECIAL_NAO_CONCEDIDA = "Progressão especial não concedida"
+
+
+@dataclass(frozen=True)
+class DecisaoReenquadramento:
+    """Progressão concedida parcialmente ou negada no reenquadramento."""
+
+    cm: int
+    data: date  # Data da progressão a partir da qual a nota foi avaliada
+    motivo: MotivoDecisao
+    nota: float  # Nota da avaliação, ou média na progressão especial
+
+    def __str__(self) -> str:
+        return f"CM {self.cm}: {self.motivo.value}: nota {self.nota}"
+
+
+def _data(mes: int, dia: int) -> date:
+    return date(mes // 12, mes % 12 + 1, dia)
+
+
+@dataclass
+class _LoteCompilado:
+    """Dados de partida dos servidores, em vetores alinhados a `cms`."""
+
+    cms: list[int]
+    letras: list[str]
+    numeros: np.ndarray
+    meses: np.ndarray
+    dias: np.ndarray
+    limites: np.ndarray
+    tempos: np.ndarray  # (servidores × números de nível)
+    notas: np.ndarray  # (servidores × avaliações), NOTA_PADRAO além das registradas
+
+    def fatia(self, indices: slice) -> "_LoteCompilado":
+        return _LoteCompilado(
+            cms=self.cms[indices],
+            letras=self.letras[indices],
+            numeros=self.numeros[indices],
+            meses=self.meses[indices],
+            dias=self.dias[indices],
+            limites=self.limites[indices],
+            tempos=self.tempos[indices],
+            notas=self.notas[indices],
+        )
+
+
+@dataclass
+class ResultadoReenquadramento:
+    """Progressões simuladas de cada servidor e as decisões de notas abaixo do
+    necessário para as duas progressões (ou para a progressão especial)."""
+
+    progressoes: dict[int, list[ProgressaoSimulada]] = field(default_factory=dict)
+    decisoes: list[DecisaoReenquadramento] = field(default_factory=list)
+
+
+def _decisoes_do_passo(
+    cm: int, data: date, nota: float, media: float | None
+) -> list[DecisaoReenquadramento]:
+    decisoes = []
+    if nota < NOTA_MINIMA_PROGRESSAO:
+        motivo = MotivoDecisao.PROGRESSAO_NAO_CONCEDIDA
+        decisoes.append(DecisaoReenquadramento(cm, data, motivo, nota))
+    elif nota < NOTA_MINIMA_DUAS_PROGRESSOES:
+        motivo = MotivoDecisao.SOMENTE_UMA_PROGRESSAO
+        decisoes.append(DecisaoReenquadramento(cm, data, motivo, nota))
+    if media is not None and media < NOTA_MINIMA_DUAS_PROGRESSOES:
+        motivo = MotivoDecisao.ESPECIAL_NAO_CONCEDIDA
+        decisoes.append(DecisaoReenquadramento(cm, data, motivo, media))
+    return decisoes
+
+
+def _calcula_lote(
+    lote: _LoteCompilado, datas_migracao: list[date]
+) -> dict[date, ResultadoReenquadramento]:
+    """Reenquadra todos os servidores do lote em todas as datas.
+
+    Os passos não dependem da data de migração, que só define onde param: a
+    simulação é feita uma única vez, até a última data, e a trajetória de cada
+    data é o trecho dos passos anteriores a ela."""
+    num_servidores = len(lote.cms)
+    ultima = max(datas_migracao, default=date.min)
+    passos = simula_passos(
+        lote.numeros,
+        lote.meses,
+        lote.dias,
+        lote.limites,
+        lote.tempos,
+        lote.notas,
+        np.full(num_servidores, _mes(ultima)),
+        np.full(num_servidores, ultima.day),
+    )
+
+    # Passos de cada servidor, convertidos uma única vez para todas as datas:
+    # [(data, nível, especial, média, nota, decisões)]
+    ativo = passos.ativo.T.tolist()
+    meses, dias = passos.meses.T.tolist(), passos.dias.T.tolist()
+    numeros, notas = passos.numeros.T.tolist(), passos.notas.T.tolist()
+    medias, especiais = passos.medias.T.tolist(), passos.especiais.T.tolist()
+    passos_por_servidor = []
+    for j, cm in enumerate(lote.cms):
+        passos_servidor = []
+        for passo, ativa in enumerate(ativo[j]):
+            if not ativa:
+                break
+            data = _data(meses[j][passo], dias[j][passo])
+            nota, media = notas[j][passo], medias[j][passo]
+            media = None if math.isnan(media) else media  # Sem especial
+            passos_servidor.append(
+                (
+                    data,
+                    Nivel(numeros[j][passo], lote.letras[j]),
+                    especiais[j][passo],
+                    media,
+                    nota,
+                    _decisoes_do_passo(cm, data, nota, media),
+                )
+            )
+        passos_por_servidor.append(passos_servidor)
+
+    resultados = {}
+    for data_migracao in datas_migracao:
+        anteriores = passos.ativo & _antes(
+            passos.meses, passos.dias, _mes(data_migracao), data_migracao.day
+        )
+        quantidades = anteriores.sum(axis=0).tolist()
+        resultado = ResultadoReenquadramento()
+        for cm, passos_servidor, quantidade in zip(
+            lote.cms, passos_por_servidor, quantidades
+        ):
+            progressoes = []
+            for data, nivel, especial, media, nota, decisoes in passos_servidor[
+                :quantidade
+            ]:
+                progressoes.append(
+                    ProgressaoSimulada(data, nivel, especial, media, nota)
+                )
+                resultado.decisoes.extend(decisoes)
+            if progressoes:
+                # A nota da última avaliação não chegou a gerar progressão
+                progressoes[-1].nota_avaliacao = None
+                progressoes[-1].nota_media_especial = None
+            resultado.progressoes[cm] = progressoes
+        resultados[data_migracao] = resultado
+    return resultados
+
+
+class ReenquadramentoEmLote:
+    """Calcula o reenquadramento de todos os servidores de uma vez.
+
+    Produz as mesmas progressões de CalculaReenquadramento, mas percorre as
+    progressões de todos os servidores juntos, sobre vetores: as avaliações de
+    cada servidor são carregadas uma única vez em uma matriz e as datas, níveis e
+    notas avançam para todos a cada passo. As notas que negam ou reduzem uma
+    progressão são registradas em `ResultadoReenquadramento.decisoes`, em vez de
+    impressas.
+
+    Várias datas de migração são calculadas juntas por `calcula_datas`, com uma
+    única simulação até a última delas, da qual as trajetórias das datas
+    anteriores são trechos. Com
+    `processos` diferente de 1, os servidores são divididos em fatias entre
+    processos (None usa todos os processadores)."""
+
+    def __init__(
+        self,
+        funcionarios: dict[int, Funcionario],
+        avaliacoes: Avaliacoes | None = None,
+        processos: int | None = 1,
+    ):
+        self.processos = processos
+        self._lote = self._compila(funcionarios, avaliacoes)
+
+    @staticmethod
+    def _compila(
+        funcionarios: dict[int, Funcionario], avaliacoes: Avaliacoes | None
+    ) -> _LoteCompilado:
+        avaliacoes = avaliacoes if avaliacoes is not None else Avaliacoes()
+        registradas = [avaliacoes.notas_do_cm(cm) for cm in funcionarios]
+        notas = np.full(
+            (len(funcionarios), max(map(len, registradas), default=0)),
+            float(NOTA_PADRAO),
+        )
+        for j, notas_servidor in enumerate(registradas):
+            notas[j, : len(notas_servidor)] = notas_servidor
+
+        progressoes = [
+            funcionario.progressoes[-1] for funcionario in funcionarios.values()
+        ]
+        carreiras = [funcionario.carreira for funcionario in funcionarios.values()]
+        for carreira, progressao in zip(carreiras, progressoes):
+            carreira.checa_nivel_valido(progressao.nivel)
+        return _LoteCompilado(
+            cms=list(funcionarios),
+            letras=[progressao.nivel.letra for progressao in progressoes],
+            numeros=np.array([p.nivel.numero for p in progressoes], dtype=int),
+            meses=np.array([_mes(p.data) for p in progressoes], dtype=int),
+            dias=np.array([p.data.day for p in progressoes], dtype=int),
+            limites=np.array([c._limite() for c in carreiras], dtype=int),
+            tempos=np.array([tempos_da_carreira(c) for c in carreiras]).reshape(
+                len(carreiras), NUMERO_MAXIMO + 1
+            ),
+            notas=notas,
+        )
+
+    def calcula(self, data_migracao: date) -> ResultadoReenquadramento:
+        """Reenquadra todos os servidores na data de migração."""
+        return self.calcula_datas([data_migracao])[data_migracao]
+
+    def calcula_datas(
+        self, datas_migracao: list[date]
+    ) -> dict[date, ResultadoReenquadramento]:
+        """Reenquadra todos os servidores em cada data de migração candidata."""
+        num_servidores = len(self._lote.cms)
+        processos = min(self.processos or os.cpu_count() or 1, num_servidores)
+        if processos <= 1:
+            return _calcula_lote(self._lote, datas_migracao)
+
+        limites = np.linspace(0, num_servidores, processos + 1).astype(int)
+        fatias = [
+            self._lote.fatia(slice(inicio, fim))
+            for inicio, fim in zip(limites[:-1], limites[1:])
+        ]
+        resultados = {data: ResultadoReenquadramento() for data in datas_migracao}
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            for parcial in executor.map(
+                _calcula_lote, fatias, [datas_migracao] * len(fatias)
+            ):
+                for data, resultado in parcial.items():
+                    resultados[data].progressoes.update(resultado.progressoes)
+                    resultados[data].decisoes.extend(resultado.decisoes)
+        return resultados
@@ -1,33 +1,30 @@
 import os
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
 from datetime import date
-from types import SimpleNamespace
 
-import openpyxl
 import pandas as pd
 
-from reenquadramento.avaliacoes import Avaliacao, Avaliacoes
+from reenquadramento.avaliacoes import Avaliacao, Avaliacoes, avaliacoes_reenquadramento
 from reenquadramento.dados_faltantes_aeros import (
     DadosFaltantesAeros,
-    obtem_dados_faltantes_aeros,
+    dados_faltantes_reenquadramento,
+)
+from reenquadramento.exportador_excel import escreve_planilhas
+from reenquadramento.lote import (
+    DecisaoReenquadramento,
+    MotivoDecisao,
+    ProgressaoSimulada,
+    ReenquadramentoEmLote,
 )
 from src.carreira import Progressao
 from src.classe import Classe
 from src.cmbh import CMBH
+from src.exportador_excel import EscritorExcelStreaming, para_excel_formatado
 from src.funcionario import Funcionario
 from src.importador_excel import ImportadorProjecaoExcel
 from src.nivel import Nivel
 
 
-@dataclass
-class ProgressaoSimulada:
-    data: date
-    nivel: Nivel
-    especial_concedida: bool
-    nota_media_especial: float
-    nota_avaliacao: float
-
-
 class TrajetoriaSimulada:
     def __init__(
         self,
@@ -57,37 +54,59 @@ class TrajetoriaSimulada:
         # Assegure que o writer conheça a planilha
         writer.sheets[sheet_name] = worksheet
 
-        # Escreve dados de entrada
-        worksheet["E3"] = self.data_migracao
-        worksheet["C5"] = self.funcionario.cm
-        worksheet["C6"] = self.dados_faltantes_aeros.nome
-        worksheet["C7"] = self.funcionario.data_admissao
-        worksheet["D8"] = self.dados_faltantes_aeros.qtde_dias_licenca
+        for (linha, coluna), valor in self.celulas().items():
+            worksheet.cell(row=linha, column=coluna, value=valor)
+
+    def celulas(self) -> dict[tuple[int, int], object]:
+        """Valores desta trajetória nas células do modelo de reenquadramento:
+        {(linha, coluna): valor}."""
+        celulas = {}
 
-        # Escreve progressões
+        # Dados de entrada
+        celulas[3, 5] = self.data_migracao  # E3
+        celulas[5, 3] = self.funcionario.cm  # C5
+        celulas[6, 3] = self.dados_faltantes_aeros.nome  # C6
+        celulas[7, 3] = self.funcionario.data_admissao  # C7
+        celulas[8, 4] = self.dados_faltantes_aeros.qtde_dias_licenca  # D8
+
+        # Progressões
         start_row = 13
         for i, prog in enumerate(self.progressoes):
             row = start_row + i
-            worksheet.cell(row=row, column=2, value=prog.data)
-            worksheet.cell(row=row, column=3, value=getattr(prog.nivel, "numero", None))
-            worksheet.cell(row=row, column=4, value=prog.nota_avaliacao)
-            worksheet.cell(row=row, column=5, value=prog.especial_concedida)
-            worksheet.cell(row=row, column=6, value=prog.nota_media_especial)
-
-        # Escreve resultado do reenquadramento
+            celulas[row, 2] = prog.data
+            celulas[row, 3] = getattr(prog.nivel, "numero", None)
+            celulas[row, 4] = prog.nota_avaliacao
+            celulas[row, 5] = prog.especial_concedida
+            celulas[row, 6] = prog.nota_media_especial
+
+        # Resultado do reenquadramento
+        ultima = self.ultima_progressao()
+        celulas[34, 3] = self.classe_final()  # C34
+        celulas[35, 3] = ultima.nivel.numero  # C35
+        celulas[36, 3] = self._calcula_letra_maxima()  # C36
+        celulas[37, 5] = ultima.data  # E37
+        # Sem progressões simuladas, nenhuma especial foi concedida
+        celulas[38, 5] = bool(self.progressoes) and ultima.especial_concedida  # E38
+        return celulas
+
+    def classe_final(self) -> str:
+        """Classe do servidor após o reenquadramento (E1 passa a E2)."""
         if self.funcionario.dados_folha.classe == Classe.E1:
-            worksheet["C34"] = "E2"
-        else:
-            worksheet["C34"] = self.funcionario.dados_folha.classe.name
-        worksheet["C35"] = self.progressoes[-1].nivel.numero
-        worksheet["C36"] = self._calcula_letra_maxima()
-        worksheet["E37"] = self.progressoes[-1].data
-        worksheet["E38"] = self.progressoes[-1].especial_concedida
+            return "E2"
+        return self.funcionario.dados_folha.classe.name
+
+    def ultima_progressao(self) -> ProgressaoSimulada | Progressao:
+        """Última progressão simulada ou, se nenhuma ocorreu antes da migração, a
+        última progressão registrada do funcionário."""
+        if self.progressoes:
+            return self.progressoes[-1]
+        return self.funcionario.progressoes[-1]
 
     def _calcula_letra_maxima(self) -> str:
-        """Compara as progs horizontais que servidor tem com o limite da sua carreira."""
+        """Compara as progs horizontais que servidor tem com o limite da sua
+        carreira."""
         nivel = Nivel(
-            self.progressoes[-1].nivel.numero,
+            self.ultima_progressao().nivel.numero,
             self.dados_faltantes_aeros.letra_maxima,
         )
         while True:
@@ -104,76 +123,229 @@ class TrajetoriasSimuladas:
         self,
         funcionarios: Funcionario,
         data_migracao: date,
-        avaliacoes: Avaliacoes = Avaliacoes.from_excel(),
+        avaliacoes: Avaliacoes | None = None,
+        dados_faltantes: dict[int, DadosFaltantesAeros] | None = None,
     ):
+        """Sem `avaliacoes` ou `dados_faltantes`, usa as instâncias compartilhadas
+        `avaliacoes_reenquadramento` e `dados_faltantes_reenquadramento`, lidas
+        somente no primeiro uso e reaproveitadas por todas as instâncias."""
         self.funcionarios = funcionarios  # {cm: Funcionario}
         self.data_migracao = data_migracao
-        self.avaliacoes = avaliacoes  # Avaliacoes
-        self.dados_faltantes = obtem_dados_faltantes_aeros()
+        self._avaliacoes = avaliacoes
+        self._dados_faltantes = dados_faltantes
 
         # Outputs
         self.trajetorias_simuladas = {}  # {cm: TrajetoriaSimulada}
+        self.decisoes = []  # [DecisaoReenquadramento]
+
+    @property
+    def avaliacoes(self) -> Avaliacoes:
+        if self._avaliacoes is None:
+            self._avaliacoes = avaliacoes_reenquadramento.avaliacoes
+        return self._avaliacoes
+
+    @property
+    def dados_faltantes(self) -> dict[int, DadosFaltantesAeros]:
+        if self._dados_faltantes is None:
+            self._dados_faltantes = dados_faltantes_reenquadramento.dados
+        return self._dados_faltantes
 
     @classmethod
-    def from_excel(cls, caminho_excel: str, data_migracao: date):
+    def from_excel(cls, caminho_excel: str, data_migracao: date, **kwargs):
         """Cria uma instância de CMBH a partir de um arquivo Excel."""
 
         cmbh: CMBH = ImportadorProjecaoExcel().importa(
             caminho_excel, importa_folhas=False
         )
-        return cls(cmbh.funcionarios, data_migracao)
+        return cls(cmbh.funcionarios, data_migracao, **kwargs)
+
+    def calcula(self, processos: int | None = 1) -> None:
+        """Calcula as carreiras simuladas de todos os funcionários, em lote (ver
+        `ReenquadramentoEmLote`). As notas que negaram ou reduziram progressões
+        ficam em `decisoes`."""
+        resultado = ReenquadramentoEmLote(
+            self.funcionarios, self.avaliacoes, processos=processos
+        ).calcula(self.data_migracao)
+
+        self.trajetorias_simuladas = self._cria_trajetorias(
+            self.data_migracao, resultado.progressoes
+        )
+        self.decisoes = resultado.decisoes
 
-    def calcula(self) -> None:
-        """Calcula as carreiras simuladas de todos os funcionários."""
-        for cm, funcionario in self.funcionarios.items():
-            trajetoria_simulada = CalculaReenquadramento(
-                funcionario,
-                self.data_migracao,
-                self.avaliacoes.do_cm(cm),
-                self.dados_faltantes.get(cm, DadosFaltantesAeros("", 0, "")),
-            ).calcula()
+    def calcula_datas(
+        self, datas_migracao: list[date], processos: int | None = 1
+    ) -> dict[date, dict[int, TrajetoriaSimulada]]:
+        """Calcula as carreiras simuladas de todos os funcionários para cada data de
+        migração, com os mesmos funcionários, avaliações e dados faltantes.
 
-            self.trajetorias_simuladas[cm] = trajetoria_simulada
+        A trajetória é simulada uma única vez, até a última data; a de cada data
+        anterior é o seu trecho inicial (ver `ReenquadramentoEmLote.calcula_datas`).
+        Retorna {data_migracao: {cm: TrajetoriaSimulada}}, na ordem das datas.
+        """
+        resultados = ReenquadramentoEmLote(
+            self.funcionarios, self.avaliacoes, processos=processos
+        ).calcula_datas(datas_migracao)
+        return {
+            data: self._cria_trajetorias(data, resultado.progressoes)
+            for data, resultado in resultados.items()
+        }
+
+    def sem_dados_aeros(self) -> list[int]:
+        """CMs dos funcionários sem registro nos dados faltantes do Aeros, cujas
+        trajetórias usam nome vazio, nenhuma licença e a letra base."""
+        return sorted(cm for cm in self.funcionarios if cm not in self.dados_faltantes)
+
+    @staticmethod
+    def resumo(
+        trajetorias_por_data: dict[date, dict[int, TrajetoriaSimulada]],
+    ) -> pd.DataFrame:
+        """Tabela com a classe, o nível e a letra finais de cada CM em cada data de
+        migração calculada por `calcula_datas`. A coluna "Sem dados no Aeros"
+        marca os CMs calculados sem os dados faltantes do Aeros."""
+        linhas = []
+        for data_migracao, trajetorias in trajetorias_por_data.items():
+            for cm in sorted(trajetorias):
+                trajetoria = trajetorias[cm]
+                ultima = trajetoria.ultima_progressao()
+                linhas.append(
+                    {
+                        "CM": cm,
+                        "Data de migração": data_migracao,
+                        "Classe": trajetoria.classe_final(),
+                        "Nível": ultima.nivel.numero,
+                        "Letra": trajetoria._calcula_letra_maxima(),
+                        "Última progressão": ultima.data,
+                        "Sem dados no Aeros": (
+                            not trajetoria.dados_faltantes_aeros.encontrado_no_aeros
+                        ),
+                    }
+                )
+        return pd.DataFrame(
+            linhas,
+            columns=[
+                "CM",
+                "Data de migração",
+                "Classe",
+                "Nível",
+                "Letra",
+                "Última progressão",
+                "Sem dados no Aeros",
+            ],
+        )
 
-    def exporta_para_excel(self, caminho_excel: str) -> None:
-        """Escreve todas as carreiras simuladas em um arquivo Excel.
+    def _cria_trajetorias(
+        self, data_migracao: date, progressoes: dict[int, list[ProgressaoSimulada]]
+    ) -> dict[int, TrajetoriaSimulada]:
+        return {
+            cm: TrajetoriaSimulada(
+                funcionario,
+                data_migracao,
+                progressoes[cm],
+                # Sem dados no Aeros, a letra máxima é a base ("0"); esses CMs são
+                # listados por `sem_dados_aeros` e marcados no `resumo`
+                self.dados_faltantes.get(
+                    cm, DadosFaltantesAeros("", 0, "0", encontrado_no_aeros=False)
+                ),
+            )
+            for cm, funcionario in self.funcionarios.items()
+        }
 
-        Abre um pandas.ExcelWriter para o caminho fornecido e escreve cada
-        `TrajetoriaSimulada` em uma planilha separada (nome = CM). As planilhas
-        são escritas em ordem crescente de CM.
+    def exporta_para_excel(
+        self,
+        caminho_excel: str,
+        servidores_por_arquivo: int | None = None,
+        processos: int | None = 1,
+    ) -> list[str]:
+        """Escreve todas as carreiras simuladas em arquivos Excel.
+
+        Cada `TrajetoriaSimulada` é escrita em uma planilha separada (nome = CM),
+        em ordem crescente de CM, com o leiaute de `modelo.xlsx`. As planilhas são
+        escritas em modo streaming (ver `ModeloReenquadramento`).
+
+        Com `servidores_por_arquivo`, as planilhas são divididas em vários arquivos
+        numerados (`resultado_1.xlsx`, `resultado_2.xlsx`, ...), escritos em até
+        `processos` processos paralelos (None usa todos os processadores).
+        Retorna os caminhos dos arquivos escritos.
         """
         # Garante que o diretório exista
         dirpath = os.path.dirname(caminho_excel)
         if dirpath:
             os.makedirs(dirpath, exist_ok=True)
 
-        # Procura pelo arquivo de modelo
-        possible_template = os.path.join(os.path.dirname(__file__), "modelo.xlsx")
-        if not os.path.exists(possible_template):
-            raise FileNotFoundError(f"Modelo não encontrado: {possible_template}")
-
-        # Abre planilha de modelo
-        template_wb = openpyxl.load_workbook(possible_template)
-        template_ws = template_wb[template_wb.sheetnames[0]]
-
-        for cm in sorted(self.trajetorias_simuladas.keys()):
-            carreira_simulada: TrajetoriaSimulada = self.trajetorias_simuladas[cm]
+        planilhas = [
+            (str(cm), self.trajetorias_simuladas[cm].celulas())
+            for cm in sorted(self.trajetorias_simuladas.keys())
+        ]
+        if not servidores_por_arquivo:
+            return [escreve_planilhas(caminho_excel, planilhas)]
+
+        grupos = [
+            planilhas[i : i + servidores_por_arquivo]
+            for i in range(0, len(planilhas), servidores_por_arquivo)
+        ]
+        raiz, extensao = os.path.splitext(caminho_excel)
+        caminhos = [f"{raiz}_{i}{extensao}" for i in range(1, len(grupos) + 1)]
+        processos = min(processos or os.cpu_count() or 1, len(grupos))
+        if processos <= 1:
+            return list(map(escreve_planilhas, caminhos, grupos))
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            return list(executor.map(escreve_planilhas, caminhos, grupos))
+
+    def exporta_tabela(self, caminho_excel: str) -> None:
+        """Escreve todas as carreiras simuladas em formato longo, em um único
+        arquivo Excel: a planilha "Progressões" tem uma linha por progressão
+        simulada de cada CM e a planilha "Resumo" o resultado de cada CM."""
+        dirpath = os.path.dirname(caminho_excel)
+        if dirpath:
+            os.makedirs(dirpath, exist_ok=True)
 
-            # Copia planilha de modelo
-            new_ws = template_wb.copy_worksheet(template_ws)
-            new_ws.title = str(cm)
+        linhas = []
+        for cm in sorted(self.trajetorias_simuladas):
+            trajetoria = self.trajetorias_simuladas[cm]
+            for progressao in trajetoria.progressoes:
+                linhas.append(
+                    {
+                        "CM": cm,
+                        "Nome": trajetoria.dados_faltantes_aeros.nome,
+                        "Data de admissão": trajetoria.funcionario.data_admissao,
+                        "Tempo sem efetivo exercício (dias)": (
+                            trajetoria.dados_faltantes_aeros.qtde_dias_licenca
+                        ),
+                        "Data": progressao.data,
+                        "Nível vertical": progressao.nivel.numero,
+                        "Nota média interstício": progressao.nota_avaliacao,
+                        "Progressão vertical especial": progressao.especial_concedida,
+                        "Nota média progressão especial": (
+                            progressao.nota_media_especial
+                        ),
+                    }
+                )
+        progressoes = pd.DataFrame(
+            linhas,
+            columns=[
+                "CM",
+                "Nome",
+                "Data de admissão",
+                "Tempo sem efetivo exercício (dias)",
+                "Data",
+                "Nível vertical",
+                "Nota média interstício",
+                "Progressão vertical especial",
+                "Nota média progressão especial",
+            ],
+        )
+        resumo = self.resumo({self.data_migracao: self.trajetorias_simuladas})
 
-            # Cria o writer
-            writer = SimpleNamespace(book=template_wb, sheets={})
-            writer.sheets[new_ws.title] = new_ws
+        with EscritorExcelStreaming(caminho_excel) as writer:
+            para_excel_formatado(progressoes, writer, sheet_name="Progressões")
+            para_excel_formatado(resumo, writer, sheet_name="Resumo")
 
-            carreira_simulada.escreve(writer)
 
-        # Salva uma cópia do workbook
-        template_wb.save(caminho_excel)
+class CalculaReenquadramento:
+    """Reenquadramento de um único funcionário, progressão a progressão.
 
+    `ReenquadramentoEmLote` aplica as mesmas regras a todos de uma vez."""
 
-class CalculaReenquadramento:
     def __init__(
         self,
         funcionario: Funcionario,
@@ -187,6 +359,8 @@ class CalculaReenquadramento:
         self.dados_faltantes_aeros = dados_faltantes_aeros
         self.indx_avaliacao = 0
         self.num_progressoes = 0
+        self.decisoes = []  # [DecisaoReenquadramento]
+        self._data_progressao = None  # Progressão em avaliação, para as decisões
 
     def calcula(self) -> TrajetoriaSimulada:
         """Calcula a carreira simulada de um funcionário."""
@@ -202,6 +376,7 @@ class CalculaReenquadramento:
         while progressao and progressao.data < self.data_migracao:
 
             prog_sim = self._converte_em_simulada(progressao)
+            self._data_progressao = progressao.data
 
             proxima_prog = self.funcionario.carreira.progride_verticalmente(progressao)
             nota = self._obtem_nota(proxima_prog)
@@ -243,9 +418,7 @@ class CalculaReenquadramento:
             media = (nota + nota_anterior) / 2
             if media >= 70:
                 return True, media
-            print(
-                f"CM {self.funcionario.cm}: Progressão especial não concedida, média {media} < 70"
-            )
+            self._registra(MotivoDecisao.ESPECIAL_NAO_CONCEDIDA, media)
             return False, media
         return False, None
 
@@ -300,11 +473,16 @@ class CalculaReenquadramento:
     def _qtde_progressoes(self, nota: int) -> int:
         """Retorna o número de progressões em um reenquadramento."""
         if nota < 60:
-            print(
-                f"CM {self.funcionario.cm}: Progressão não concedida: nota {nota} < 60"
-            )
+            self._registra(MotivoDecisao.PROGRESSAO_NAO_CONCEDIDA, nota)
             return 0
         if nota < 70:
-            print(f"CM {self.funcionario.cm}: Somente uma progressão: nota {nota} < 70")
+            self._registra(MotivoDecisao.SOMENTE_UMA_PROGRESSAO, nota)
             return 1
         return 2
+
+    def _registra(self, motivo: MotivoDecisao, nota: float) -> None:
+        self.decisoes.append(
+            DecisaoReenquadramento(
+                self.funcionario.cm, self._data_progressao, motivo, nota
+            )
+        )
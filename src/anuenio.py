@@ -1,5 +1,7 @@
+import calendar
 from datetime import date
 
+import numpy as np
 from dateutil.relativedelta import relativedelta
 
 
@@ -9,3 +11,36 @@ class Anuenio:
 
     def obtem_numero_anuenios_para(self, data: date) -> int:
         return relativedelta(data, self.data_inicio).years
+
+    @staticmethod
+    def numeros_anuenios_para(
+        datas_inicio: list[date | None], competencias: list[date]
+    ) -> np.ndarray:
+        """Calcula o número de anuênios de vários servidores em várias competências.
+
+        Retorna uma matriz (competências × servidores) com o mesmo resultado de
+        `obtem_numero_anuenios_para`, reproduzindo a contagem de meses do
+        `relativedelta`. Data de início None resulta em 0 anuênios."""
+
+        ano = np.array([c.year for c in competencias])[:, None]
+        mes = np.array([c.month for c in competencias])[:, None]
+        dia = np.array([c.day for c in competencias])[:, None]
+        dias_no_mes = np.array(
+            [calendar.monthrange(c.year, c.month)[1] for c in competencias]
+        )[:, None]
+
+        sem_inicio = np.array([d is None for d in datas_inicio], dtype=bool)
+        ano_inicio = np.array([d.year if d else 1 for d in datas_inicio])[None, :]
+        mes_inicio = np.array([d.month if d else 1 for d in datas_inicio])[None, :]
+        dia_inicio = np.array([d.day if d else 1 for d in datas_inicio])[None, :]
+
+        meses = (ano - ano_inicio) * 12 + (mes - mes_inicio)
+        # Dia da data de início somada aos meses, limitado ao fim do mês
+        dia_deslocado = np.minimum(dia_inicio, dias_no_mes)
+        posterior = (meses > 0) | ((meses == 0) & (dia >= dia_inicio))
+        meses = np.where(posterior & (dia < dia_deslocado), meses - 1, meses)
+        meses = np.where(~posterior & (dia > dia_deslocado), meses + 1, meses)
+
+        anos = np.sign(meses) * (np.abs(meses) // 12)
+        anos[:, sem_inicio] = 0
+        return anos
@@ -2,6 +2,7 @@ from dataclasses import dataclass
 from datetime import date
 from enum import Enum
 
+import numpy as np
 from dateutil.relativedelta import relativedelta
 
 IDADE_COMPULSORIA = 75
@@ -21,22 +22,44 @@ class DadosPrevidenciarios:
     tempo_sevico_publico: int
 
 
+@dataclass(frozen=True)
+class ParametrosAposentadoria:
+    """Idades, tempos de contribuição e pontos das regras de aposentadoria.
+
+    Os valores padrão são os das regras vigentes; outros valores permitem
+    simular variações das regras."""
+
+    idade_compulsoria: int = IDADE_COMPULSORIA
+    anos_contribuicao_masculino: int = 35
+    anos_contribuicao_feminino: int = 30
+    idade_minima_masculino: int = 60
+    idade_minima_feminino: int = 55
+    # Regra de transição de quem ingressou no serviço público antes de 1998
+    pontos_masculino: int = 95
+    pontos_feminino: int = 85
+
+
 class Aposentadoria:
     def __init__(
-        self, servidor: DadosPrevidenciarios, t_min_serv_pub: int, t_min_camara: int
+        self,
+        servidor: DadosPrevidenciarios,
+        t_min_serv_pub: int,
+        t_min_camara: int,
+        parametros: ParametrosAposentadoria | None = None,
     ) -> None:
         self.servidor = servidor
         self.T_MIN_SEV_PUB = t_min_serv_pub
         self.T_MIN_CAMARA = t_min_camara
+        self.parametros = parametros or ParametrosAposentadoria()
         self._data_aposentadoria = None
         self._compulsoria = None
 
         if servidor.sexo == Sexo.MASCULINO:
-            self.ANOS_CONTRIB = 35
-            self.IDADE_MINIMA = 60
+            self.ANOS_CONTRIB = self.parametros.anos_contribuicao_masculino
+            self.IDADE_MINIMA = self.parametros.idade_minima_masculino
         elif servidor.sexo == Sexo.FEMININO:
-            self.ANOS_CONTRIB = 30
-            self.IDADE_MINIMA = 55
+            self.ANOS_CONTRIB = self.parametros.anos_contribuicao_feminino
+            self.IDADE_MINIMA = self.parametros.idade_minima_feminino
 
     @property
     def data_aposentadoria(self) -> date:
@@ -54,12 +77,19 @@ class Aposentadoria:
     def data_compulsoria(self) -> date:
         return self._data_compulsoria()
 
-    def _calcula_aposentadoria(self):
-        data_completa_cond_aposentadoria = max(
+    def _data_completa_condicoes(self, t_min_serv_pub: int, t_min_camara: int) -> date:
+        """Data em que o servidor completa todas as condições, com os tempos mínimos
+        de serviço público e de Câmara informados."""
+        return max(
             self._data_por_tempo_contribuicao(),
             self._data_por_idade_minima(),
-            self._data_por_tempo_minimo_servico_publico(),
-            self._data_por_tempo_minimo_de_camara(),
+            self._data_por_tempo_minimo_servico_publico(t_min_serv_pub),
+            self._data_por_tempo_minimo_de_camara(t_min_camara),
+        )
+
+    def _calcula_aposentadoria(self):
+        data_completa_cond_aposentadoria = self._data_completa_condicoes(
+            self.T_MIN_SEV_PUB, self.T_MIN_CAMARA
         )
 
         compulsoria = self._data_compulsoria()
@@ -83,50 +113,76 @@ class Aposentadoria:
     def _data_por_idade_minima(self) -> date:
         return self.servidor.data_nascimento + relativedelta(years=self.IDADE_MINIMA)
 
-    def _data_por_tempo_minimo_servico_publico(self) -> date:
+    def _data_por_tempo_minimo_servico_publico(self, t_min_serv_pub: int) -> date:
         return (
             self.servidor.data_admissao
-            + relativedelta(years=self.T_MIN_SEV_PUB)
+            + relativedelta(years=t_min_serv_pub)
             - relativedelta(days=self.servidor.tempo_sevico_publico)
         )
 
-    def _data_por_tempo_minimo_de_camara(self) -> date:
-        return self.servidor.data_admissao + relativedelta(years=self.T_MIN_CAMARA)
+    def _data_por_tempo_minimo_de_camara(self, t_min_camara: int) -> date:
+        return self.servidor.data_admissao + relativedelta(years=t_min_camara)
 
     def _data_compulsoria(self) -> date:
-        return self.servidor.data_nascimento + relativedelta(years=IDADE_COMPULSORIA)
+        return self.servidor.data_nascimento + relativedelta(
+            years=self.parametros.idade_compulsoria
+        )
 
 
 class AposentadoriaAtual(Aposentadoria):
-    def __init__(self, servidor: DadosPrevidenciarios) -> None:
-        super().__init__(servidor, t_min_serv_pub=10, t_min_camara=5)
+    T_MIN_SEV_PUB = 10
+    T_MIN_CAMARA = 5
+
+    def __init__(
+        self,
+        servidor: DadosPrevidenciarios,
+        parametros: ParametrosAposentadoria | None = None,
+    ) -> None:
+        super().__init__(servidor, self.T_MIN_SEV_PUB, self.T_MIN_CAMARA, parametros)
 
 
 class AposentadoriaIntegral(Aposentadoria):
-    def __init__(self, servidor: DadosPrevidenciarios) -> None:
-        super().__init__(servidor, t_min_serv_pub=20, t_min_camara=10)
+    T_MIN_SEV_PUB = 20
+    T_MIN_CAMARA = 10
+
+    def __init__(
+        self,
+        servidor: DadosPrevidenciarios,
+        parametros: ParametrosAposentadoria | None = None,
+    ) -> None:
+        super().__init__(servidor, self.T_MIN_SEV_PUB, self.T_MIN_CAMARA, parametros)
 
 
 class AposentadoriaAntes98(Aposentadoria):
-    def __init__(self, servidor: DadosPrevidenciarios) -> None:
-        super().__init__(servidor, t_min_serv_pub=25, t_min_camara=15)
+    T_MIN_SEV_PUB = 25
+    T_MIN_CAMARA = 15
+
+    def __init__(
+        self,
+        servidor: DadosPrevidenciarios,
+        parametros: ParametrosAposentadoria | None = None,
+    ) -> None:
+        super().__init__(servidor, self.T_MIN_SEV_PUB, self.T_MIN_CAMARA, parametros)
         if servidor.sexo == Sexo.MASCULINO:
-            self.PONTOS = 95
+            self.PONTOS = self.parametros.pontos_masculino
         else:
-            self.PONTOS = 85
+            self.PONTOS = self.parametros.pontos_feminino
 
     def _calcula_aposentadoria(self):
         data_completa_cond_aposentadoria = max(
             self._data_por_regra_transicao(),
-            self._data_por_tempo_minimo_servico_publico(),
-            self._data_por_tempo_minimo_de_camara(),
+            self._data_por_tempo_minimo_servico_publico(self.T_MIN_SEV_PUB),
+            self._data_por_tempo_minimo_de_camara(self.T_MIN_CAMARA),
         )
 
         data_completa_cond_aposentadoria = min(
             data_completa_cond_aposentadoria,
             # Pode ser que a regra de transição dê uma data maior que a integral
             # (se o servidor tiver muito tempo averbado no serviço público).
-            AposentadoriaIntegral(self.servidor).data_aposentadoria,
+            self._data_completa_condicoes(
+                AposentadoriaIntegral.T_MIN_SEV_PUB, AposentadoriaIntegral.T_MIN_CAMARA
+            ),
+            self._data_compulsoria(),
         )
 
         compulsoria = self._data_compulsoria()
@@ -139,37 +195,18 @@ class AposentadoriaAntes98(Aposentadoria):
         self._compulsoria = False
         self._data_aposentadoria = data_completa_cond_aposentadoria
 
-    def _data_por_regra_transicao(self):
-        dtAdm = self.servidor.data_admissao
-        dtNascimento = self.servidor.data_nascimento
-        tempo_contrib_averbado = (
-            self.servidor.tempo_INSS + self.servidor.tempo_sevico_publico
+    def _data_por_regra_transicao(self) -> date:
+        servidor = self.servidor
+        datas = _datas_por_regra_transicao(
+            nascimento=np.array([servidor.data_nascimento], dtype="datetime64[D]"),
+            admissao=np.array([servidor.data_admissao], dtype="datetime64[D]"),
+            averbado=np.array(
+                [servidor.tempo_INSS + servidor.tempo_sevico_publico], dtype=int
+            ),
+            anos_contribuicao=np.array([self.ANOS_CONTRIB], dtype=int),
+            pontos=np.array([self.PONTOS], dtype=int),
         )
-
-        # Início: data que completa o tempo mínimo de contribuição
-        data_contrib = (
-            dtAdm
-            + relativedelta(years=self.ANOS_CONTRIB)
-            - relativedelta(days=tempo_contrib_averbado)
-        )
-        data_aniversario = date(data_contrib.year, dtNascimento.month, dtNascimento.day)
-
-        data = data_contrib
-        while True:
-            idade = relativedelta(data, dtNascimento).years
-            tempo_contrib = ((data - dtAdm).days + tempo_contrib_averbado) // 365
-            if idade + tempo_contrib >= self.PONTOS:
-                return data
-
-            # Escolhe a próxima data mais próxima (aniversário ou data de contribuição)
-            prox_data_contrib = data_contrib + relativedelta(years=1)
-            prox_data_aniversario = data_aniversario + relativedelta(years=1)
-            if prox_data_contrib < prox_data_aniversario:
-                data = prox_data_contrib
-                data_contrib += relativedelta(years=1)
-            else:
-                data = prox_data_aniversario
-                data_aniversario += relativedelta(years=1)
+        return datas[0].astype(object)
 
 
 def atribui_aposentadoria(funcionario: DadosPrevidenciarios) -> Aposentadoria:
@@ -184,3 +221,212 @@ def atribui_aposentadoria(funcionario: DadosPrevidenciarios) -> Aposentadoria:
         return AposentadoriaIntegral
     else:
         return AposentadoriaAtual
+
+
+# Cálculo em lote, sobre vetores de datas datetime64[D]
+
+
+def _componentes(datas: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Ano, mês e dia de cada data."""
+    meses = datas.astype("datetime64[M]")
+    dias = (datas - meses.astype("datetime64[D]")).astype(int) + 1
+    meses = meses.astype(int)
+    return meses // 12 + 1970, meses % 12 + 1, dias
+
+
+def _data(ano: np.ndarray, mes: np.ndarray, dia: np.ndarray) -> np.ndarray:
+    """Monta as datas, limitando o dia ao fim do mês como o `relativedelta`."""
+    inicio_mes = ((ano - 1970) * 12 + mes - 1).astype("datetime64[M]")
+    primeiro_dia = inicio_mes.astype("datetime64[D]")
+    dias_no_mes = ((inicio_mes + 1).astype("datetime64[D]") - primeiro_dia).astype(int)
+    return primeiro_dia + (np.minimum(dia, dias_no_mes) - 1)
+
+
+def _soma_anos(datas: np.ndarray, anos: np.ndarray) -> np.ndarray:
+    """Equivale a `data + relativedelta(years=anos)` para cada data."""
+    ano, mes, dia = _componentes(datas)
+    return _data(ano + anos, mes, dia)
+
+
+def _idade(datas: np.ndarray, nascimento: np.ndarray) -> np.ndarray:
+    """Idade em anos completos, como `relativedelta(data, nascimento).years`."""
+    ano, _, _ = _componentes(datas)
+    ano_nascimento, mes_nascimento, dia_nascimento = _componentes(nascimento)
+    aniversario = _data(ano, mes_nascimento, dia_nascimento)
+    return ano - ano_nascimento - (datas < aniversario)
+
+
+def _datas_por_regra_transicao(
+    nascimento: np.ndarray,
+    admissao: np.ndarray,
+    averbado: np.ndarray,
+    anos_contribuicao: np.ndarray,
+    pontos: np.ndarray,
+) -> np.ndarray:
+    """Primeira data em que idade + tempo de contribuição (em anos completos)
+    alcançam os pontos da regra de transição.
+
+    As datas candidatas são a data em que o servidor completa o tempo mínimo de
+    contribuição, os seus aniversários em anos seguintes e os aniversários dessa
+    data. Como os pontos nunca diminuem, a resposta é a menor candidata que
+    alcança os pontos: todas são avaliadas de uma vez, sem percorrê-las uma a
+    uma. Cada ano acrescenta ao menos 2 pontos (1 de idade e 1 de contribuição),
+    o que limita quantos anos de candidatas são necessários."""
+    if not len(nascimento):
+        return nascimento.copy()
+    nascimento = nascimento[:, None]
+    admissao = admissao[:, None]
+    averbado = averbado[:, None]
+    pontos = pontos[:, None]
+
+    def pontos_em(datas: np.ndarray) -> np.ndarray:
+        tempo_contribuicao = ((datas - admissao).astype(int) + averbado) // 365
+        return _idade(datas, nascimento) + tempo_contribuicao
+
+    data_contribuicao = _soma_anos(admissao, anos_contribuicao[:, None]) - averbado
+    ano_contribuicao, mes_contribuicao, dia_contribuicao = _componentes(
+        data_contribuicao
+    )
+    _, mes_nascimento, dia_nascimento = _componentes(nascimento)
+    # Datas em 29/02 passam a 28/02 ao somar anos e assim permanecem
+    dia_contribuicao_seguinte = np.where(
+        (mes_contribuicao == 2) & (dia_contribuicao == 29), 28, dia_contribuicao
+    )
+    dia_aniversario = np.where(
+        (mes_nascimento == 2) & (dia_nascimento == 29), 28, dia_nascimento
+    )
+
+    faltantes = np.maximum(pontos - pontos_em(data_contribuicao), 0)
+    num_anos = int(faltantes.max() + 1) // 2 + 1
+    while True:
+        anos = ano_contribuicao + np.arange(1, num_anos + 1)[None, :]
+        candidatas = np.concatenate(
+            [
+                data_contribuicao,
+                _data(anos, mes_contribuicao, dia_contribuicao_seguinte),
+                _data(anos, mes_nascimento, dia_aniversario),
+            ],
+            axis=1,
+        )
+        alcancam = pontos_em(candidatas) >= pontos
+        if alcancam.any(axis=1).all():
+            break
+        num_anos *= 2
+
+    sem_data = np.datetime64("9999-12-31")
+    return np.where(alcancam, candidatas, sem_data).min(axis=1)
+
+
+@dataclass
+class LoteAposentadorias:
+    """Datas de aposentadoria de vários servidores, na ordem recebida."""
+
+    datas: np.ndarray  # datetime64[D]
+    compulsoria: np.ndarray  # bool
+
+    def data(self, idx_servidor: int) -> date:
+        return self.datas[idx_servidor].astype(object)
+
+
+def calcula_aposentadorias(
+    servidores: list[DadosPrevidenciarios],
+    regras: type[Aposentadoria] | list[type[Aposentadoria]] | None = None,
+    parametros: ParametrosAposentadoria | None = None,
+) -> LoteAposentadorias:
+    """Versão em lote de `data_aposentadoria` e `compulsoria`, com o mesmo resultado
+    do cálculo de cada servidor.
+
+    `regras` é a regra de todos os servidores ou uma por servidor; sem `regras`,
+    cada servidor segue a regra de `atribui_aposentadoria`."""
+    parametros = parametros or ParametrosAposentadoria()
+    if regras is None:
+        regras = [atribui_aposentadoria(servidor) for servidor in servidores]
+    elif isinstance(regras, type):
+        regras = [regras] * len(servidores)
+
+    nascimento = np.array(
+        [servidor.data_nascimento for servidor in servidores], dtype="datetime64[D]"
+    )
+    admissao = np.array(
+        [servidor.data_admissao for servidor in servidores], dtype="datetime64[D]"
+    )
+    tempo_servico_publico = np.array(
+        [servidor.tempo_sevico_publico for servidor in servidores], dtype=int
+    )
+    averbado = tempo_servico_publico + np.array(
+        [servidor.tempo_INSS for servidor in servidores], dtype=int
+    )
+    masculino = np.array(
+        [servidor.sexo == Sexo.MASCULINO for servidor in servidores], dtype=bool
+    )
+    anos_contribuicao = np.where(
+        masculino,
+        parametros.anos_contribuicao_masculino,
+        parametros.anos_contribuicao_feminino,
+    )
+    idade_minima = np.where(
+        masculino, parametros.idade_minima_masculino, parametros.idade_minima_feminino
+    )
+    antes_98 = np.array(
+        [issubclass(regra, AposentadoriaAntes98) for regra in regras], dtype=bool
+    )
+
+    def por_tempo_minimo_servico_publico(anos) -> np.ndarray:
+        return _soma_anos(admissao, anos) - tempo_servico_publico
+
+    def por_tempo_minimo_de_camara(anos) -> np.ndarray:
+        return _soma_anos(admissao, anos)
+
+    por_contribuicao_e_idade = np.maximum(
+        _soma_anos(admissao, anos_contribuicao) - averbado,
+        _soma_anos(nascimento, idade_minima),
+    )
+    t_min_serv_pub = np.array([regra.T_MIN_SEV_PUB for regra in regras], dtype=int)
+    t_min_camara = np.array([regra.T_MIN_CAMARA for regra in regras], dtype=int)
+    datas = np.maximum.reduce(
+        [
+            por_contribuicao_e_idade,
+            por_tempo_minimo_servico_publico(t_min_serv_pub),
+            por_tempo_minimo_de_camara(t_min_camara),
+        ]
+    )
+    compulsoria = _soma_anos(nascimento, parametros.idade_compulsoria)
+
+    if antes_98.any():
+        transicao = np.full(len(servidores), np.datetime64("NaT"), "datetime64[D]")
+        transicao[antes_98] = _datas_por_regra_transicao(
+            nascimento[antes_98],
+            admissao[antes_98],
+            averbado[antes_98],
+            anos_contribuicao[antes_98],
+            np.where(
+                masculino, parametros.pontos_masculino, parametros.pontos_feminino
+            )[antes_98],
+        )
+        integral = np.maximum.reduce(
+            [
+                por_contribuicao_e_idade,
+                por_tempo_minimo_servico_publico(AposentadoriaIntegral.T_MIN_SEV_PUB),
+                por_tempo_minimo_de_camara(AposentadoriaIntegral.T_MIN_CAMARA),
+            ]
+        )
+        # Regra de transição, limitada pela integral, como em AposentadoriaAntes98
+        datas_antes_98 = np.minimum.reduce(
+            [
+                np.maximum.reduce(
+                    [
+                        transicao,
+                        por_tempo_minimo_servico_publico(t_min_serv_pub),
+                        por_tempo_minimo_de_camara(t_min_camara),
+                    ]
+                ),
+                integral,
+                compulsoria,
+            ]
+        )
+        datas = np.where(antes_98, datas_antes_98, datas)
+
+    e_compulsoria = datas > compulsoria
+    return LoteAposentadorias(
+        datas=np.where(e_compulsoria, compulsoria, datas), compulsoria=e_compulsoria
+    )
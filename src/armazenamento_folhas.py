@@ -0,0 +1,381 @@
+from abc import abstractmethod
+from collections.abc import Iterator, Mapping
+from datetime import date
+
+import numpy as np
+
+from src.folha import CAMPOS_VALORES, Folha, LoteFolhas
+from src.nivel import SEM_NIVEL, codifica_nivel, decodifica_nivel
+
+
+def codifica_niveis(niveis: np.ndarray, ativo: np.ndarray) -> np.ndarray:
+    """Codifica uma matriz de níveis; células inativas recebem SEM_NIVEL."""
+    codigos = np.full(ativo.shape, SEM_NIVEL, dtype=np.int16)
+    codigos[ativo] = [codifica_nivel(nivel) for nivel in niveis[ativo]]
+    return codigos
+
+
+def decodifica_niveis(codigos: np.ndarray, ativo: np.ndarray) -> np.ndarray:
+    """Inverso de `codifica_niveis`: matriz de Nivel, com None nas células inativas."""
+    niveis = np.full(ativo.shape, None, dtype=object)
+    if ativo.any():
+        niveis[ativo] = [decodifica_nivel(int(codigo)) for codigo in codigos[ativo]]
+    return niveis
+
+
+class ArmazenamentoFolhas(Mapping):
+    """Armazena as folhas de FolhasEfetivos.
+
+    Pode ser lido como um dicionário {competencia: {cm: Folha}}, que contém apenas
+    as competências com ao menos uma folha."""
+
+    @abstractmethod
+    def adiciona(self, competencia: date, cm: int, folha: Folha) -> None:
+        """Adiciona (ou substitui) a folha de um funcionário em uma competência."""
+
+    @abstractmethod
+    def adiciona_lote(self, lote: LoteFolhas) -> None:
+        """Adiciona as folhas ativas de um lote."""
+
+    @abstractmethod
+    def remove_servidor(self, cm: int) -> None:
+        """Remove todas as folhas de um funcionário."""
+
+    @abstractmethod
+    def soma(self, competencia: date, campos: tuple[str]) -> dict[str, float]:
+        """Soma os campos informados de todas as folhas de uma competência."""
+
+    def somas(self, campos: tuple[str]) -> tuple[list[date], np.ndarray]:
+        """Soma os campos informados em todas as competências de uma vez.
+
+        Retorna as competências e a matriz (competências × campos) das somas, com
+        o mesmo resultado de `soma` para cada competência."""
+        competencias = list(self)
+        somas = np.zeros((len(competencias), len(campos)))
+        for i, competencia in enumerate(competencias):
+            somas[i] = list(self.soma(competencia, campos).values())
+        return competencias, somas
+
+    @abstractmethod
+    def extrai(self, competencias: list[date], cms: list[int]) -> LoteFolhas:
+        """Extrai as folhas das competências e CMs informados em um lote."""
+
+    def cms(self) -> list[int]:
+        """CMs com folha armazenada, na ordem em que aparecem pela primeira vez."""
+        return list(
+            dict.fromkeys(cm for competencia in self for cm in self[competencia])
+        )
+
+
+class ArmazenamentoDicionario(ArmazenamentoFolhas):
+    """Armazena um objeto Folha por célula, em dicionários
+    {competencia: {cm: Folha}}."""
+
+    def __init__(self) -> None:
+        self._folhas = {}  # {competencia: {cm: Folha}}
+
+    def __getitem__(self, competencia: date) -> dict:
+        return self._folhas[competencia]
+
+    def __iter__(self) -> Iterator[date]:
+        return iter(self._folhas)
+
+    def __len__(self) -> int:
+        return len(self._folhas)
+
+    def adiciona(self, competencia: date, cm: int, folha: Folha) -> None:
+        if competencia not in self._folhas:
+            self._folhas[competencia] = {}
+        self._folhas[competencia][cm] = folha
+
+    def remove_servidor(self, cm: int) -> None:
+        for competencia in list(self._folhas):
+            self._folhas[competencia].pop(cm, None)
+            if not self._folhas[competencia]:
+                del self._folhas[competencia]
+
+    def adiciona_lote(self, lote: LoteFolhas) -> None:
+        for idx_servidor, cm in enumerate(lote.cms):
+            for idx_competencia, competencia in enumerate(lote.competencias):
+                folha = lote.folha(idx_competencia, idx_servidor)
+                if folha:
+                    self.adiciona(competencia, cm, folha)
+
+    def soma(self, competencia: date, campos: tuple[str]) -> dict[str, float]:
+        totais = {campo: 0.0 for campo in campos}
+        for folha in self._folhas.get(competencia, {}).values():
+            for campo in campos:
+                totais[campo] += getattr(folha, campo)
+        return totais
+
+    def extrai(self, competencias: list[date], cms: list[int]) -> LoteFolhas:
+        forma = (len(competencias), len(cms))
+        ativo = np.zeros(forma, dtype=bool)
+        niveis = np.full(forma, None, dtype=object)
+        valores = {campo: np.zeros(forma) for campo in CAMPOS_VALORES}
+        for i, competencia in enumerate(competencias):
+            folhas_competencia = self._folhas.get(competencia)
+            if not folhas_competencia:
+                continue
+            for j, cm in enumerate(cms):
+                folha = folhas_competencia.get(cm)
+                if folha is None:
+                    continue
+                ativo[i, j] = True
+                niveis[i, j] = folha.nivel
+                for campo in CAMPOS_VALORES:
+                    valores[campo][i, j] = getattr(folha, campo)
+        return LoteFolhas(
+            competencias=list(competencias),
+            cms=list(cms),
+            ativo=ativo,
+            niveis=niveis,
+            **valores,
+        )
+
+
+class _FolhasDaCompetencia(Mapping):
+    """Visão {cm: Folha} de uma competência do armazenamento colunar.
+
+    As folhas são montadas somente quando acessadas."""
+
+    def __init__(self, armazenamento: "ArmazenamentoColunar", linha: int) -> None:
+        self._armazenamento = armazenamento
+        self._linha = linha
+
+    def __getitem__(self, cm: int) -> Folha:
+        coluna = self._armazenamento._colunas.get(cm)
+        if coluna is None or not self._armazenamento._ativo[self._linha, coluna]:
+            raise KeyError(cm)
+        return self._armazenamento._folha(self._linha, coluna)
+
+    def __contains__(self, cm: object) -> bool:
+        coluna = self._armazenamento._colunas.get(cm)
+        return coluna is not None and bool(
+            self._armazenamento._ativo[self._linha, coluna]
+        )
+
+    def __iter__(self) -> Iterator[int]:
+        ativo = self._armazenamento._ativo[self._linha]
+        for cm, coluna in self._armazenamento._colunas.items():
+            if ativo[coluna]:
+                yield cm
+
+    def __len__(self) -> int:
+        return int(self._armazenamento._ativo[self._linha].sum())
+
+
+class ArmazenamentoColunar(ArmazenamentoFolhas):
+    """Armazena as folhas em matrizes densas (competências × servidores).
+
+    Cada campo numérico é uma matriz float64 e o nível é guardado como um código
+    inteiro (número × quantidade de letras + índice da letra). As matrizes crescem
+    por duplicação conforme novas competências e CMs são adicionados."""
+
+    SEM_NIVEL = SEM_NIVEL
+
+    def __init__(self, capacidade_linhas: int = 12, capacidade_colunas: int = 16):
+        capacidade_linhas = max(capacidade_linhas, 1)
+        capacidade_colunas = max(capacidade_colunas, 1)
+        self._linhas = {}  # {competencia: linha}
+        self._colunas = {}  # {cm: coluna}
+        self._ativo = np.zeros((capacidade_linhas, capacidade_colunas), dtype=bool)
+        self._niveis = np.full(
+            (capacidade_linhas, capacidade_colunas), self.SEM_NIVEL, dtype=np.int16
+        )
+        self._valores = {
+            campo: np.zeros((capacidade_linhas, capacidade_colunas))
+            for campo in CAMPOS_VALORES
+        }
+
+    @classmethod
+    def de_matrizes(
+        cls,
+        competencias: list[date],
+        cms: list[int],
+        ativo: np.ndarray,
+        niveis: np.ndarray,
+        valores: dict[str, np.ndarray],
+    ) -> "ArmazenamentoColunar":
+        """Cria o armazenamento sobre matrizes já prontas (competências × CMs),
+        sem copiá-las: `niveis` já codificados (SEM_NIVEL nas células inativas) e
+        um valor por campo de CAMPOS_VALORES, com 0.0 nas células inativas.
+
+        As matrizes podem ser memory-maps; para que o armazenamento continue
+        alterável, devem aceitar escrita (por exemplo, `mmap_mode="c"`). Toda
+        competência informada deve ter ao menos uma folha ativa."""
+        armazenamento = cls(capacidade_linhas=1, capacidade_colunas=1)
+        armazenamento._linhas = {
+            competencia: linha for linha, competencia in enumerate(competencias)
+        }
+        armazenamento._colunas = {cm: coluna for coluna, cm in enumerate(cms)}
+        armazenamento._ativo = ativo
+        armazenamento._niveis = niveis
+        armazenamento._valores = {campo: valores[campo] for campo in CAMPOS_VALORES}
+        return armazenamento
+
+    # Leitura como dicionário
+
+    def __getitem__(self, competencia: date) -> _FolhasDaCompetencia:
+        return _FolhasDaCompetencia(self, self._linhas[competencia])
+
+    def __contains__(self, competencia: object) -> bool:
+        return competencia in self._linhas
+
+    def __iter__(self) -> Iterator[date]:
+        return iter(self._linhas)
+
+    def __len__(self) -> int:
+        return len(self._linhas)
+
+    # Escrita
+
+    def adiciona(self, competencia: date, cm: int, folha: Folha) -> None:
+        linha = self._linha(competencia)
+        coluna = self._coluna(cm)
+        self._ativo[linha, coluna] = True
+        self._niveis[linha, coluna] = codifica_nivel(folha.nivel)
+        for campo in CAMPOS_VALORES:
+            self._valores[campo][linha, coluna] = getattr(folha, campo)
+
+    def adiciona_lote(self, lote: LoteFolhas) -> None:
+        # Somente competências com alguma folha passam a existir no armazenamento
+        idx_competencias = np.flatnonzero(lote.ativo.any(axis=1))
+        if len(idx_competencias) == 0:
+            return
+        colunas = np.array([self._coluna(cm) for cm in lote.cms])
+        linhas = np.array([self._linha(lote.competencias[i]) for i in idx_competencias])
+        destino = np.ix_(linhas, colunas)
+
+        ativo = lote.ativo[idx_competencias]
+        self._ativo[destino] |= ativo
+        codigos = codifica_niveis(lote.niveis[idx_competencias], ativo)
+        self._niveis[destino] = np.where(ativo, codigos, self._niveis[destino])
+        for campo in CAMPOS_VALORES:
+            valores = getattr(lote, campo)[idx_competencias]
+            self._valores[campo][destino] = np.where(
+                ativo, valores, self._valores[campo][destino]
+            )
+
+    def remove_servidor(self, cm: int) -> None:
+        """Remove as folhas do funcionário. A coluna continua reservada ao CM, para
+        que ele mantenha a sua posição na soma se voltar a ser adicionado."""
+        coluna = self._colunas.get(cm)
+        if coluna is None:
+            return
+        self._ativo[:, coluna] = False
+        self._niveis[:, coluna] = self.SEM_NIVEL
+        for matriz in self._valores.values():
+            matriz[:, coluna] = 0.0
+
+        # Competências que ficaram sem folhas deixam de existir
+        num_linhas = len(self._linhas)
+        mantidas = np.flatnonzero(self._ativo[:num_linhas].any(axis=1))
+        if len(mantidas) == num_linhas:
+            return
+        competencias = list(self._linhas)
+        self._linhas = {competencias[linha]: i for i, linha in enumerate(mantidas)}
+
+        def compacta(matriz: np.ndarray, preenchimento) -> np.ndarray:
+            nova = np.full(matriz.shape, preenchimento, matriz.dtype)
+            nova[: len(mantidas)] = matriz[mantidas]
+            return nova
+
+        self._ativo = compacta(self._ativo, False)
+        self._niveis = compacta(self._niveis, self.SEM_NIVEL)
+        self._valores = {
+            campo: compacta(matriz, 0.0) for campo, matriz in self._valores.items()
+        }
+
+    # Consultas
+
+    def cms(self) -> list[int]:
+        """CMs na ordem das colunas, que é a ordem em que `soma` os percorre.
+        CMs removidos, sem nenhuma folha, não são incluídos."""
+        num_linhas, num_colunas = len(self._linhas), len(self._colunas)
+        com_folha = self._ativo[:num_linhas, :num_colunas].any(axis=0)
+        return [cm for cm, coluna in self._colunas.items() if com_folha[coluna]]
+
+    def soma(self, competencia: date, campos: tuple[str]) -> dict[str, float]:
+        linha = self._linhas.get(competencia)
+        if linha is None:
+            return {campo: 0.0 for campo in campos}
+        num_colunas = len(self._colunas)
+        # Soma acumulada sequencial: mesma ordem de soma que o laço por folha
+        return {
+            campo: float(np.cumsum(self._valores[campo][linha, :num_colunas])[-1])
+            for campo in campos
+        }
+
+    def somas(self, campos: tuple[str]) -> tuple[list[date], np.ndarray]:
+        competencias = list(self._linhas)
+        num_linhas, num_colunas = len(competencias), len(self._colunas)
+        if not num_linhas or not num_colunas:
+            return competencias, np.zeros((num_linhas, len(campos)))
+        # Soma acumulada ao longo de cada linha: mesma ordem de soma que `soma`
+        somas = [
+            np.cumsum(self._valores[campo][:num_linhas, :num_colunas], axis=1)[:, -1]
+            for campo in campos
+        ]
+        return competencias, np.column_stack(somas)
+
+    def extrai(self, competencias: list[date], cms: list[int]) -> LoteFolhas:
+        linhas = np.array([self._linhas.get(c, -1) for c in competencias], dtype=int)
+        colunas = np.array([self._colunas.get(cm, -1) for cm in cms], dtype=int)
+        existe = (linhas >= 0)[:, None] & (colunas >= 0)[None, :]
+        origem = np.ix_(np.maximum(linhas, 0), np.maximum(colunas, 0))
+
+        ativo = existe & self._ativo[origem]
+        niveis = decodifica_niveis(self._niveis[origem], ativo)
+        valores = {
+            campo: np.where(ativo, self._valores[campo][origem], 0.0)
+            for campo in CAMPOS_VALORES
+        }
+        return LoteFolhas(
+            competencias=list(competencias),
+            cms=list(cms),
+            ativo=ativo,
+            niveis=niveis,
+            **valores,
+        )
+
+    # Auxiliares
+
+    def _folha(self, linha: int, coluna: int) -> Folha:
+        return Folha(
+            nivel=decodifica_nivel(int(self._niveis[linha, coluna])),
+            **{
+                campo: float(self._valores[campo][linha, coluna])
+                for campo in CAMPOS_VALORES
+            },
+        )
+
+    def _linha(self, competencia: date) -> int:
+        if competencia not in self._linhas:
+            if len(self._linhas) == self._ativo.shape[0]:
+                self._redimensiona(
+                    max(2 * self._ativo.shape[0], 1), self._ativo.shape[1]
+                )
+            self._linhas[competencia] = len(self._linhas)
+        return self._linhas[competencia]
+
+    def _coluna(self, cm: int) -> int:
+        if cm not in self._colunas:
+            if len(self._colunas) == self._ativo.shape[1]:
+                self._redimensiona(
+                    self._ativo.shape[0], max(2 * self._ativo.shape[1], 1)
+                )
+            self._colunas[cm] = len(self._colunas)
+        return self._colunas[cm]
+
+    def _redimensiona(self, num_linhas: int, num_colunas: int) -> None:
+        def copia(matriz: np.ndarray, preenchimento) -> np.ndarray:
+            nova = np.full((num_linhas, num_colunas), preenchimento, matriz.dtype)
+            nova[: matriz.shape[0], : matriz.shape[1]] = matriz
+            return nova
+
+        self._ativo = copia(self._ativo, False)
+        self._niveis = copia(self._niveis, self.SEM_NIVEL)
+        self._valores = {
+            campo: copia(matriz, 0.0) for campo, matriz in self._valores.items()
+        }
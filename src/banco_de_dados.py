@@ -1,30 +1,163 @@
-import psycopg2
+import atexit
+import hashlib
 import json
-import pandas as pd
 import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from functools import lru_cache
+
+import pandas as pd
+import psycopg2
+
+
+@lru_cache(maxsize=None)
+def _le_dados_conexao(config_path: str) -> tuple:
+    with open(config_path, "r") as f:
+        return tuple(json.load(f).items())
+
+
+class PoolConexoes:
+    """Mantém conexões abertas para reaproveitá-las entre consultas.
+
+    Uma conexão que falhar durante o uso é descartada em vez de devolvida."""
+
+    def __init__(self, conecta, dados_conexao: dict, max_conexoes_livres: int = 4):
+        self.conecta = conecta
+        self.dados_conexao = dados_conexao
+        self.max_conexoes_livres = max_conexoes_livres
+        self._livres = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def conexao(self):
+        with self._lock:
+            conn = self._livres.pop() if self._livres else None
+        if conn is None:
+            conn = self.conecta(**self.dados_conexao)
+        try:
+            yield conn
+            conn.rollback()  # encerra a transação aberta pela consulta
+        except Exception:
+            conn.close()
+            raise
+        with self._lock:
+            if len(self._livres) < self.max_conexoes_livres:
+                self._livres.append(conn)
+                return
+        conn.close()
+
+    def fecha(self) -> None:
+        with self._lock:
+            livres, self._livres = self._livres, []
+        for conn in livres:
+            conn.close()
+
+
+class CacheConsultas:
+    """Cache em disco dos resultados de consultas, válido por um tempo limitado.
+
+    A chave é o texto da consulta e a identificação do banco (sem a senha)."""
+
+    def __init__(self, diretorio: str, validade: timedelta = timedelta(days=1)):
+        self.diretorio = diretorio
+        self.validade = validade
+
+    @staticmethod
+    def chave(SQL: str, dados_conexao: dict) -> str:
+        identificacao = {k: v for k, v in dados_conexao.items() if k != "password"}
+        conteudo = json.dumps([SQL, identificacao], sort_keys=True, default=str)
+        return hashlib.sha256(conteudo.encode()).hexdigest()
+
+    def _caminho(self, chave: str) -> str:
+        return os.path.join(self.diretorio, f"{chave}.pkl")
+
+    def obtem(self, chave: str) -> pd.DataFrame | None:
+        """Retorna o resultado salvo, ou None se não existir ou estiver vencido."""
+        caminho = self._caminho(chave)
+        try:
+            idade = time.time() - os.path.getmtime(caminho)
+        except OSError:
+            return None
+        if idade > self.validade.total_seconds():
+            return None
+        return pd.read_pickle(caminho)
+
+    def salva(self, chave: str, resultado: pd.DataFrame) -> None:
+        os.makedirs(self.diretorio, exist_ok=True)
+        temporario = f"{self._caminho(chave)}.{os.getpid()}.tmp"
+        resultado.to_pickle(temporario)
+        os.replace(temporario, self._caminho(chave))
 
 
 class BancoDeDados:
-    def __init__(self, config_path="db_config.json", sql_dir="sql"):
-        """Inicializa a classe do banco de dados."""
-        with open(config_path, "r") as f:
-            self.dados_conexao = json.load(f)
+    # Compartilhados por todas as instâncias: um pool por banco e o cache de
+    # consultas configurado em `configura_cache` (desligado por padrão)
+    _pools = {}  # {(conecta, dados_conexao): PoolConexoes}
+    _lock_pools = threading.Lock()
+    cache: CacheConsultas | None = None
+
+    def __init__(self, config_path="db_config.json", sql_dir="sql", conecta=None):
+        """Inicializa a classe do banco de dados.
+
+        A configuração é lida uma única vez por arquivo e as conexões são
+        reaproveitadas entre instâncias. `conecta` permite trocar o driver
+        (padrão `psycopg2.connect`)."""
+        self.dados_conexao = dict(_le_dados_conexao(config_path))
         self.sql_dir = sql_dir
+        self.conecta = conecta or psycopg2.connect
+
+    @classmethod
+    def configura_cache(
+        cls, diretorio: str | None, validade: timedelta = timedelta(days=1)
+    ) -> None:
+        """Liga o cache em disco das consultas de arquivo, ou o desliga com None."""
+        cls.cache = CacheConsultas(diretorio, validade) if diretorio else None
+
+    @classmethod
+    def fecha_conexoes(cls) -> None:
+        with cls._lock_pools:
+            pools, cls._pools = cls._pools, {}
+        for pool in pools.values():
+            pool.fecha()
+
+    def _pool(self) -> PoolConexoes:
+        chave = (self.conecta, tuple(sorted(self.dados_conexao.items())))
+        with self._lock_pools:
+            if chave not in self._pools:
+                self._pools[chave] = PoolConexoes(self.conecta, self.dados_conexao)
+            return self._pools[chave]
 
     def realiza_consulta(self, SQL: str) -> pd.DataFrame:
         """Realiza uma consulta SQL e retorna os resultados como um DataFrame do pandas."""
-        conn = psycopg2.connect(**self.dados_conexao)
-        cur = conn.cursor()
-        cur.execute(SQL)
-        columns = [desc[0] for desc in cur.description]
-        results = cur.fetchall()
-        cur.close()
-        conn.close()
+        with self._pool().conexao() as conn:
+            cur = conn.cursor()
+            cur.execute(SQL)
+            columns = [desc[0] for desc in cur.description]
+            results = cur.fetchall()
+            cur.close()
         return pd.DataFrame(results, columns=columns)
 
     def realiza_consulta_arquivo(self, sql_filename: str) -> pd.DataFrame:
-        """Realiza uma consulta SQL a partir de um arquivo e retorna os resultados como DataFrame."""
+        """Realiza uma consulta SQL a partir de um arquivo e retorna os resultados como DataFrame.
+
+        Com o cache ligado, um resultado ainda válido para o mesmo conteúdo do
+        arquivo é reaproveitado sem acessar o banco."""
         sql_path = os.path.join(self.sql_dir, sql_filename)
         with open(sql_path, "r", encoding="utf-8") as f:
             sql_query = f.read()
-        return self.realiza_consulta(sql_query)
+
+        cache = self.cache
+        if cache is None:
+            return self.realiza_consulta(sql_query)
+
+        chave = cache.chave(sql_query, self.dados_conexao)
+        resultado = cache.obtem(chave)
+        if resultado is None:
+            resultado = self.realiza_consulta(sql_query)
+            cache.salva(chave, resultado)
+        return resultado
+
+
+atexit.register(BancoDeDados.fecha_conexoes)
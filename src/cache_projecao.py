@@ -0,0 +1,169 @@
+import dataclasses
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+from datetime import date
+from enum import Enum
+
+import numpy as np
+
+import config
+from src.armazenamento_folhas import ArmazenamentoColunar, codifica_niveis
+from src.folha import CAMPOS_VALORES
+from src.progressoes_horizontais import ProgressoesHorizontais
+
+VERSAO_CACHE = 5
+
+
+class CacheProjecao:
+    """Cache em disco de uma projeção calculada ou importada (folhas, PIAs e
+    funcionários).
+
+    Cada entrada é um diretório identificado por uma chave. As folhas ficam em
+    matrizes `.npy` (competências × servidores), uma por campo, com os níveis
+    codificados. Na leitura, as matrizes são abertas por memory-map e adotadas
+    diretamente pelo `ArmazenamentoColunar`, sem cópia nem conversão célula a
+    célula (ver `ArmazenamentoColunar.de_matrizes`). Os funcionários, com suas
+    progressões, ficam em um pickle.
+
+    A chave é o hash da planilha de projeção, de `config.param` e dos extras
+    informados. Quando a projeção é recalculada, os extras devem incluir as
+    letras adquiridas (ver `resumo_progressoes`) e a data do cálculo, que define
+    os reajustes da `Tabela`; as licenças lidas do banco não fazem parte da
+    chave."""
+
+    def __init__(self, diretorio: str) -> None:
+        self.diretorio = diretorio
+
+    @staticmethod
+    def chave(caminho_excel: str, param: config.Parametros, *extras) -> str:
+        """Calcula a chave do cache a partir da planilha, dos parâmetros e de
+        quaisquer valores extras que influenciem a projeção (ex.: anos)."""
+        hash_ = hashlib.sha256()
+        hash_.update(f"versao={VERSAO_CACHE}".encode())
+        with open(caminho_excel, "rb") as arquivo:
+            for bloco in iter(lambda: arquivo.read(1 << 20), b""):
+                hash_.update(bloco)
+
+        def serializa(valor):
+            return valor.value if isinstance(valor, Enum) else str(valor)
+
+        hash_.update(
+            json.dumps(
+                [dataclasses.asdict(param), list(extras)],
+                sort_keys=True,
+                default=serializa,
+            ).encode()
+        )
+        return hash_.hexdigest()
+
+    @staticmethod
+    def resumo_progressoes(progressoes: ProgressoesHorizontais) -> str:
+        """Hash das letras adquiridas e do nível atual de cada servidor, usados
+        pelas progressões recalculadas, para compor a chave."""
+        return hashlib.sha256(
+            json.dumps(
+                [
+                    sorted(progressoes.letras_adquiridas.items()),
+                    sorted(progressoes.nivel_atual.items()),
+                ]
+            ).encode()
+        ).hexdigest()
+
+    def caminho(self, chave: str) -> str:
+        return os.path.join(self.diretorio, chave)
+
+    def existe(self, chave: str) -> bool:
+        return os.path.isdir(self.caminho(chave))
+
+    def salva(self, chave: str, cmbh) -> None:
+        """Salva a projeção do CMBH. Uma entrada já existente não é sobrescrita."""
+        if self.existe(chave):
+            return
+        os.makedirs(self.diretorio, exist_ok=True)
+        # Escreve em um diretório temporário e renomeia ao final, para que uma
+        # escrita interrompida nunca deixe uma entrada incompleta
+        temporario = tempfile.mkdtemp(prefix=f".{chave}-", dir=self.diretorio)
+        try:
+            self._escreve(temporario, cmbh)
+            os.rename(temporario, self.caminho(chave))
+        except OSError:
+            shutil.rmtree(temporario, ignore_errors=True)
+            if not self.existe(chave):  # outro processo pode ter salvo antes
+                raise
+
+    def carrega(self, chave: str):
+        """Carrega a projeção salva em um novo CMBH, ou retorna None se não houver.
+
+        As folhas ficam nos memory-maps em modo copy-on-write: só são lidas do
+        disco quando consultadas, e alterações posteriores não mudam o cache."""
+        from src.cmbh import CMBH  # Evita importação circular
+
+        if not self.existe(chave):
+            return None
+        caminho = self.caminho(chave)
+
+        def le(nome: str) -> np.ndarray:
+            return np.load(os.path.join(caminho, f"{nome}.npy"), mmap_mode="c")
+
+        cmbh = CMBH()
+        with open(os.path.join(caminho, "funcionarios.pkl"), "rb") as arquivo:
+            cmbh.funcionarios = pickle.load(arquivo)
+
+        cmbh.folhas_efetivos.folhas = ArmazenamentoColunar.de_matrizes(
+            competencias=_para_datas(le("competencias")),
+            cms=le("cms").tolist(),
+            ativo=le("ativo"),
+            niveis=le("niveis"),
+            valores={campo: le(campo) for campo in CAMPOS_VALORES},
+        )
+        cmbh.folhas_efetivos.servidores = set(le("servidores").tolist())
+
+        for competencia, cm, pia in zip(
+            _para_datas(le("pias_competencias")),
+            le("pias_cms").tolist(),
+            le("pias_valores").tolist(),
+        ):
+            cmbh.folhas_pia.adiciona_pia(competencia, cm, pia)
+        return cmbh
+
+    def _escreve(self, caminho: str, cmbh) -> None:
+        def escreve(nome: str, valores: np.ndarray) -> None:
+            np.save(os.path.join(caminho, f"{nome}.npy"), valores)
+
+        folhas = cmbh.folhas_efetivos.folhas
+        competencias = list(folhas)
+        cms = folhas.cms()
+        lote = folhas.extrai(competencias, cms)
+        escreve("competencias", np.array(competencias, dtype="datetime64[D]"))
+        escreve("cms", np.array(cms, dtype=np.int64))
+        escreve("ativo", lote.ativo)
+        escreve("niveis", codifica_niveis(lote.niveis, lote.ativo))
+        for campo in CAMPOS_VALORES:
+            escreve(campo, getattr(lote, campo))
+        escreve(
+            "servidores",
+            np.array(sorted(cmbh.folhas_efetivos.servidores), dtype=np.int64),
+        )
+
+        pias = [
+            (competencia, cm, valor)
+            for competencia, pias_competencia in cmbh.folhas_pia.pias.items()
+            for cm, valor in pias_competencia.items()
+        ]
+        escreve(
+            "pias_competencias",
+            np.array([p[0] for p in pias], dtype="datetime64[D]"),
+        )
+        escreve("pias_cms", np.array([p[1] for p in pias], dtype=np.int64))
+        escreve("pias_valores", np.array([p[2] for p in pias], dtype=float))
+
+        with open(os.path.join(caminho, "funcionarios.pkl"), "wb") as arquivo:
+            pickle.dump(cmbh.funcionarios, arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _para_datas(datas: np.ndarray) -> list[date]:
+    return datas.astype(object).tolist()
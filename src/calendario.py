@@ -0,0 +1,53 @@
+from datetime import date
+from functools import lru_cache
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+
+
+class CalendarioCompetencias:
+    """Sequência mensal de competências entre duas datas, incluindo apenas até 'fim'.
+
+    Deve ser obtido por `CalendarioCompetencias.para`, que reaproveita a mesma
+    instância para o mesmo intervalo. Por ser compartilhado, não deve ser alterado."""
+
+    def __init__(self, inicio: date, fim: date) -> None:
+        datas = []
+        atual = inicio
+        while atual <= fim:
+            datas.append(atual)
+            atual += relativedelta(months=1)
+
+        self.inicio = inicio
+        self.fim = fim
+        self.datas: tuple[date, ...] = tuple(datas)
+        self.rotulos: tuple[str, ...] = tuple(
+            f"{data.year:04d}-{data.month:02d}" for data in datas
+        )
+        self.anos = np.array([data.year for data in datas], dtype=int)
+        self.meses = np.array([data.month for data in datas], dtype=int)
+        self.anos.flags.writeable = False
+        self.meses.flags.writeable = False
+        self._indices = {data: i for i, data in enumerate(datas)}
+
+    @classmethod
+    @lru_cache(maxsize=128)
+    def para(cls, inicio: date, fim: date) -> "CalendarioCompetencias":
+        """Retorna o calendário do intervalo, criando-o somente na primeira vez."""
+        return cls(inicio, fim)
+
+    def indice(self, competencia: date) -> int | None:
+        """Retorna a posição da competência no calendário, ou None se não pertencer."""
+        return self._indices.get(competencia)
+
+    def __len__(self) -> int:
+        return len(self.datas)
+
+    def __iter__(self):
+        return iter(self.datas)
+
+    def __getitem__(self, posicao: int) -> date:
+        return self.datas[posicao]
+
+    def __contains__(self, competencia: object) -> bool:
+        return competencia in self._indices
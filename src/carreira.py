@@ -1,4 +1,6 @@
+import calendar
 from abc import ABC
+from collections.abc import Iterator
 from dataclasses import dataclass
 from datetime import date
 from typing import Optional
@@ -17,7 +19,32 @@ class Progressao:
     progs_sem_especial: int = 0
 
 
+# Passo de uma trajetória:
+# (meses desde a progressão anterior, nível, progs_sem_especial)
+PassoTrajetoria = tuple[int, Nivel, int]
+
+# Data de referência para montar as tabelas de trajetória. Por ser dia 1o, somar
+# meses a ela nunca ajusta o dia e a diferença entre datas dá os meses exatos.
+_DATA_REFERENCIA = date(2000, 1, 1)
+
+# Toda progressão sobe ao menos um nível e nenhuma carreira passa do nível 48, então
+# as trajetórias reais cabem nesse número de passos
+MAX_PASSOS_TRAJETORIA = 48
+
+
+def _soma_meses(data: date, meses: int) -> date:
+    """Equivale a `data + relativedelta(months=meses)`."""
+    ano, mes = divmod(data.year * 12 + data.month - 1 + meses, 12)
+    dia = min(data.day, calendar.monthrange(ano, mes + 1)[1])
+    return date(ano, mes + 1, dia)
+
+
 class Carreira(ABC):
+    # Trajetórias já calculadas, compartilhadas por todas as instâncias:
+    # {(carreira, interstício, número, letra, progs_sem_especial, letra máxima):
+    #  (passos, completa)}
+    _trajetorias: dict[tuple, tuple[tuple[PassoTrajetoria, ...], bool]] = {}
+
     def __init__(self, intersticio: Intersticio = None) -> None:
         self.intersticio = intersticio
 
@@ -89,6 +116,68 @@ class Carreira(ABC):
             progressao.data, nivel_com_letras, progressao.progs_sem_especial
         )
 
+    def trajetoria(
+        self, ultima_progressao: Progressao, letra_maxima: str = None
+    ) -> Iterator[Progressao]:
+        """Gera as progressões seguintes a `ultima_progressao` até o fim da carreira,
+        as mesmas obtidas chamando `progride_verticalmente_e_horizontalmente`
+        repetidamente.
+
+        A sequência de níveis e interstícios depende apenas do nível,
+        `progs_sem_especial` e letra máxima de partida, então é calculada uma
+        única vez por carreira e reaproveitada; só as datas são geradas aqui."""
+        chave = (
+            type(self),
+            type(self.intersticio),
+            ultima_progressao.nivel.numero,
+            ultima_progressao.nivel.letra,
+            ultima_progressao.progs_sem_especial,
+            letra_maxima,
+        )
+        if chave not in self._trajetorias:
+            self._trajetorias[chave] = self._calcula_trajetoria(
+                ultima_progressao, letra_maxima
+            )
+        passos, completa = self._trajetorias[chave]
+
+        progressao = ultima_progressao
+        for meses, nivel, progs_sem_especial in passos:
+            progressao = Progressao(
+                _soma_meses(progressao.data, meses), nivel, progs_sem_especial
+            )
+            yield progressao
+
+        # Carreira sem fim dentro do limite de passos: segue progressão a progressão
+        while not completa and progressao:
+            progressao = self.progride_verticalmente_e_horizontalmente(
+                progressao, letra_maxima=letra_maxima
+            )
+            if progressao:
+                yield progressao
+
+    def _calcula_trajetoria(
+        self, ultima_progressao: Progressao, letra_maxima: str = None
+    ) -> tuple[tuple[PassoTrajetoria, ...], bool]:
+        """Calcula os passos da trajetória e se ela chegou ao fim da carreira."""
+        passos = []
+        progressao = Progressao(
+            _DATA_REFERENCIA,
+            ultima_progressao.nivel,
+            ultima_progressao.progs_sem_especial,
+        )
+        while len(passos) < MAX_PASSOS_TRAJETORIA:
+            anterior = progressao
+            progressao = self.progride_verticalmente_e_horizontalmente(
+                anterior, letra_maxima=letra_maxima
+            )
+            if not progressao:
+                return tuple(passos), True
+            meses = (progressao.data.year - anterior.data.year) * 12 + (
+                progressao.data.month - anterior.data.month
+            )
+            passos.append((meses, progressao.nivel, progressao.progs_sem_especial))
+        return tuple(passos), False
+
     def concede_letras_ate_limite(self, nivel_origem: Nivel) -> Nivel:
         """Concede progressões horizontais até o máximo permitido por aquele nível
         vertical."""
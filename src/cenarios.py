@@ -0,0 +1,295 @@
+import copy
+import dataclasses
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date
+from enum import Enum
+from functools import partial
+
+import pandas as pd
+
+import config
+from src.cmbh import CMBH
+from src.exportador_excel import EscritorExcelStreaming, para_excel_formatado
+from src.folha import CalculaFolha
+from src.folhas_efetivos import FolhasEfetivos
+from src.folhas_pia import FolhasPIA
+from src.funcionario import Funcionario
+from src.pia import CalculaPIA
+from src.progressoes_horizontais import progressoes_horizontais
+from src.projecao_paralela import _inicializa_processo
+from src.tabela_salario import Tabela
+
+# Colunas somadas no custo total de cada cenário, na planilha comparativa
+COLUNAS_CUSTO_TOTAL = [
+    "Total Efetivos",
+    "Fufin Patronal",
+    "BHPrev Patronal",
+    "BHPrev Complementar Patronal",
+    "total_pia",
+]
+
+
+@dataclass(frozen=True)
+class Cenario:
+    """Um conjunto de parâmetros a simular, identificado por um nome."""
+
+    nome: str
+    param: config.Parametros
+
+
+def _converte_parametro(nome: str, valor):
+    """Converte o valor lido do JSON para o tipo do campo de Parametros."""
+    campos = {campo.name: campo for campo in dataclasses.fields(config.Parametros)}
+    if nome not in campos:
+        raise ValueError(f"Parâmetro desconhecido no cenário: {nome}")
+    padrao = campos[nome].default
+    if isinstance(padrao, Enum) and not isinstance(valor, Enum):
+        return type(padrao)(valor)
+    return valor
+
+
+def _descreve(valor) -> str:
+    return valor.value if isinstance(valor, Enum) else str(valor)
+
+
+def cenarios_da_grade(
+    base: config.Parametros, grade: dict[str, list]
+) -> list[Cenario]:
+    """Cria um cenário para cada combinação dos valores da grade, aplicados sobre
+    os parâmetros `base`. O nome do cenário lista os valores da combinação."""
+    nomes = list(grade)
+    cenarios = []
+    for valores in itertools.product(*(grade[nome] for nome in nomes)):
+        alteracoes = {
+            nome: _converte_parametro(nome, valor)
+            for nome, valor in zip(nomes, valores)
+        }
+        cenarios.append(
+            Cenario(
+                nome=", ".join(
+                    f"{nome}={_descreve(valor)}" for nome, valor in alteracoes.items()
+                ),
+                param=dataclasses.replace(base, **alteracoes),
+            )
+        )
+    return cenarios
+
+
+def carrega_cenarios(caminho: str, base: config.Parametros) -> list[Cenario]:
+    """Lê os cenários de um arquivo JSON, aplicando-os sobre os parâmetros `base`.
+
+    O arquivo pode listar cenários nomeados e/ou uma grade de valores, cujas
+    combinações viram cenários:
+
+        {"cenarios": [{"nome": "Reajuste 5%", "REAJUSTE_ANUAL": 0.05}],
+         "grade": {"REAJUSTE_ANUAL": [0, 0.05], "CONCESSAO_LETRAS": ["NAO_CONCEDE"]}}
+    """
+    with open(caminho, "r", encoding="utf-8") as arquivo:
+        dados = json.load(arquivo)
+
+    cenarios = []
+    for i, item in enumerate(dados.get("cenarios", []), start=1):
+        alteracoes = {
+            nome: _converte_parametro(nome, valor)
+            for nome, valor in item.items()
+            if nome != "nome"
+        }
+        cenarios.append(
+            Cenario(
+                nome=item.get("nome", f"Cenário {i}"),
+                param=dataclasses.replace(base, **alteracoes),
+            )
+        )
+    cenarios.extend(cenarios_da_grade(base, dados.get("grade", {})))
+
+    nomes = [cenario.nome for cenario in cenarios]
+    if len(set(nomes)) != len(nomes):
+        raise ValueError("Os nomes dos cenários devem ser únicos.")
+    return cenarios
+
+
+@contextmanager
+def parametros_globais(param: config.Parametros):
+    """Substitui `config.param` temporariamente.
+
+    A concessão de letras nas progressões ainda é lida de `config.param`."""
+    anterior = config.param
+    config.param = param
+    try:
+        yield
+    finally:
+        config.param = anterior
+
+
+def _agrupa_por_concessao(
+    cenarios: list[Cenario], processos: int
+) -> list[list[Cenario]]:
+    """Divide os cenários em tarefas com uma só concessão de letras cada, para que
+    as progressões sejam calculadas uma vez por tarefa. Cada grupo é dividido em
+    tantas tarefas quanto a sua parte dos `processos`."""
+    grupos = {}  # {ConcessaoLetras: [Cenario]}
+    for cenario in cenarios:
+        grupos.setdefault(cenario.param.CONCESSAO_LETRAS, []).append(cenario)
+    tarefas = []
+    for grupo in grupos.values():
+        partes = min(max(round(processos * len(grupo) / len(cenarios)), 1), len(grupo))
+        tarefas.extend(grupo[inicio::partes] for inicio in range(partes))
+    return tarefas
+
+
+class VarreduraCenarios:
+    """Calcula a projeção de vários cenários sobre os mesmos funcionários.
+
+    Dos parâmetros, só CONCESSAO_LETRAS altera as progressões. Por isso os
+    funcionários são copiados uma vez por valor de CONCESSAO_LETRAS e as
+    progressões calculadas no primeiro cenário são reaproveitadas pelos demais
+    com o mesmo valor; cada cenário recalcula apenas as folhas e os PIAs, com
+    uma Tabela dos seus próprios parâmetros.
+
+    Com `processos` diferente de 1, os cenários são distribuídos entre
+    processos (None usa todos os processadores)."""
+
+    def __init__(
+        self,
+        funcionarios: list[Funcionario],
+        ano_inicio: int,
+        ano_fim: int,
+        processos: int | None = 1,
+        calcula_folha: CalculaFolha = CalculaFolha,
+        calcula_pia: CalculaPIA = CalculaPIA,
+        data_calculo: date | None = None,
+    ):
+        self.funcionarios = funcionarios
+        self.ano_inicio = ano_inicio
+        self.ano_fim = ano_fim
+        self.processos = processos
+        self.calcula_folha = calcula_folha
+        self.calcula_pia = calcula_pia
+        self.data_calculo = data_calculo or date.today()
+        self._funcionarios_por_concessao = {}  # {ConcessaoLetras: [Funcionario]}
+
+    def __getstate__(self) -> dict:
+        # As cópias dos funcionários são refeitas em cada processo
+        return {**self.__dict__, "_funcionarios_por_concessao": {}}
+
+    def _funcionarios_para(
+        self, concessao: config.ConcessaoLetras
+    ) -> list[Funcionario]:
+        """Cópias dos funcionários, com as progressões reiniciadas a partir da
+        primeira, compartilhadas pelos cenários com a mesma concessão de letras."""
+        if concessao not in self._funcionarios_por_concessao:
+            copias = []
+            for funcionario in self.funcionarios:
+                copia = copy.copy(funcionario)
+                copia.progressoes = funcionario.progressoes[:1]
+                copias.append(copia)
+            self._funcionarios_por_concessao[concessao] = copias
+        return self._funcionarios_por_concessao[concessao]
+
+    def calcula_cenario(self, cenario: Cenario) -> pd.DataFrame:
+        """Calcula os totais anuais de um cenário (ver `CMBH.totais_anuais`)."""
+        tabela = Tabela(cenario.param, data_calculo=self.data_calculo)
+        cmbh = CMBH(
+            folhas_efetivos=partial(FolhasEfetivos, tabela, self.calcula_folha),
+            folhas_pia=partial(FolhasPIA, tabela, self.calcula_pia),
+        )
+        with parametros_globais(cenario.param):
+            funcionarios = self._funcionarios_para(cenario.param.CONCESSAO_LETRAS)
+            cmbh.funcionarios = {
+                funcionario.cm: funcionario for funcionario in funcionarios
+            }
+            cmbh.calcula_projecao(self.ano_inicio, self.ano_fim)
+        return cmbh.totais_anuais(self.ano_inicio, self.ano_fim)
+
+    def calcula(self, cenarios: list[Cenario]) -> dict[str, pd.DataFrame]:
+        """Calcula os totais anuais de cada cenário, na ordem recebida."""
+        if self.processos == 1 or len(cenarios) <= 1:
+            return {cenario.nome: self.calcula_cenario(cenario) for cenario in cenarios}
+
+        processos = min(self.processos or os.cpu_count() or 1, len(cenarios))
+        tarefas = _agrupa_por_concessao(cenarios, processos)
+        with ProcessPoolExecutor(
+            max_workers=min(processos, len(tarefas)),
+            initializer=_inicializa_processo_varredura,
+            initargs=(
+                self,
+                config.param,
+                progressoes_horizontais.letras_adquiridas,
+                progressoes_horizontais.nivel_atual,
+            ),
+        ) as executor:
+            totais = {}
+            for tarefa, resultados in zip(
+                tarefas, executor.map(_calcula_cenarios_no_processo, tarefas)
+            ):
+                totais.update(zip((cenario.nome for cenario in tarefa), resultados))
+        return {cenario.nome: totais[cenario.nome] for cenario in cenarios}
+
+    @staticmethod
+    def exporta(
+        cenarios: list[Cenario], totais: dict[str, pd.DataFrame], caminho: str
+    ) -> None:
+        """Escreve a planilha comparativa dos cenários.
+
+        - Cenários: os parâmetros de cada cenário;
+        - Comparativo: custo total (folha, contribuições patronais e PIA) por ano,
+          com uma coluna por cenário;
+        - Totais Anuais: os totais anuais de todos os cenários."""
+        df_cenarios = pd.DataFrame(
+            [
+                {
+                    "Cenário": cenario.nome,
+                    **{
+                        nome: _descreve(valor)
+                        for nome, valor in dataclasses.asdict(cenario.param).items()
+                    },
+                }
+                for cenario in cenarios
+            ]
+        )
+        df_totais = pd.concat(
+            [
+                totais[cenario.nome].reset_index().assign(**{"Cenário": cenario.nome})
+                for cenario in cenarios
+            ],
+            ignore_index=True,
+        )
+        df_totais = df_totais[
+            ["Cenário"] + [c for c in df_totais.columns if c != "Cenário"]
+        ]
+        df_comparativo = pd.DataFrame(
+            {
+                cenario.nome: totais[cenario.nome][COLUNAS_CUSTO_TOTAL].sum(axis=1)
+                for cenario in cenarios
+            }
+        )
+
+        with EscritorExcelStreaming(caminho) as writer:
+            para_excel_formatado(df_cenarios, writer, sheet_name="Cenários")
+            para_excel_formatado(
+                df_comparativo, writer, sheet_name="Comparativo", index=True
+            )
+            para_excel_formatado(df_totais, writer, sheet_name="Totais Anuais")
+
+
+_varredura: VarreduraCenarios | None = None  # Varredura do processo filho
+
+
+def _inicializa_processo_varredura(
+    varredura: VarreduraCenarios,
+    param: config.Parametros,
+    letras_adquiridas: dict[int, str],
+    nivel_atual: dict[int, int],
+) -> None:
+    global _varredura
+    _inicializa_processo(param, letras_adquiridas, nivel_atual)
+    _varredura = varredura
+
+
+def _calcula_cenarios_no_processo(cenarios: list[Cenario]) -> list[pd.DataFrame]:
+    return [_varredura.calcula_cenario(cenario) for cenario in cenarios]
@@ -1,12 +1,47 @@
+import dataclasses
 import os
+from dataclasses import dataclass
 from datetime import date
+from typing import Callable
 
 import pandas as pd
 
-from src.exportador_excel import para_excel_formatado
+import config
+from src.classe import Classe
+from src.exportador_excel import EscritorExcelStreaming, para_excel_formatado
 from src.folhas_efetivos import FolhasEfetivos
 from src.folhas_pia import FolhasPIA
+from src.funcionario import Funcionario, TipoPrevidencia
 from src.importador_excel import ImportadorProjecaoExcel
+from src.projecao_paralela import ProjecaoParalela
+
+
+def _complementar(funcionario: Funcionario) -> bool:
+    return funcionario.dados_folha.tipo_previdencia == (
+        TipoPrevidencia.BHPrevComplementar
+    )
+
+
+# Servidores afetados pela alteração de cada campo de `config.Parametros`, usado no
+# recálculo incremental. A alteração de um campo ausente afeta todos os servidores.
+DEPENDENCIAS_PARAMETROS: dict[str, Callable[[Funcionario], bool]] = {
+    "VALOR_BASE_E2": lambda f: f.dados_folha.classe in (Classe.E1, Classe.E2),
+    "VALOR_BASE_E3": lambda f: f.dados_folha.classe == Classe.E3,
+    "TETO_PREFEITO": lambda f: not f.dados_folha.procurador,
+    "TETO_PROCURADORES": lambda f: f.dados_folha.procurador,
+    "TETO_INSS": _complementar,
+    "ALIQUOTA_PATRONAL_COMPLEMENTAR": _complementar,
+}
+
+
+@dataclass
+class _EstadoProjecao:
+    """Entradas da última projeção calculada, comparadas no recálculo incremental."""
+
+    ano_inicio: int
+    ano_fim: int
+    param: config.Parametros
+    assinaturas: dict[int, tuple]  # {cm: Funcionario.assinatura()}
 
 
 class CMBH:
@@ -16,6 +51,7 @@ class CMBH:
         self.funcionarios = {}  # {cm: Funcionario}
         self.folhas_efetivos = folhas_efetivos()
         self.folhas_pia = folhas_pia()
+        self._estado = None  # _EstadoProjecao da última projeção calculada
 
     @classmethod
     def from_excel(cls, caminho_excel: str, importa_folhas: bool = True) -> "CMBH":
@@ -25,15 +61,118 @@ class CMBH:
             caminho_excel, importa_folhas=importa_folhas
         )
 
-    def calcula_projecao(self, ano_inicio: int, ano_fim: int):
-        """Calcula as folhas de pagamento e PIAs para o intervalo de anos especificado."""
+    def calcula_projecao(self, ano_inicio: int, ano_fim: int, processos: int = 1):
+        """Calcula as folhas de pagamento e PIAs para o intervalo de anos especificado.
+
+        Com `processos` diferente de 1, os funcionários são divididos entre processos
+        (None usa todos os processadores), com o mesmo resultado do cálculo serial."""
+        self._calcula(list(self.funcionarios.values()), ano_inicio, ano_fim, processos)
+        self._registra_estado(ano_inicio, ano_fim)
+
+    def atualiza_projecao(
+        self, ano_inicio: int, ano_fim: int, processos: int = 1
+    ) -> set[int]:
+        """Recalcula apenas os servidores afetados pelo que mudou desde a última
+        projeção, com o mesmo resultado de calcular a projeção novamente.
+
+        São afetados os servidores incluídos, removidos ou com dados alterados (ver
+        `Funcionario.assinatura`) e os que dependem dos campos alterados de
+        `config.param` (ver DEPENDENCIAS_PARAMETROS). As folhas e o PIA de cada
+        afetado são descartados e recalculados; servidores com dados alterados têm
+        as progressões refeitas a partir da primeira. Sem uma projeção anterior do
+        mesmo intervalo, calcula tudo. Retorna os CMs recalculados."""
+        estado = self._estado
+        if estado is None or (estado.ano_inicio, estado.ano_fim) != (
+            ano_inicio,
+            ano_fim,
+        ):
+            cms = set(self.funcionarios) | set(estado.assinaturas if estado else ())
+            self._descarta(cms, set(self.funcionarios))
+            self.calcula_projecao(ano_inicio, ano_fim, processos)
+            return cms
+
+        param = config.param
+        regras = [
+            DEPENDENCIAS_PARAMETROS.get(campo.name)
+            for campo in dataclasses.fields(param)
+            if getattr(param, campo.name) != getattr(estado.param, campo.name)
+        ]
+        alterados = set()
+        afetados = set()
+        for cm, funcionario in self.funcionarios.items():
+            if estado.assinaturas.get(cm) != funcionario.assinatura():
+                alterados.add(cm)
+            elif any(regra is None or regra(funcionario) for regra in regras):
+                afetados.add(cm)
+        removidos = set(estado.assinaturas) - set(self.funcionarios)
+
+        if regras:
+            # Parâmetros alterados no próprio objeto não são percebidos pela tabela
+            for folhas in (self.folhas_efetivos, self.folhas_pia):
+                tabela = getattr(folhas, "tabela", None)
+                if hasattr(tabela, "invalida"):
+                    tabela.invalida()
+
+        recalculados = alterados | afetados
+        self._descarta(recalculados | removidos, alterados)
+        self._calcula(
+            [f for cm, f in self.funcionarios.items() if cm in recalculados],
+            ano_inicio,
+            ano_fim,
+            processos,
+        )
+        if hasattr(self.folhas_pia, "ordena_servidores"):
+            self.folhas_pia.ordena_servidores(list(self.funcionarios))
+        self._registra_estado(ano_inicio, ano_fim)
+        return recalculados | removidos
+
+    def _calcula(
+        self,
+        funcionarios: list[Funcionario],
+        ano_inicio: int,
+        ano_fim: int,
+        processos: int,
+    ) -> None:
         comp_inicio = date(ano_inicio, 1, 1)
         comp_fim = date(ano_fim, 12, 1)
 
-        funcionarios = list(self.funcionarios.values())
+        if processos != 1:
+            ProjecaoParalela(processos).calcula(
+                funcionarios,
+                self.folhas_efetivos,
+                self.folhas_pia,
+                comp_inicio,
+                comp_fim,
+            )
+            return
+
         self.folhas_efetivos.calcula_folhas(funcionarios, comp_inicio, comp_fim)
         self.folhas_pia.calcula_pias(funcionarios)
 
+    def _descarta(self, cms: set[int], reinicia_progressoes: set[int]) -> None:
+        """Remove as folhas e PIAs dos CMs e reinicia as progressões dos
+        funcionários em `reinicia_progressoes`."""
+        for cm in cms:
+            self.folhas_efetivos.remove_servidor(cm)
+            self.folhas_pia.remove_servidor(cm)
+        for cm in reinicia_progressoes:
+            funcionario = self.funcionarios[cm]
+            funcionario.progressoes = funcionario.progressoes[:1]
+
+    def _registra_estado(self, ano_inicio: int, ano_fim: int) -> None:
+        if not all(hasattr(f, "assinatura") for f in self.funcionarios.values()):
+            self._estado = None
+            return
+        self._estado = _EstadoProjecao(
+            ano_inicio=ano_inicio,
+            ano_fim=ano_fim,
+            param=dataclasses.replace(config.param),
+            assinaturas={
+                cm: funcionario.assinatura()
+                for cm, funcionario in self.funcionarios.items()
+            },
+        )
+
     def escreve_totais_mensais(
         self, ano_inicio: int, ano_fim: int, writer: pd.ExcelWriter
     ) -> None:
@@ -52,13 +191,16 @@ class CMBH:
         self, ano_inicio: int, ano_fim: int, writer: pd.ExcelWriter
     ) -> None:
         """Exporta os totais anuais das folhas para uma única planilha do Excel, juntando por ano."""
+        df_total = self.totais_anuais(ano_inicio, ano_fim)
+        para_excel_formatado(df_total, writer, sheet_name="Totais Anuais", index=True)
+
+    def totais_anuais(self, ano_inicio: int, ano_fim: int) -> pd.DataFrame:
+        """Totais anuais das folhas dos efetivos e dos PIAs, indexados por ano."""
         df_efetivos = self.folhas_efetivos.total_anual_no_intervalo(ano_inicio, ano_fim)
         df_pia = self.folhas_pia.total_anual_no_intervalo(ano_inicio, ano_fim)
 
-        # Merge usando a coluna 'competencia'
-        df_total = pd.merge(df_efetivos, df_pia, on=["ano"], how="outer")
-
-        para_excel_formatado(df_total, writer, sheet_name="Totais Anuais", index=True)
+        # Merge usando a coluna 'ano'
+        return pd.merge(df_efetivos, df_pia, on=["ano"], how="outer")
 
     def escreve_folhas_servidores_efetivos(
         self, ano_inicio: int, ano_fim: int, writer: pd.ExcelWriter
@@ -115,7 +257,7 @@ class CMBH:
             return
         if dados_servidores:
             arquivo_servidores = os.path.join(diretorio_resultado, "servidores.xlsx")
-            with pd.ExcelWriter(arquivo_servidores, engine="openpyxl") as writer:
+            with EscritorExcelStreaming(arquivo_servidores) as writer:
                 self.escreve_servidores(writer=writer)
                 self.escreve_metricas(
                     ano_inicio=ano_inicio, ano_fim=ano_fim, writer=writer
@@ -127,7 +269,7 @@ class CMBH:
             arquivo_totalizadores = os.path.join(
                 diretorio_resultado, "totalizadores.xlsx"
             )
-            with pd.ExcelWriter(arquivo_totalizadores, engine="openpyxl") as writer:
+            with EscritorExcelStreaming(arquivo_totalizadores) as writer:
                 self.escreve_totais_mensais(
                     ano_inicio=ano_inicio, ano_fim=ano_fim, writer=writer
                 )
@@ -138,7 +280,7 @@ class CMBH:
     def exporta_progressoes(self, diretorio_resultado: str) -> None:
         """Exporta as progressões dos funcionários para um arquivo Excel."""
         arquivo_progressoes = os.path.join(diretorio_resultado, "progressoes.xlsx")
-        with pd.ExcelWriter(arquivo_progressoes, engine="openpyxl") as writer:
+        with EscritorExcelStreaming(arquivo_progressoes) as writer:
             for funcionario in self.funcionarios.values():
                 dados = []
                 for prog in funcionario.progressoes:
@@ -1,5 +1,39 @@
+from datetime import date, datetime, time
+from decimal import Decimal
+
+import numpy as np
 import pandas as pd
-from openpyxl.styles import Alignment, NamedStyle
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, Side
+from openpyxl.utils import get_column_letter
+
+# Tipos gravados diretamente pelo openpyxl; os demais são convertidos em texto
+TIPOS_NATIVOS = (str, int, float, bool, date, datetime, time, Decimal, np.number)
+
+
+class EscritorExcelStreaming:
+    """Escritor de arquivos Excel em modo streaming (write-only do openpyxl).
+
+    Substitui o pd.ExcelWriter em `para_excel_formatado`: cada planilha é escrita
+    linha a linha, já formatada, sem manter as células em memória. Por isso cada
+    planilha deve ser escrita de uma só vez. O arquivo é salvo ao sair do bloco
+    `with` (ou em `close`)."""
+
+    def __init__(self, caminho: str) -> None:
+        self.caminho = caminho
+        self.book = Workbook(write_only=True)
+        self.sheets = {}  # {nome: planilha}
+
+    def __enter__(self) -> "EscritorExcelStreaming":
+        return self
+
+    def __exit__(self, tipo_excecao, excecao, rastreamento) -> None:
+        if tipo_excecao is None:
+            self.close()
+
+    def close(self) -> None:
+        self.book.save(self.caminho)
 
 
 class ExportadorExcel:
@@ -16,7 +50,7 @@ class ExportadorExcel:
     def para_excel(
         self,
         df: pd.DataFrame,
-        writer: pd.ExcelWriter,
+        writer: pd.ExcelWriter | EscritorExcelStreaming,
         sheet_name: str,
         index: bool = False,
         **kwargs
@@ -26,11 +60,21 @@ class ExportadorExcel:
 
         Args:
             df: DataFrame a ser exportado
-            writer: ExcelWriter do pandas
+            writer: ExcelWriter do pandas ou EscritorExcelStreaming
             sheet_name: Nome da planilha
             index: Se deve incluir o índice
-            **kwargs: Argumentos adicionais para to_excel
+            **kwargs: Argumentos adicionais para to_excel. Com
+                EscritorExcelStreaming, são aceitos startrow, startcol, columns,
+                header, index_label, na_rep e float_format.
         """
+        if "columns" in kwargs:
+            # Seleciona as colunas antes, para que a formatação siga as escritas
+            df = df[list(kwargs.pop("columns"))]
+
+        if isinstance(writer, EscritorExcelStreaming):
+            self._escrever_streaming(df, writer, sheet_name, index, **kwargs)
+            return
+
         # Primeiro, escreve o DataFrame normalmente
         df.to_excel(writer, sheet_name=sheet_name, index=index, **kwargs)
 
@@ -55,8 +99,9 @@ class ExportadorExcel:
 
         deslocamento_linha = kwargs.get("startrow", 0)
         deslocamento_coluna = kwargs.get("startcol", 0)
+        cabecalho = kwargs.get("header", True)
         primeira_coluna = (2 if index else 1) + deslocamento_coluna
-        primeira_linha = 2 + deslocamento_linha
+        primeira_linha = (2 if cabecalho else 1) + deslocamento_linha
 
         # Aplica formatação para números float
         for idx_linha in range(len(df)):
@@ -70,9 +115,10 @@ class ExportadorExcel:
                     celula.style = "formato_numerico"
 
         # Aplica wrap text na primeira linha (cabeçalhos)
-        self._aplicar_quebra_linha_cabecalho(
-            planilha, df, index, deslocamento_linha, deslocamento_coluna
-        )
+        if cabecalho:
+            self._aplicar_quebra_linha_cabecalho(
+                planilha, df, index, deslocamento_linha, deslocamento_coluna
+            )
 
         # Aplica auto-fit na largura das colunas
         self._auto_ajustar_largura_colunas(planilha)
@@ -154,10 +200,203 @@ class ExportadorExcel:
             )
         return max(linhas_explicitas, linhas_wrap_automatico)
 
+    def _escrever_streaming(
+        self,
+        df: pd.DataFrame,
+        writer: EscritorExcelStreaming,
+        sheet_name: str,
+        index: bool,
+        startrow: int = 0,
+        startcol: int = 0,
+        header: bool = True,
+        index_label: str | None = None,
+        na_rep: str = "",
+        float_format: str | None = None,
+    ) -> None:
+        """Escreve o DataFrame já formatado em uma planilha write-only.
+
+        O formato numérico é decidido por coluna a partir do dtype (colunas float
+        sempre, colunas object valor a valor) e as larguras são calculadas no
+        DataFrame antes da escrita, pois o modo streaming não permite voltar às
+        células já escritas. Os argumentos de `to_excel` aceitos têm o mesmo
+        efeito que no pandas; os demais não são suportados (TypeError)."""
+        workbook = writer.book
+        if "formato_numerico" not in workbook.named_styles:
+            workbook.add_named_style(self.estilo_numerico)
+        planilha = workbook.create_sheet(sheet_name)
+        writer.sheets[sheet_name] = planilha
+
+        series = [df.iloc[:, i] for i in range(len(df.columns))]
+        if float_format is not None:
+            # Como no pandas: o valor arredondado continua numérico
+            series = [
+                serie.map(
+                    lambda valor: float(float_format % valor)
+                    if self._eh_float(valor)
+                    else valor
+                )
+                for serie in series
+            ]
+        cabecalhos = list(df.columns) if header else [None] * len(df.columns)
+        if index:
+            series.insert(0, df.index.to_series())
+            if index_label is None:
+                index_label = df.index.name
+            cabecalhos.insert(0, index_label)
+
+        # Larguras e altura do cabeçalho devem ser definidas antes das linhas
+        larguras = []
+        for idx_coluna, (serie, cabecalho) in enumerate(zip(series, cabecalhos)):
+            largura = max(
+                self._comprimento_maximo(serie),
+                self._comprimento_texto(cabecalho),
+                len(na_rep) if serie.hasnans else 0,
+            )
+            largura = max(min(largura + 2, 50), 10)
+            letra_coluna = get_column_letter(startcol + idx_coluna + 1)
+            planilha.column_dimensions[letra_coluna].width = largura
+            larguras.append(largura)
+
+        linha_cabecalho = startrow + 1
+        linhas_cabecalho = max(
+            (
+                self._linhas_necessarias(str(cabecalho), largura)
+                for cabecalho, largura in zip(cabecalhos, larguras)
+                if cabecalho
+            ),
+            default=1,
+        )
+        if linhas_cabecalho > 1:
+            planilha.row_dimensions[linha_cabecalho].height = linhas_cabecalho * 15
+
+        for _ in range(startrow):
+            planilha.append([])
+        if not series:
+            return
+
+        prefixo = [None] * startcol
+        if header:
+            planilha.append(
+                prefixo
+                + [
+                    self._celula_cabecalho(planilha, cabecalho)
+                    for cabecalho in cabecalhos
+                ]
+            )
+
+        colunas = [self._valores_coluna(serie) for serie in series]
+        formatacoes = [self._formatacao_coluna(serie) for serie in series]
+        # Uma célula formatada por coluna é reaproveitada em todas as linhas, pois
+        # o modo streaming serializa cada linha assim que ela é adicionada
+        celulas = [self._celula_numerica(planilha) for _ in series]
+        if index:
+            formatacoes[0] = "indice"
+            celulas[0] = self._celula_indice(planilha)
+
+        for valores in zip(*colunas):
+            linha = prefixo.copy()
+            for valor, formatacao, celula in zip(valores, formatacoes, celulas):
+                if valor is None:
+                    linha.append(na_rep or None)
+                elif (
+                    formatacao in ("coluna", "indice")
+                    or formatacao == "valor"
+                    and self._eh_float(valor)
+                ):
+                    celula.value = valor
+                    linha.append(celula)
+                else:
+                    linha.append(valor)
+            planilha.append(linha)
+
+    def _celula_cabecalho(self, planilha, valor) -> WriteOnlyCell:
+        """Cria uma célula de cabeçalho com o mesmo estilo do pandas e quebra de
+        linha."""
+        if valor is None:
+            celula = WriteOnlyCell(planilha)
+        else:
+            celula = self._celula_indice(planilha)
+            celula.value = self._converte_valor(valor)
+        celula.alignment = Alignment(
+            wrap_text=True, vertical="center", horizontal="center"
+        )
+        return celula
+
+    def _celula_indice(self, planilha) -> WriteOnlyCell:
+        """Cria uma célula em negrito e com borda, como o pandas escreve o índice."""
+        celula = WriteOnlyCell(planilha)
+        borda = Side(style="thin")
+        celula.font = Font(bold=True)
+        celula.border = Border(left=borda, right=borda, top=borda, bottom=borda)
+        celula.alignment = Alignment(vertical="top")
+        return celula
+
+    def _celula_numerica(self, planilha) -> WriteOnlyCell:
+        celula = WriteOnlyCell(planilha)
+        celula.style = "formato_numerico"
+        return celula
+
+    def _formatacao_coluna(self, serie: pd.Series) -> str | None:
+        """Indica se a coluna é formatada inteira ("coluna"), valor a valor ("valor")
+        ou não é formatada (None)."""
+        if pd.api.types.is_float_dtype(serie.dtype):
+            return "coluna"
+        if serie.dtype == object:
+            return "valor"
+        return None
+
+    def _valores_coluna(self, serie: pd.Series) -> list:
+        """Converte a coluna em valores aceitos pelo openpyxl, com None nos vazios."""
+        if pd.api.types.is_float_dtype(serie.dtype):
+            valores = serie.to_numpy(dtype=float)
+            return [None if valor != valor else valor for valor in valores.tolist()]
+        if pd.api.types.is_integer_dtype(serie.dtype) or pd.api.types.is_bool_dtype(
+            serie.dtype
+        ):
+            if not serie.hasnans:
+                return serie.tolist()
+        valores = serie.astype(object).where(serie.notna(), None)
+        return [self._converte_valor(valor) for valor in valores.tolist()]
+
+    def _converte_valor(self, valor):
+        if valor is None or valor is pd.NaT or valor is pd.NA:
+            return None
+        if isinstance(valor, TIPOS_NATIVOS):
+            return valor
+        return str(valor)
+
+    def _comprimento_maximo(self, serie: pd.Series) -> int:
+        """Maior comprimento (em caracteres) dos valores preenchidos da coluna."""
+        preenchidos = serie[serie.notna()]
+        if pd.api.types.is_numeric_dtype(preenchidos.dtype):
+            preenchidos = preenchidos[preenchidos != 0]
+        if preenchidos.empty:
+            return 0
+        if pd.api.types.is_datetime64_any_dtype(preenchidos.dtype):
+            textos = preenchidos.dt.strftime("%Y-%m-%d %H:%M:%S")
+        else:
+            textos = preenchidos.astype(str)
+        if textos.str.contains("\n", regex=False).any():
+            textos = textos.str.split("\n").explode()
+        return int(textos.str.len().max())
+
+    def _comprimento_texto(self, valor) -> int:
+        if valor is None or valor == "":
+            return 0
+        return max(len(linha) for linha in str(valor).split("\n"))
+
+    def _linhas_necessarias(self, texto: str, largura_coluna: float) -> int:
+        """Calcula o número de linhas necessárias para exibir um texto na coluna."""
+        caracteres_por_linha = max(int(largura_coluna), 1)
+        linhas_wrap_automatico = 0
+        for linha in texto.split("\n"):
+            linhas_wrap_automatico += max(
+                1, (len(linha) + caracteres_por_linha - 1) // caracteres_por_linha
+            )
+        return max(texto.count("\n") + 1, linhas_wrap_automatico)
+
     def _eh_float(self, valor) -> bool:
         """Verifica se um valor é um número float."""
-        import numpy as np
-
         # Verifica se é None ou NaN
         if valor is None or pd.isna(valor):
             return False
@@ -173,7 +412,7 @@ exportador_excel = ExportadorExcel()
 # Função de conveniência
 def para_excel_formatado(
     df: pd.DataFrame,
-    writer: pd.ExcelWriter,
+    writer: pd.ExcelWriter | EscritorExcelStreaming,
     sheet_name: str,
     index: bool = False,
     **kwargs
@@ -183,7 +422,7 @@ def para_excel_formatado(
 
     Args:
         df: DataFrame a ser exportado
-        writer: ExcelWriter do pandas
+        writer: ExcelWriter do pandas ou EscritorExcelStreaming
         sheet_name: Nome da planilha
         index: Se deve incluir o índice
         **kwargs: Argumentos adicionais para to_excel
@@ -0,0 +1,264 @@
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+from src.aposentadoria import (
+    DadosPrevidenciarios,
+    ParametrosAposentadoria,
+    Sexo,
+    calcula_aposentadorias,
+)
+from src.calendario import CalendarioCompetencias
+from src.carreira import CarreiraE2, CarreiraE3
+from src.classe import Classe
+from src.funcionario import Aposentadoria, DadosFolha, Funcionario, TipoPrevidencia
+from src.regra_transicao import RegraTransicao
+
+# Os substitutos recebem CMs negativos, a partir deste, em ordem decrescente: os
+# CMs do Aeros são positivos, e os dois grupos podem ser reunidos sem colisão
+PRIMEIRO_CM_SUBSTITUTO = -1
+
+
+def _mes(data: date) -> int:
+    return data.year * 12 + data.month - 1
+
+
+def _data_do_mes(mes: int) -> date:
+    return date(mes // 12, mes % 12 + 1, 1)
+
+
+@dataclass(frozen=True)
+class PoliticaReposicao:
+    """Como as vagas abertas pelas aposentadorias são repostas.
+
+    O substituto é admitido no primeiro dia do mês da aposentadoria, somado a
+    `meses_ate_reposicao`, e passa a receber no mês seguinte: sem defasagem, a
+    vaga não fica vazia em nenhuma competência."""
+
+    taxa_reposicao: float = 1.0  # Probabilidade de cada vaga ser reposta
+    meses_ate_reposicao: int = 0
+    idade_ingresso: int = 30
+    proporcao_feminino: float = 0.5
+    tipo_previdencia: TipoPrevidencia = TipoPrevidencia.BHPrevComplementar
+    # Letra máxima dos substitutos, que não têm letras no Aeros (None: todas as
+    # permitidas pela carreira, independentemente de `CONCESSAO_LETRAS`)
+    letra_maxima: str | None = None
+
+
+class Substituto(Funcionario):
+    """Servidor fictício admitido na vaga de um aposentado.
+
+    A letra máxima vem da `PoliticaReposicao`, e não de `progressoes_horizontais`,
+    em que o CM do substituto não existe."""
+
+    def __init__(self, *args, letra_maxima: str | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._letra_maxima = letra_maxima
+
+    def letra_maxima(self) -> str | None:
+        return self._letra_maxima
+
+
+@dataclass
+class _Vagas:
+    """Vagas abertas em uma geração de aposentadorias."""
+
+    meses: np.ndarray  # Mês (número sequencial) da aposentadoria
+    classes: list[Classe]
+    procurador: np.ndarray
+
+
+@dataclass
+class QuadroProjetado:
+    """Resultado do fluxo de pessoal no intervalo projetado."""
+
+    # Substitutos criados, a serem incluídos na projeção das folhas
+    admitidos: list[Substituto]
+    # Por competência: servidores ativos, aposentadorias e admissões
+    quadro: pd.DataFrame
+
+
+class FluxoPessoal:
+    """Projeta a entrada e a saída de servidores mês a mês.
+
+    Cada servidor sai no mês da sua data de aposentadoria; cada vaga aberta no
+    intervalo é reposta, conforme a `PoliticaReposicao`, por um servidor fictício
+    da mesma classe (e procurador, se for o caso), que entra pela regra de
+    transição na carreira atual da classe, com CM negativo (ver
+    `PRIMEIRO_CM_SUBSTITUTO`). A aposentadoria dos substitutos é
+    calculada em lote pelas regras de `src.aposentadoria`, e as vagas que eles
+    abrirem dentro do intervalo também são repostas.
+
+    As vagas são processadas por geração, de uma vez, e os sorteios usam um
+    gerador com `semente`: a mesma semente produz o mesmo quadro."""
+
+    def __init__(
+        self,
+        politica: PoliticaReposicao | None = None,
+        parametros_aposentadoria: ParametrosAposentadoria | None = None,
+        semente: int | None = 0,
+    ) -> None:
+        self.politica = politica or PoliticaReposicao()
+        self.parametros_aposentadoria = parametros_aposentadoria
+        self.semente = semente
+
+    def projeta(
+        self, funcionarios: list[Funcionario], ano_inicio: int, ano_fim: int
+    ) -> QuadroProjetado:
+        """Projeta o quadro de servidores de `ano_inicio` a `ano_fim`."""
+        gerador = np.random.default_rng(self.semente)
+        mes_inicio = _mes(date(ano_inicio, 1, 1))
+        mes_fim = _mes(date(ano_fim, 12, 1))
+        proximo_cm = min(
+            min((f.cm for f in funcionarios), default=0) - 1, PRIMEIRO_CM_SUBSTITUTO
+        )
+
+        vagas = self._vagas_abertas(funcionarios, mes_inicio, mes_fim)
+        admitidos = []
+        while len(vagas.meses):
+            substitutos = self._substitutos(vagas, proximo_cm, mes_fim, gerador)
+            proximo_cm -= len(substitutos)
+            admitidos.extend(substitutos)
+            vagas = self._vagas_abertas(substitutos, mes_inicio, mes_fim)
+
+        return QuadroProjetado(
+            admitidos=admitidos,
+            quadro=self.quadro(funcionarios + admitidos, ano_inicio, ano_fim),
+        )
+
+    @staticmethod
+    def _vagas_abertas(
+        funcionarios: list[Funcionario], mes_inicio: int, mes_fim: int
+    ) -> _Vagas:
+        meses = np.array(
+            [_mes(f.aposentadoria.data_aposentadoria) for f in funcionarios], dtype=int
+        )
+        no_intervalo = (meses >= mes_inicio) & (meses <= mes_fim)
+        return _Vagas(
+            meses=meses[no_intervalo],
+            classes=[
+                f.dados_folha.classe
+                for f, aberta in zip(funcionarios, no_intervalo)
+                if aberta
+            ],
+            procurador=np.array(
+                [f.dados_folha.procurador for f in funcionarios], dtype=bool
+            )[no_intervalo],
+        )
+
+    def _substitutos(
+        self,
+        vagas: _Vagas,
+        primeiro_cm: int,
+        mes_fim: int,
+        gerador: np.random.Generator,
+    ) -> list[Substituto]:
+        politica = self.politica
+        meses_admissao = vagas.meses + politica.meses_ate_reposicao
+        repostas = gerador.random(len(vagas.meses)) < politica.taxa_reposicao
+        femininos = gerador.random(len(vagas.meses)) < politica.proporcao_feminino
+        # Admitidos no último mês só receberiam depois do intervalo
+        repostas &= meses_admissao < mes_fim
+
+        indices = np.flatnonzero(repostas)
+        admissoes = [_data_do_mes(int(meses_admissao[i])) for i in indices]
+        nascimentos = [
+            admissao - relativedelta(years=politica.idade_ingresso)
+            for admissao in admissoes
+        ]
+        aposentadorias = calcula_aposentadorias(
+            [
+                DadosPrevidenciarios(
+                    data_nascimento=nascimento,
+                    sexo=Sexo.FEMININO if femininos[i] else Sexo.MASCULINO,
+                    data_admissao=admissao,
+                    tempo_INSS=0,
+                    tempo_sevico_publico=0,
+                )
+                for i, admissao, nascimento in zip(indices, admissoes, nascimentos)
+            ],
+            parametros=self.parametros_aposentadoria,
+        )
+
+        idade_compulsoria = (
+            self.parametros_aposentadoria or ParametrosAposentadoria()
+        ).idade_compulsoria
+        compulsorias = [
+            nascimento + relativedelta(years=idade_compulsoria)
+            for nascimento in nascimentos
+        ]
+
+        substitutos = []
+        for posicao, (i, admissao) in enumerate(zip(indices, admissoes)):
+            classe = vagas.classes[i]
+            procurador = bool(vagas.procurador[i])
+            data_aposentadoria = aposentadorias.data(posicao)
+            substitutos.append(
+                Substituto(
+                    cm=primeiro_cm - posicao,
+                    data_admissao=admissao,
+                    dados_folha=DadosFolha(
+                        classe=classe,
+                        data_anuenio=admissao,
+                        num_ats=0,
+                        procurador=procurador,
+                        tipo_previdencia=politica.tipo_previdencia,
+                    ),
+                    aposentadoria=Aposentadoria(
+                        data_condicao_aposentadoria=data_aposentadoria,
+                        data_aposentadoria=data_aposentadoria,
+                        num_art_98_data_aposentadoria=0,
+                        aderiu_pia=False,
+                        data_compulsoria=compulsorias[posicao],
+                    ),
+                    ultima_progressao=RegraTransicao.primeira_progressao(
+                        admissao, procurador, 0
+                    ),
+                    carreira=CarreiraE3() if classe == Classe.E3 else CarreiraE2(),
+                    letra_maxima=politica.letra_maxima,
+                )
+            )
+        return substitutos
+
+    @staticmethod
+    def quadro(
+        funcionarios: list[Funcionario], ano_inicio: int, ano_fim: int
+    ) -> pd.DataFrame:
+        """Conta, em cada competência, os ativos (mesma regra de
+        `Funcionario.obtem_nivel_para`), as aposentadorias e as admissões."""
+        mes_inicio = _mes(date(ano_inicio, 1, 1))
+        mes_fim = _mes(date(ano_fim, 12, 1))
+        num_meses = mes_fim - mes_inicio + 1
+        admissoes = np.array([_mes(f.data_admissao) for f in funcionarios], dtype=int)
+        aposentadorias = np.array(
+            [_mes(f.aposentadoria.data_aposentadoria) for f in funcionarios], dtype=int
+        )
+
+        def por_mes(meses: np.ndarray) -> np.ndarray:
+            """Quantidade de ocorrências em cada mês do intervalo; as anteriores
+            ao intervalo são contadas no primeiro mês."""
+            posicoes = meses - mes_inicio
+            posicoes = np.maximum(posicoes[posicoes < num_meses], 0)
+            return np.bincount(posicoes, minlength=num_meses)
+
+        # Ativo do mês seguinte à admissão até o mês da aposentadoria, inclusive
+        entradas = por_mes(admissoes + 1)
+        saidas = por_mes(aposentadorias + 1)
+
+        def no_intervalo(meses: np.ndarray) -> np.ndarray:
+            return meses[(meses >= mes_inicio) & (meses <= mes_fim)]
+
+        calendario = CalendarioCompetencias.para(
+            _data_do_mes(mes_inicio), _data_do_mes(mes_fim)
+        )
+        return pd.DataFrame(
+            {
+                "competencia": list(calendario.rotulos),
+                "Ativos": np.cumsum(entradas - saidas),
+                "Aposentadorias": por_mes(no_intervalo(aposentadorias)),
+                "Admissões": por_mes(no_intervalo(admissoes)),
+            }
+        )
@@ -1,10 +1,12 @@
 from dataclasses import dataclass
 from datetime import date
 
+import numpy as np
+
 import config
 from src.anuenio import Anuenio
 from src.funcionario import DadosFolha, Funcionario, TipoPrevidencia
-from src.nivel import Nivel
+from src.nivel import SEM_NIVEL, Nivel, codifica_nivel, decodifica_nivel
 from src.tabela_salario import Tabela
 
 
@@ -36,10 +38,73 @@ class Folha:
         }
 
 
+# Campos numéricos da folha e seus rótulos na exportação
+ROTULOS_CAMPOS = {
+    "salario": "Salário",
+    "anuenio": "Anuênio",
+    "ats": "ATS",
+    "total_antes_limite_prefeito": "Total Antes Limite Prefeito",
+    "total": "Total",
+    "fufin_patronal": "Fufin Patronal",
+    "bhprev_patronal": "BHPrev Patronal",
+    "bhprev_complementar_patronal": "BHPrev Complementar Patronal",
+}
+CAMPOS_VALORES = tuple(ROTULOS_CAMPOS)
+
+
+@dataclass
+class LoteFolhas:
+    """Folhas de vários funcionários em várias competências, em matrizes
+    (competências × servidores). Células sem folha têm nível None e valores zero."""
+
+    competencias: list[date]
+    cms: list[int]
+    ativo: np.ndarray
+    niveis: np.ndarray
+    salario: np.ndarray
+    anuenio: np.ndarray
+    ats: np.ndarray
+    total_antes_limite_prefeito: np.ndarray
+    total: np.ndarray
+    fufin_patronal: np.ndarray
+    bhprev_patronal: np.ndarray
+    bhprev_complementar_patronal: np.ndarray
+
+    def folha(self, idx_competencia: int, idx_servidor: int) -> Folha | None:
+        """Retorna a folha de uma célula do lote, ou None se não houver folha."""
+        if not self.ativo[idx_competencia, idx_servidor]:
+            return None
+        return Folha(
+            nivel=self.niveis[idx_competencia, idx_servidor],
+            **{
+                campo: float(getattr(self, campo)[idx_competencia, idx_servidor])
+                for campo in CAMPOS_VALORES
+            },
+        )
+
+
+def arredonda_valores(valores: np.ndarray) -> np.ndarray:
+    """Arredonda para 2 casas decimais com o mesmo resultado de `round(valor, 2)`.
+
+    O produto por 100 é feito em precisão estendida, onde é exato, para que o
+    desempate siga o valor binário real (como no `round`) e não o produto já
+    arredondado em float64, como faria `np.round`."""
+    if np.finfo(np.longdouble).nmant < 60:  # Plataforma sem precisão estendida
+        arredondados = [round(valor, 2) for valor in valores.ravel().tolist()]
+        return np.array(arredondados).reshape(valores.shape)
+    centavos = np.rint(valores.astype(np.longdouble) * 100)
+    return centavos.astype(np.float64) / 100
+
+
 class CalculaFolha:
     def __init__(self, tabela: Tabela):
         self.tabela = tabela
 
+    @property
+    def param(self) -> config.Parametros:
+        """Parâmetros do cálculo: os mesmos da tabela de salários."""
+        return self.tabela.parametros
+
     def calcula(self, funcionario: Funcionario, competencia: date) -> Folha | None:
         nivel = funcionario.obtem_nivel_para(competencia)
         if not nivel:  # Funcionário não admitido ou exonerado
@@ -61,6 +126,118 @@ class CalculaFolha:
             ),
         )
 
+    def calcula_lote(
+        self, funcionarios: list[Funcionario], competencias: list[date]
+    ) -> LoteFolhas:
+        """Calcula as folhas de vários funcionários em várias competências de uma vez.
+
+        Produz os mesmos valores que `calcula` para cada par (funcionário,
+        competência), mas cada rubrica é calculada uma única vez sobre matrizes
+        (competências × servidores). Os níveis vêm já codificados de
+        `Funcionario.niveis_para` e os salários, da tabela pelos códigos."""
+        param = self.param
+        num_meses, num_servidores = len(competencias), len(funcionarios)
+        dados_folha = [funcionario.dados_folha for funcionario in funcionarios]
+
+        # Níveis codificados por `codifica_nivel`, sem objetos Nivel por célula
+        codigos = np.full((num_meses, num_servidores), SEM_NIVEL, dtype=np.int16)
+        salario = np.zeros((num_meses, num_servidores))
+        valor_anuenio = np.zeros((num_meses, num_servidores))
+        valor_por_anuenio = {}  # {classe: valores por competência}
+        codigo_nivel_inicial = np.full(num_meses, codifica_nivel(Nivel(1, "0")))
+        for j, funcionario in enumerate(funcionarios):
+            classe = dados_folha[j].classe
+            codigos[:, j] = funcionario.niveis_para(competencias)
+            salario[:, j] = self.tabela.valores_dos_codigos_para_classe(
+                codigos[:, j], classe, competencias
+            )
+            # Anuênio: 1% do valor do nível 1.0 da classe, por anuênio
+            if classe not in valor_por_anuenio:
+                valor_por_anuenio[classe] = 0.01 * (
+                    self.tabela.valores_dos_codigos_para_classe(
+                        codigo_nivel_inicial, classe, competencias
+                    )
+                )
+            valor_anuenio[:, j] = valor_por_anuenio[classe]
+        ativo = codigos != SEM_NIVEL
+
+        # Os níveis do lote são decodificados uma vez por código distinto
+        unicos, posicoes = np.unique(codigos, return_inverse=True)
+        niveis_unicos = np.empty(len(unicos), dtype=object)
+        niveis_unicos[:] = [decodifica_nivel(int(codigo)) for codigo in unicos]
+        niveis = niveis_unicos[posicoes].reshape(codigos.shape)
+
+        qtde_anuenios = Anuenio.numeros_anuenios_para(
+            [dados.data_anuenio for dados in dados_folha], competencias
+        )
+        anuenio = arredonda_valores(valor_anuenio * qtde_anuenios)
+
+        num_ats = np.array([dados.num_ats for dados in dados_folha])
+        ats = arredonda_valores(num_ats * salario * 0.01)
+
+        total_antes_limite_prefeito = arredonda_valores(salario + anuenio + ats)
+        limite = np.array(
+            [
+                (
+                    param.TETO_PROCURADORES
+                    if dados.procurador
+                    else param.TETO_PREFEITO
+                )
+                for dados in dados_folha
+            ],
+            dtype=float,
+        )
+        total = np.where(
+            total_antes_limite_prefeito > limite, limite, total_antes_limite_prefeito
+        )
+
+        tipos = np.array(
+            [dados.tipo_previdencia for dados in dados_folha], dtype=object
+        )
+        fufin = tipos == TipoPrevidencia.Fufin
+        bhprev = tipos == TipoPrevidencia.BHPrev
+        complementar = tipos == TipoPrevidencia.BHPrevComplementar
+
+        patronal = arredonda_valores(total * param.ALIQUOTA_PATRONAL)
+        fufin_patronal = np.where(fufin, patronal, 0.0)
+        bhprev_patronal = np.where(bhprev | complementar, patronal, 0.0)
+        bhprev_complementar_patronal = np.zeros((num_meses, num_servidores))
+        if complementar.any():
+            # BHPrev Complementar: alíquota patronal limitada ao teto do INSS e
+            # alíquota complementar sobre o que exceder o teto
+            acima_teto_inss = complementar & (total > param.TETO_INSS)
+            bhprev_patronal = np.where(
+                acima_teto_inss,
+                round(param.TETO_INSS * param.ALIQUOTA_PATRONAL, 2),
+                bhprev_patronal,
+            )
+            bhprev_complementar_patronal = np.where(
+                acima_teto_inss,
+                arredonda_valores(
+                    (total - param.TETO_INSS)
+                    * param.ALIQUOTA_PATRONAL_COMPLEMENTAR
+                ),
+                0.0,
+            )
+
+        def zera_inativos(valores: np.ndarray) -> np.ndarray:
+            return np.where(ativo, valores, 0.0)
+
+        return LoteFolhas(
+            competencias=list(competencias),
+            cms=[funcionario.cm for funcionario in funcionarios],
+            ativo=ativo,
+            niveis=niveis,
+            salario=zera_inativos(salario),
+            anuenio=zera_inativos(anuenio),
+            ats=zera_inativos(ats),
+            total_antes_limite_prefeito=zera_inativos(total_antes_limite_prefeito),
+            total=zera_inativos(total),
+            fufin_patronal=zera_inativos(fufin_patronal),
+            bhprev_patronal=zera_inativos(bhprev_patronal),
+            bhprev_complementar_patronal=zera_inativos(bhprev_complementar_patronal),
+        )
+
     def _calcula_salario(self, funcionario: DadosFolha, nivel: Nivel, competencia: date) -> float:
         """Calcula o salário base do funcionário."""
 
@@ -99,9 +276,9 @@ class CalculaFolha:
     ) -> float:
         """Calcula o total do funcionário."""
         if funcionario.procurador:
-            limite = config.param.TETO_PROCURADORES
+            limite = self.param.TETO_PROCURADORES
         else:
-            limite = config.param.TETO_PREFEITO
+            limite = self.param.TETO_PREFEITO
 
         total_antes_limite_prefeito = self._calcula_total_antes_limite_prefeito(
             funcionario, nivel, competencia
@@ -115,7 +292,7 @@ class CalculaFolha:
         if funcionario.tipo_previdencia != TipoPrevidencia.Fufin:
             return 0
         return round(
-            self._calcula_total(funcionario, nivel, competencia) * config.param.ALIQUOTA_PATRONAL,
+            self._calcula_total(funcionario, nivel, competencia) * self.param.ALIQUOTA_PATRONAL,
             2,
         )
 
@@ -126,14 +303,14 @@ class CalculaFolha:
         elif funcionario.tipo_previdencia == TipoPrevidencia.BHPrev:
             return round(
                 self._calcula_total(funcionario, nivel, competencia)
-                * config.param.ALIQUOTA_PATRONAL,
+                * self.param.ALIQUOTA_PATRONAL,
                 2,
             )
         elif funcionario.tipo_previdencia == TipoPrevidencia.BHPrevComplementar:
             total = self._calcula_total(funcionario, nivel, competencia)
-            if total > config.param.TETO_INSS:
-                return round(config.param.TETO_INSS * config.param.ALIQUOTA_PATRONAL, 2)
-            return round(total * config.param.ALIQUOTA_PATRONAL, 2)
+            if total > self.param.TETO_INSS:
+                return round(self.param.TETO_INSS * self.param.ALIQUOTA_PATRONAL, 2)
+            return round(total * self.param.ALIQUOTA_PATRONAL, 2)
 
     def _calcula_bhprev_complementar_patronal(
         self, funcionario: DadosFolha, nivel: Nivel, competencia: date
@@ -142,10 +319,10 @@ class CalculaFolha:
         if funcionario.tipo_previdencia != TipoPrevidencia.BHPrevComplementar:
             return 0
         total = self._calcula_total(funcionario, nivel, competencia)
-        if total <= config.param.TETO_INSS:
+        if total <= self.param.TETO_INSS:
             return 0
         return round(
-            (total - config.param.TETO_INSS)
-            * config.param.ALIQUOTA_PATRONAL_COMPLEMENTAR,
+            (total - self.param.TETO_INSS)
+            * self.param.ALIQUOTA_PATRONAL_COMPLEMENTAR,
             2,
         )
@@ -1,8 +1,10 @@
 from abc import ABC, abstractmethod
 from datetime import date
-from dateutil.relativedelta import relativedelta
+
 import pandas as pd
 
+from src.calendario import CalendarioCompetencias
+
 
 class Folhas(ABC):
     def __init__(self) -> None:
@@ -23,15 +25,15 @@ class Folhas(ABC):
         """Formata a competência do 1/3 de férias."""
         return f"{ano}-férias"
 
+    @staticmethod
+    def calendario(inicio: date, fim: date) -> CalendarioCompetencias:
+        """Retorna o calendário (compartilhado) de competências entre duas datas."""
+        return CalendarioCompetencias.para(inicio, fim)
+
     @staticmethod
     def gerar_periodos(inicio: date, fim: date) -> list[date]:
         """Gera períodos mensais entre duas datas, incluindo apenas até 'fim'."""
-        periodos = []
-        atual = inicio
-        while atual <= fim:
-            periodos.append(atual)
-            atual += relativedelta(months=1)
-        return periodos
+        return list(CalendarioCompetencias.para(inicio, fim).datas)
 
     @abstractmethod
     def total_por_competencia(self, competencia: date):
@@ -45,15 +47,10 @@ class Folhas(ABC):
 
     def total_mensal_no_intervalo(self, ano_inicio: int, ano_fim: int) -> pd.DataFrame:
         """Calcula o total mensal gasto em um intervalo de anos."""
-
-        df_total = pd.DataFrame()
-        for ano in range(ano_inicio, ano_fim + 1):
-            df_ano = self.total_anual(ano)
-            if ano == ano_inicio:
-                df_total = df_ano
-            else:
-                df_total = pd.concat([df_total, df_ano], ignore_index=True)
-        return df_total
+        anos = [self.total_anual(ano) for ano in range(ano_inicio, ano_fim + 1)]
+        if not anos:
+            return pd.DataFrame()
+        return pd.concat(anos, ignore_index=True)
 
     def total_anual_no_intervalo(self, ano_inicio: int, ano_fim: int) -> pd.DataFrame:
         """Calcula o total anual gasto em um intervalo de anos, agrupando por ano."""
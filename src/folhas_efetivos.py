@@ -1,15 +1,31 @@
 from dataclasses import dataclass
 from datetime import date
 
+import numpy as np
 import pandas as pd
 
-from src.folha import CalculaFolha, Folha
+from src.armazenamento_folhas import ArmazenamentoColunar, ArmazenamentoFolhas
+from src.folha import (
+    ROTULOS_CAMPOS,
+    CalculaFolha,
+    Folha,
+    LoteFolhas,
+    arredonda_valores,
+)
 from src.folhas import Folhas
 from src.funcionario import Funcionario
 from src.tabela_salario import Tabela
 
 TAXA_DESCONTO = 0.005  # 0,5% ao mês
 
+# Campos somados nos totais de cada competência e as colunas correspondentes
+COLUNAS_TOTAIS = {
+    "total": "Total Efetivos",
+    "fufin_patronal": "Fufin Patronal",
+    "bhprev_patronal": "BHPrev Patronal",
+    "bhprev_complementar_patronal": "BHPrev Complementar Patronal",
+}
+
 
 @dataclass
 class GastoMensalEfetivos:
@@ -19,24 +35,65 @@ class GastoMensalEfetivos:
     bhprev_complementar_patronal: float
 
 
+def _soma_por_servidor(valores: np.ndarray) -> np.ndarray:
+    """Soma as competências (linhas) de cada servidor, na ordem das competências.
+
+    A soma acumulada reproduz a ordem da soma mês a mês; `sum` usaria soma em pares
+    e poderia diferir nos últimos dígitos."""
+    if not len(valores):
+        return np.zeros(valores.shape[1])
+    return np.cumsum(valores, axis=0)[-1]
+
+
 class FolhasEfetivos(Folhas):
     def __init__(
-        self, tabela: Tabela = Tabela, calcula_folha: CalculaFolha = CalculaFolha
+        self,
+        tabela: Tabela | None = None,
+        calcula_folha: CalculaFolha = CalculaFolha,
+        vetorizado: bool = True,
+        armazenamento: type[ArmazenamentoFolhas] = ArmazenamentoColunar,
     ):
-        """Inicializa a classe as folhas."""
+        """Inicializa a classe as folhas.
+
+        Se `vetorizado` for verdadeiro e a calculadora de folha oferecer
+        `calcula_lote`, as folhas são calculadas em lote para todos os funcionários.
+        Caso contrário, são calculadas uma a uma com `calcula`.
+
+        `armazenamento` define como as folhas são guardadas (ver
+        `src.armazenamento_folhas`). Sem `tabela`, usa uma que segue
+        `config.param`.
+
+        Os totais de todas as competências são somados de uma vez na primeira
+        consulta e reaproveitados até que alguma folha seja adicionada ou removida."""
         self.servidores = set()  # Conjunto para armazenar CMs únicos
-        self.folhas = {}  # {competencia: {cm: Folha}}
-        self.tabela = tabela
+        self.folhas = armazenamento()  # lido como {competencia: {cm: Folha}}
+        self._totais = None  # {competencia: np.ndarray dos COLUNAS_TOTAIS}
+        self.tabela = tabela if tabela is not None else Tabela()
         self.calcula_folha = calcula_folha
+        self.vetorizado = vetorizado
 
     def adiciona_folha(self, competencia: date, cm: int, folha: Folha | None):
         """Adiciona uma folha de pagamento para um funcionário em uma competência específica."""
         if not folha:
             return
         self.servidores.add(cm)
-        if competencia not in self.folhas:
-            self.folhas[competencia] = {}
-        self.folhas[competencia][cm] = folha
+        self.folhas.adiciona(competencia, cm, folha)
+        self._totais = None
+
+    def adiciona_lote(self, lote: LoteFolhas):
+        """Adiciona as folhas de um lote calculado para vários funcionários.
+
+        Assim como em `calcula_folhas`, todos os funcionários do lote passam a
+        constar em `servidores`, mesmo os que não tiverem folha no período."""
+        self.servidores.update(lote.cms)
+        self.folhas.adiciona_lote(lote)
+        self._totais = None
+
+    def remove_servidor(self, cm: int):
+        """Remove todas as folhas de um funcionário, para que sejam recalculadas."""
+        self.servidores.discard(cm)
+        self.folhas.remove_servidor(cm)
+        self._totais = None
 
     def _calcula_folhas_funcionario(
         self, funcionario: Funcionario, inicio: date, fim: date
@@ -45,7 +102,7 @@ class FolhasEfetivos(Folhas):
         cm = funcionario.cm
         calculadora_folha = self.calcula_folha(self.tabela)
 
-        for competencia in self.gerar_periodos(inicio, fim):
+        for competencia in self.calendario(inicio, fim):
             folha = calculadora_folha.calcula(funcionario, competencia)
             self.adiciona_folha(competencia, cm, folha)
 
@@ -53,180 +110,136 @@ class FolhasEfetivos(Folhas):
         """Calcula as folhas de pagamento para uma lista de funcionários."""
         for funcionario in funcionarios:
             self.servidores.add(funcionario.cm)
+
+        calculadora_folha = self.calcula_folha(self.tabela)
+        if self.vetorizado and hasattr(calculadora_folha, "calcula_lote"):
+            lote = calculadora_folha.calcula_lote(
+                funcionarios, self.calendario(inicio, fim).datas
+            )
+            self.adiciona_lote(lote)
+            return
+
+        for funcionario in funcionarios:
             self._calcula_folhas_funcionario(funcionario, inicio, fim)
 
+    def _totais_por_competencia(self) -> dict[date, np.ndarray]:
+        """Totais (COLUNAS_TOTAIS) de cada competência, somados de uma vez."""
+        if self._totais is None:
+            competencias, somas = self.folhas.somas(tuple(COLUNAS_TOTAIS))
+            self._totais = dict(zip(competencias, somas))
+        return self._totais
+
     def total_por_competencia(self, competencia: date) -> GastoMensalEfetivos:
         """Calcula o total das folhas de pagamento para uma competência específica."""
-        gasto = GastoMensalEfetivos(
-            total_efetivos=0.0,
-            fufin_patronal=0.0,
-            bhprev_patronal=0.0,
-            bhprev_complementar_patronal=0.0,
-        )
-        if competencia not in self.folhas:
-            return gasto
-
-        for _, folha in self.folhas[competencia].items():
-            gasto.total_efetivos += folha.total
-            gasto.fufin_patronal += folha.fufin_patronal
-            gasto.bhprev_patronal += folha.bhprev_patronal
-            gasto.bhprev_complementar_patronal += folha.bhprev_complementar_patronal
-
-        return gasto
+        totais = self._totais_por_competencia().get(competencia)
+        if totais is None:
+            return GastoMensalEfetivos(0.0, 0.0, 0.0, 0.0)
+        return GastoMensalEfetivos(*(float(total) for total in totais))
 
     def total_anual(self, ano: int) -> pd.DataFrame:
         """Gera um DataFrame com os totais de um ano, incluindo 13º e 1/3 férias."""
-
-        def append_gasto(ano, competencia_label, gasto: GastoMensalEfetivos):
-            dados.append(
-                {
-                    "ano": ano,
-                    "competencia": competencia_label,
-                    "Total Efetivos": gasto.total_efetivos,
-                    "Fufin Patronal": gasto.fufin_patronal,
-                    "BHPrev Patronal": gasto.bhprev_patronal,
-                    "BHPrev Complementar Patronal": gasto.bhprev_complementar_patronal,
-                }
-            )
-
-        periodos = self.gerar_periodos(date(ano, 1, 1), date(ano, 12, 1))
-        dados = []
-        for competencia in periodos:
-            gasto = self.total_por_competencia(competencia)
-            append_gasto(ano, Folhas.formata_data(competencia), gasto)
-
-        # Adiciona o 13º salário
-        append_gasto(ano, Folhas.formata_13o(ano), self._calcula_13o(ano))
-
-        # Adiciona o 1/3 de férias
-        append_gasto(
-            ano, Folhas.formata_terco_ferias(ano), self._calcula_terco_ferias(ano)
+        return self.total_mensal_no_intervalo(ano, ano)
+
+    def total_mensal_no_intervalo(self, ano_inicio: int, ano_fim: int) -> pd.DataFrame:
+        """Totais de cada competência do intervalo, seguidos em cada ano do 13º
+        salário (igual a dezembro) e do 1/3 de férias (1/3 de dezembro).
+
+        O DataFrame é montado de uma vez a partir dos totais por competência."""
+        num_anos = max(ano_fim - ano_inicio + 1, 0)
+        calendario = self.calendario(date(ano_inicio, 1, 1), date(ano_fim, 12, 1))
+        totais = self._totais_por_competencia()
+        zeros = np.zeros(len(COLUNAS_TOTAIS))
+
+        mensais = np.array(
+            [totais.get(competencia, zeros) for competencia in calendario.datas]
+        ).reshape(num_anos, 12, len(COLUNAS_TOTAIS))
+        dezembro = mensais[:, 11:12]
+        valores = np.concatenate(
+            [mensais, dezembro, arredonda_valores(dezembro / 3)], axis=1
+        ).reshape(num_anos * 14, len(COLUNAS_TOTAIS))
+
+        anos = range(ano_inicio, ano_fim + 1)
+        rotulos = []
+        for i, ano in enumerate(anos):
+            rotulos.extend(calendario.rotulos[12 * i : 12 * (i + 1)])
+            rotulos.append(Folhas.formata_13o(ano))
+            rotulos.append(Folhas.formata_terco_ferias(ano))
+
+        df = pd.DataFrame(
+            {
+                "ano": np.repeat(np.arange(ano_inicio, ano_inicio + num_anos), 14),
+                "competencia": rotulos,
+            }
         )
-
-        df = pd.DataFrame(dados)
+        for coluna, valores_coluna in zip(COLUNAS_TOTAIS.values(), valores.T):
+            df[coluna] = valores_coluna
         return df
 
-    def _calcula_13o(self, ano: int) -> GastoMensalEfetivos:
-        """Calcula o total do 13º salário para o ano especificado - igual ao valor de dezembro."""
-
-        competencia = date(ano, 12, 1)
-
-        return self.total_por_competencia(competencia)
-
-    def _calcula_terco_ferias(self, ano: int) -> GastoMensalEfetivos:
-        """Calcula o total do 1/3 de férias para o ano especificado - 1/3 do valor de dezembro."""
-
-        competencia = date(ano, 12, 1)
-        tot_dez = self.total_por_competencia(competencia)
-
-        return GastoMensalEfetivos(
-            total_efetivos=round(tot_dez.total_efetivos / 3, 2),
-            fufin_patronal=round(tot_dez.fufin_patronal / 3, 2),
-            bhprev_patronal=round(tot_dez.bhprev_patronal / 3, 2),
-            bhprev_complementar_patronal=round(
-                tot_dez.bhprev_complementar_patronal / 3, 2
-            ),
-        )
-
     def exporta_folhas_do_funcionario(
         self, cm: int, inicio: date, fim: date
     ) -> pd.DataFrame:
-        """Exporta as folhas de um funcionário específico para um dataframe."""
-        dados = []
-        for competencia in self.gerar_periodos(inicio, fim):
-            if competencia in self.folhas and cm in self.folhas[competencia]:
-                folha = self.folhas[competencia][cm]
-                dados.append(
-                    {"Competência": Folhas.formata_data(competencia), **folha.to_dict()}
-                )
-            else:
-                # Folha em branco para meses sem dados
-                dados.append(
-                    {
-                        "Competência": Folhas.formata_data(competencia),
-                        **Folha().to_dict(),
-                    }
-                )
-
+        """Exporta as folhas de um funcionário específico para um dataframe.
+
+        Meses sem folha aparecem como uma folha em branco."""
+        calendario = self.calendario(inicio, fim)
+        lote = self.folhas.extrai(calendario.datas, [cm])
+
+        dados = {
+            "Competência": list(calendario.rotulos),
+            "Nível": [str(nivel) for nivel in lote.niveis[:, 0]],
+        }
+        for campo, rotulo in ROTULOS_CAMPOS.items():
+            dados[rotulo] = getattr(lote, campo)[:, 0]
         return pd.DataFrame(dados)
 
     def calcula_metricas(self, inicio: date, fim: date) -> pd.DataFrame:
-        """Calcula métricas adicionais para as folhas de pagamento no intervalo especificado."""
-        # Exemplo de métrica: total anual por funcionário
-        metricas = []
-        for cm in sorted(self.servidores):
-            dados = {
-                "CM": cm,
-                "Nível inicial": self._calcula_nivel_inicial(cm, inicio, fim),
-                "Salário Inicial": self._calcula_salario_inicial(cm, inicio, fim),
-                "Valor Inicial lim. teto": self._calcula_valor_inicial(cm, inicio, fim),
-                "Valor Final lim. teto": self._calcula_valor_final(cm, inicio, fim),
-                "Média": self._calcula_media(cm, inicio, fim),
-                "VPL (0,5%)": self._calcula_vpl(cm, inicio, fim),
-                "Soma Total": self._calcula_soma(cm, inicio, fim),
+        """Calcula métricas das folhas de pagamento de cada funcionário no intervalo.
+
+        Todas as métricas são calculadas de uma vez, sobre a matriz
+        (competências × servidores) das folhas do intervalo:
+        - Nível inicial, Salário Inicial e Valor Inicial: da primeira competência em
+          que o funcionário tem folha;
+        - Valor Final: da última competência em que o funcionário tem folha;
+        - Média e Soma Total: dos totais das competências com folha;
+        - VPL: totais descontados a TAXA_DESCONTO ao mês desde `inicio`."""
+        cms = sorted(self.servidores)
+        lote = self.folhas.extrai(self.calendario(inicio, fim).datas, cms)
+
+        num_meses = len(lote.competencias)
+        ativo = lote.ativo
+        possui_folha = ativo.any(axis=0)
+        colunas = np.arange(len(cms))
+        if num_meses:
+            primeira = ativo.argmax(axis=0)
+            ultima = num_meses - 1 - ativo[::-1].argmax(axis=0)
+        else:
+            primeira = ultima = np.zeros(len(cms), dtype=int)
+
+        def na_competencia(valores: np.ndarray, linhas: np.ndarray) -> np.ndarray:
+            if not num_meses:
+                return np.zeros(len(cms))
+            return np.where(possui_folha, valores[linhas, colunas], 0.0)
+
+        fatores_desconto = np.array(
+            [(1 + TAXA_DESCONTO) ** meses for meses in range(num_meses)]
+        )
+        soma = _soma_por_servidor(lote.total)
+        vpl = _soma_por_servidor(lote.total / fatores_desconto[:, None])
+        quantidade = ativo.sum(axis=0)
+        media = arredonda_valores(soma / np.maximum(quantidade, 1))
+
+        return pd.DataFrame(
+            {
+                "CM": cms,
+                "Nível inicial": [
+                    lote.niveis[linha, coluna] if possui else None
+                    for linha, coluna, possui in zip(primeira, colunas, possui_folha)
+                ],
+                "Salário Inicial": na_competencia(lote.salario, primeira),
+                "Valor Inicial lim. teto": na_competencia(lote.total, primeira),
+                "Valor Final lim. teto": na_competencia(lote.total, ultima),
+                "Média": np.where(quantidade > 0, media, 0.0),
+                "VPL (0,5%)": arredonda_valores(vpl),
+                "Soma Total": soma,
             }
-            metricas.append(dados)
-        return pd.DataFrame(metricas)
-
-    def _calcula_nivel_inicial(self, cm: int, inicio: date, fim: date) -> float | None:
-        """Calcula o nível inicial para um funcionário na primeira competência que ele/a aparece."""
-        for competencia in self.gerar_periodos(inicio, fim):
-            if competencia in self.folhas and cm in self.folhas[competencia]:
-                folha: Folha = self.folhas[competencia][cm]
-                return folha.nivel
-        return None
-
-    def _calcula_salario_inicial(self, cm: int, inicio: date, fim: date) -> float:
-        """Calcula o salario inicial para um funcionário na primeira competência que ele/a aparece."""
-        for competencia in self.gerar_periodos(inicio, fim):
-            if competencia in self.folhas and cm in self.folhas[competencia]:
-                folha: Folha = self.folhas[competencia][cm]
-                return folha.salario
-        return 0.0
-
-    def _calcula_valor_inicial(self, cm: int, inicio: date, fim: date) -> float:
-        """Calcula o valor inicial para um funcionário na primeira competência que ele/a aparece."""
-        for competencia in self.gerar_periodos(inicio, fim):
-            if competencia in self.folhas and cm in self.folhas[competencia]:
-                folha: Folha = self.folhas[competencia][cm]
-                return folha.total
-        return 0.0
-
-    def _calcula_valor_final(self, cm: int, inicio: date, fim: date) -> float:
-        """Calcula o valor final para um funcionário na última competência que ele/a aparece."""
-        for competencia in reversed(list(self.gerar_periodos(inicio, fim))):
-            if competencia in self.folhas and cm in self.folhas[competencia]:
-                folha: Folha = self.folhas[competencia][cm]
-                return folha.total
-        return 0.0
-
-    def _calcula_media(self, cm: int, inicio: date, fim: date) -> float:
-        """Calcula a média para um funcionário no intervalo especificado."""
-        total = 0.0
-        count = 0
-        for competencia in self.gerar_periodos(inicio, fim):
-            if competencia in self.folhas and cm in self.folhas[competencia]:
-                folha: Folha = self.folhas[competencia][cm]
-                total += folha.total
-                count += 1
-        return round(total / count, 2) if count > 0 else 0.0
-
-    def _calcula_vpl(self, cm: int, inicio: date, fim: date) -> float:
-        """Calcula o Valor Presente Líquido (VPL) para um funcionário no intervalo especificado."""
-        vpl = 0.0
-        meses = 0
-        for competencia in self.gerar_periodos(inicio, fim):
-            if competencia in self.folhas and cm in self.folhas[competencia]:
-                folha: Folha = self.folhas[competencia][cm]
-                vpl += folha.total / ((1 + TAXA_DESCONTO) ** meses)
-            meses += 1
-        return round(vpl, 2)
-
-    def _calcula_soma(self, cm: int, inicio: date, fim: date) -> float:
-        """Calcula a soma total para um funcionário no intervalo especificado."""
-        total = 0.0
-        for competencia in self.gerar_periodos(inicio, fim):
-            if competencia in self.folhas and cm in self.folhas[competencia]:
-                folha: Folha = self.folhas[competencia][cm]
-                total += folha.total
-        return total
+        )
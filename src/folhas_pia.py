@@ -10,10 +10,13 @@ from src.tabela_salario import Tabela
 class FolhasPIA(Folhas):
     """Representa as folhas do PIA de todos os funcionários."""
 
-    def __init__(self, tabela: Tabela = Tabela, calcula_pia: CalculaPIA = CalculaPIA):
-        """Inicializa a classe as folhas."""
+    def __init__(
+        self, tabela: Tabela | None = None, calcula_pia: CalculaPIA = CalculaPIA
+    ):
+        """Inicializa a classe as folhas. Sem `tabela`, usa uma que segue
+        `config.param`."""
         self.pias = {}  # {competencia: {cm: valor}}
-        self.tabela = tabela
+        self.tabela = tabela if tabela is not None else Tabela()
         self.calcula_pia = calcula_pia
 
     def adiciona_pia(self, competencia: date, cm: int, pia: float | None):
@@ -26,6 +29,23 @@ class FolhasPIA(Folhas):
             self.pias[competencia] = {}
         self.pias[competencia][cm] = pia
 
+    def remove_servidor(self, cm: int):
+        """Remove o PIA de um funcionário, para que seja recalculado."""
+        for competencia in list(self.pias):
+            self.pias[competencia].pop(cm, None)
+            if not self.pias[competencia]:
+                del self.pias[competencia]
+
+    def ordena_servidores(self, cms: list[int]):
+        """Reordena os PIAs de cada competência na ordem de `cms`, que é a ordem
+        em que `total_por_competencia` os soma. PIAs recalculados individualmente
+        voltam assim à posição que teriam no cálculo de todos os funcionários."""
+        posicao = {cm: i for i, cm in enumerate(cms)}
+        for competencia, pias in self.pias.items():
+            self.pias[competencia] = dict(
+                sorted(pias.items(), key=lambda item: posicao.get(item[0], len(cms)))
+            )
+
     def _calcula_pia_funcionario(self, funcionario: Funcionario) -> float | None:
         """Calcula o PIA para um funcionário específico."""
         cm = funcionario.cm
@@ -61,12 +81,12 @@ class FolhasPIA(Folhas):
                 }
             )
 
-        periodos = self.gerar_periodos(date(ano, 1, 1), date(ano, 12, 1))
+        calendario = self.calendario(date(ano, 1, 1), date(ano, 12, 1))
 
         dados = []
-        for competencia in periodos:
+        for competencia, rotulo in zip(calendario.datas, calendario.rotulos):
             total = self.total_por_competencia(competencia)
-            append_gasto(ano, Folhas.formata_data(competencia), total)
+            append_gasto(ano, rotulo, total)
 
         # 13o e férias são zero para PIA
         append_gasto(ano, Folhas.formata_13o(ano), 0.0)
@@ -78,20 +98,14 @@ class FolhasPIA(Folhas):
         self, cm: int, inicio: date, fim: date
     ) -> pd.DataFrame:
         """Exporta o PIA de um funcionário específico para um DataFrame."""
-        dados = []
-        for competencia in self.gerar_periodos(inicio, fim):
-            if competencia in self.pias and cm in self.pias[competencia]:
-                valor_pia = self.pias[competencia][cm]
-                dados.append(
-                    {"Competência": Folhas.formata_data(competencia), "PIA": valor_pia}
-                )
-            else:
-                # Folha em branco para meses sem dados
-                dados.append(
-                    {
-                        "Competência": Folhas.formata_data(competencia),
-                        "PIA": 0.0,
-                    }
-                )
-
-        return pd.DataFrame(dados)
+        calendario = self.calendario(inicio, fim)
+        return pd.DataFrame(
+            {
+                "Competência": list(calendario.rotulos),
+                # Meses sem PIA ficam zerados
+                "PIA": [
+                    self.pias.get(competencia, {}).get(cm, 0.0)
+                    for competencia in calendario.datas
+                ],
+            }
+        )
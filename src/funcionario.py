@@ -1,11 +1,14 @@
-from dataclasses import dataclass
+from bisect import bisect_right
+from dataclasses import astuple, dataclass
 from datetime import date
 from enum import Enum
 from typing import Optional
 
+import numpy as np
+
 from src.carreira import Carreira, Progressao
 from src.classe import Classe
-from src.nivel import Nivel
+from src.nivel import SEM_NIVEL, Nivel, codifica_nivel
 from src.progressoes_horizontais import progressoes_horizontais
 
 
@@ -30,6 +33,12 @@ class Aposentadoria:
     data_aposentadoria: date
     num_art_98_data_aposentadoria: int
     aderiu_pia: bool
+    data_compulsoria: Optional[date] = None  # Aposentadoria compulsória, se conhecida
+
+
+def _mes(data: date) -> int:
+    """Número sequencial do mês da data, para comparar competências."""
+    return data.year * 12 + data.month - 1
 
 
 class Funcionario:
@@ -49,41 +58,105 @@ class Funcionario:
         self.progressoes = [ultima_progressao]
         self.carreira = carreira
 
-    def _calcula_progressoes_ate(self, data: date):
-        ultima_progressao = self.progressoes[-1]
-
-        while ultima_progressao and data > ultima_progressao.data:
-            # Sempre progride verticalmente e horizontalmente respeitando a letra máxima.
-            # Quando a letra máxima for None, progride até o máximo permitido.
-            ultima_progressao = self.carreira.progride_verticalmente_e_horizontalmente(
-                ultima_progressao,
-                letra_maxima=progressoes_horizontais.obtem_letra_maxima(self.cm),
-                data_condicao_aposentadoria=self.aposentadoria.data_condicao_aposentadoria,
-            )
+    @property
+    def progressoes(self) -> list[Progressao]:
+        """Progressões do servidor, em ordem cronológica."""
+        return self._progressoes
+
+    @progressoes.setter
+    def progressoes(self, progressoes: list[Progressao]) -> None:
+        self._progressoes = progressoes
+        self._meses_progressoes = [_mes(p.data) for p in progressoes]
+
+    def _meses_das_progressoes(self) -> list[int]:
+        """Meses das progressões, alinhados a `progressoes`, para busca binária.
 
-            if ultima_progressao:
-                self.progressoes.append(ultima_progressao)
+        Progressões acrescentadas diretamente à lista são incorporadas aqui."""
+        meses = self._meses_progressoes
+        if len(meses) != len(self._progressoes):
+            meses.extend(_mes(p.data) for p in self._progressoes[len(meses) :])
+        return meses
+
+    def _calcula_progressoes_ate(self, data: date):
+        if data <= self.progressoes[-1].data:
+            return
+
+        # Sempre progride verticalmente e horizontalmente respeitando a letra máxima.
+        # Quando a letra máxima for None, progride até o máximo permitido.
+        for progressao in self.carreira.trajetoria(
+            self.progressoes[-1],
+            letra_maxima=self.letra_maxima(),
+        ):
+            self.progressoes.append(progressao)
+            if data <= progressao.data:
+                break
+
+    def letra_maxima(self) -> Optional[str]:
+        """Letra máxima das progressões horizontais (None: todas as permitidas
+        pela carreira), conforme as letras adquiridas no Aeros."""
+        return progressoes_horizontais.obtem_letra_maxima(self.cm)
+
+    def _esta_ativo_no_mes(self, mes: int) -> bool:
+        # Equivale a comparar o dia 1o do mês com as datas de admissão e aposentadoria
+        return _mes(self.data_admissao) < mes <= _mes(
+            self.aposentadoria.data_aposentadoria
+        )
 
     def obtem_nivel_para(self, data: date) -> Optional[Nivel]:
         """Retorna o nível que o servidor estará em determinada data.
         Se tiver aposentado, retorna None"""
 
-        # Se a data for após o dia 1o, muda para o dia 1o
-        if data.day > 1:
-            data = date(data.year, data.month, 1)
-        if data <= self.data_admissao:  # Funcionário não admitido
-            return None
-        if data > self.aposentadoria.data_aposentadoria:  # Funcionário aposentado
+        if not self._esta_ativo_no_mes(_mes(data)):  # Não admitido ou aposentado
             return None
 
-        self._calcula_progressoes_ate(data)
+        # Se a data for após o dia 1o, muda para o dia 1o
+        self._calcula_progressoes_ate(date(data.year, data.month, 1))
+
+        # Vale a última progressão ocorrida até o mês da data, inclusive
+        idx = bisect_right(self._meses_das_progressoes(), _mes(data)) - 1
+        if idx >= 0:
+            return self.progressoes[idx].nivel
+
+    def niveis_para(self, competencias: list[date]) -> np.ndarray:
+        """Versão em lote de `obtem_nivel_para`: retorna o nível de cada competência
+        codificado por `codifica_nivel`, com SEM_NIVEL quando não houver nível."""
+        if type(self).obtem_nivel_para is not Funcionario.obtem_nivel_para:
+            # Subclasse com regra própria de nível: consulta mês a mês
+            return np.array(
+                [codifica_nivel(self.obtem_nivel_para(c)) for c in competencias],
+                dtype=np.int16,
+            )
 
-        for progressao in reversed(self.progressoes):
-            dt_prog = progressao.data
-            if dt_prog < data or (
-                dt_prog.month == data.month and dt_prog.year == data.year
-            ):
-                return progressao.nivel
+        meses = np.array([_mes(competencia) for competencia in competencias], dtype=int)
+        ativo = (meses > _mes(self.data_admissao)) & (
+            meses <= _mes(self.aposentadoria.data_aposentadoria)
+        )
+        codigos = np.full(len(meses), SEM_NIVEL, dtype=np.int16)
+        if not ativo.any():
+            return codigos
+
+        ultimo_mes = int(meses[ativo].max())
+        self._calcula_progressoes_ate(date(ultimo_mes // 12, ultimo_mes % 12 + 1, 1))
+
+        idx = np.searchsorted(self._meses_das_progressoes(), meses, side="right") - 1
+        ativo &= idx >= 0
+        codigos_progressoes = np.array(
+            [codifica_nivel(p.nivel) for p in self.progressoes], dtype=np.int16
+        )
+        codigos[ativo] = codigos_progressoes[idx[ativo]]
+        return codigos
+
+    def assinatura(self) -> tuple:
+        """Dados de entrada dos quais as folhas, o PIA e as progressões do servidor
+        dependem. Se a assinatura mudar, a projeção do servidor deve ser refeita."""
+        return (
+            self.data_admissao,
+            astuple(self.dados_folha),
+            astuple(self.aposentadoria),
+            astuple(self.progressoes[0]),
+            type(self.carreira),
+            self.letra_maxima(),
+        )
 
     def to_dict(self):
         return {
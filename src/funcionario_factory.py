@@ -21,6 +21,7 @@ class FuncionarioFactory:
         ultima_progressao: Progressao,
         carreira: Carreira,
         grupo_de_controle: int,
+        data_compulsoria: date | None = None,
     ) -> Funcionario:
 
         if grupo_de_controle == 1:
@@ -42,6 +43,7 @@ class FuncionarioFactory:
             data_aposentadoria=data_aposentadoria,
             num_art_98_data_aposentadoria=num_art_98_data_aposentadoria,
             aderiu_pia=aderiu_pia,
+            data_compulsoria=data_compulsoria,
         )
         return Funcionario(
             cm=cm,
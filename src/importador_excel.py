@@ -1,16 +1,35 @@
 from datetime import date
 
+import numpy as np
 import pandas as pd
+from dateutil.relativedelta import relativedelta
+from openpyxl import load_workbook
 
+from src.aposentadoria import IDADE_COMPULSORIA
 from src.banco_de_dados import BancoDeDados
 from src.carreira import atribui_carreira
 from src.classe import Classe
-from src.folha import Folha
+from src.folha import LoteFolhas, arredonda_valores
 from src.funcionario import Funcionario
 from src.funcionario_factory import FuncionarioFactory
 from src.nivel import Nivel
 from src.regra_transicao import RegraTransicao
 
+# Colunas das linhas de folha de cada aba de funcionário
+COLUNA_NIVEL = 4
+COLUNA_PIA = 19
+COLUNAS_FOLHA = {
+    "salario": 5,
+    "anuenio": 9,
+    "ats": 7,
+    "total_antes_limite_prefeito": 13,
+    "total": 14,
+    "fufin_patronal": 15,
+    "bhprev_patronal": 16,
+    "bhprev_complementar_patronal": 17,
+}
+NUM_COLUNAS = 21
+
 
 def obtem_tempos_licencas() -> dict[int, int]:
     """Obtém os tempos de licenças que interrompem contagem de progressão dos funcionários."""
@@ -29,36 +48,42 @@ class ImportadorProjecaoExcel:
         self.cmbh = None
 
     def importa(self, caminho_excel: str, importa_folhas: bool = True):
-        """Importa os dados de funcionários de um arquivo Excel."""
+        """Importa os dados de funcionários de um arquivo Excel.
+
+        A planilha é lida em uma única passada (modo somente leitura do openpyxl) e
+        as folhas de todas as abas são convertidas de uma vez e adicionadas em lote."""
         from src.cmbh import CMBH  # Evita importação circular
 
         self.cmbh = CMBH()
-        xls = pd.ExcelFile(caminho_excel)
-
-        for sheet_name in xls.sheet_names:
-            try:
-                cm = int(sheet_name)
-            except ValueError:
-                continue  # Pula abas que não são Funcionario
-
-            df = pd.read_excel(xls, sheet_name=sheet_name, header=None)
-
-            # As duas primeiras linhas contêm dados do Funcionario
-            funcionario_data = df.iloc[0:2].values
-            funcionario = self._cria_funcionario_da_linha(funcionario_data)
-            self.cmbh.funcionarios[cm] = funcionario
-
-            if not importa_folhas:
-                continue
-
-            # Linhas 4 em diante são Folhas de pagamento
-            folhas_data = df.iloc[3:]
-            for _, linha in folhas_data.iterrows():
-                if pd.isna(linha[4]):  # nível vazio, não tem folha
+        linhas_folhas = []  # [(cm, linha)]
+
+        workbook = load_workbook(caminho_excel, read_only=True, data_only=True)
+        try:
+            for sheet_name in workbook.sheetnames:
+                try:
+                    cm = int(sheet_name)
+                except ValueError:
+                    continue  # Pula abas que não são Funcionario
+
+                linhas = [
+                    _completa_linha(linha)
+                    for linha in workbook[sheet_name].iter_rows(values_only=True)
+                ]
+
+                # As duas primeiras linhas contêm dados do Funcionario
+                funcionario = self._cria_funcionario_da_linha(linhas[0:2])
+                self.cmbh.funcionarios[cm] = funcionario
+
+                if not importa_folhas:
                     continue
 
-                self._adiciona_folha_da_linha(funcionario.cm, linha)
-                self._adiciona_pia_da_linha(funcionario.cm, linha)
+                # Linhas 4 em diante são Folhas de pagamento
+                linhas_folhas.extend((funcionario.cm, linha) for linha in linhas[3:])
+        finally:
+            workbook.close()
+
+        if linhas_folhas:
+            self._adiciona_folhas_e_pias(linhas_folhas)
 
         return self.cmbh
 
@@ -84,6 +109,12 @@ class ImportadorProjecaoExcel:
             int(linha[1][18]) if not pd.isna(linha[1][18]) else 0
         )
         aderiu_pia = linha[1][20] != "N"  # Qualquer coisa diferente de "N" aderiu
+        data_nascimento = _parse_data(linha[1][11])
+        data_compulsoria = (
+            data_nascimento + relativedelta(years=IDADE_COMPULSORIA)
+            if isinstance(data_nascimento, date)
+            else None
+        )
         ultima_progressao = RegraTransicao.primeira_progressao(
             data_admissao, procurador, self.licencas.get(cm, 0)
         )
@@ -104,31 +135,79 @@ class ImportadorProjecaoExcel:
             ultima_progressao=ultima_progressao,
             carreira=carreira,
             grupo_de_controle=grupo_de_controle,
+            data_compulsoria=data_compulsoria,
         )
 
-    def _adiciona_folha_da_linha(self, cm: int, linha) -> None:
-        def _parse_float(valor_str):
-            return round(float(valor_str), 2) if not pd.isna(valor_str) else 0.0
-
-        competencia = date(year=int(linha[0]), month=int(linha[1]), day=1)
-        folha = Folha(
-            nivel=Nivel.from_string(linha[4]),
-            salario=_parse_float(linha[5]),
-            anuenio=_parse_float(linha[9]),
-            ats=_parse_float(linha[7]),
-            total_antes_limite_prefeito=_parse_float(linha[13]),
-            total=_parse_float(linha[14]),
-            fufin_patronal=_parse_float(linha[15]),
-            bhprev_patronal=_parse_float(linha[16]),
-            bhprev_complementar_patronal=_parse_float(linha[17]),
+    def _adiciona_folhas_e_pias(self, linhas_folhas: list[tuple[int, tuple]]) -> None:
+        """Converte as linhas de folhas de todos os funcionários em um lote.
+
+        Linhas sem nível não têm folha. Os valores são arredondados a 2 casas e
+        valores vazios viram 0.0."""
+        cms_linhas = np.array([cm for cm, _ in linhas_folhas])
+        dados = np.array([linha for _, linha in linhas_folhas], dtype=object)
+        com_nivel = ~pd.isna(dados[:, COLUNA_NIVEL])
+        cms_linhas = cms_linhas[com_nivel]
+        dados = dados[com_nivel]
+        if not len(dados):
+            return
+
+        # Competências como meses absolutos (ano * 12 + mês - 1)
+        meses = dados[:, 0].astype(int) * 12 + dados[:, 1].astype(int) - 1
+        meses_unicos, idx_competencias = _unicos_na_ordem(meses)
+        competencias = [date(mes // 12, mes % 12 + 1, 1) for mes in meses_unicos]
+        cms, idx_cms = _unicos_na_ordem(cms_linhas)
+
+        niveis_unicos, idx_niveis = _unicos_na_ordem(dados[:, COLUNA_NIVEL])
+        niveis_linhas = np.array(
+            [Nivel.from_string(nivel) for nivel in niveis_unicos], dtype=object
+        )[idx_niveis]
+
+        forma = (len(competencias), len(cms))
+        celulas = (idx_competencias, idx_cms)
+        ativo = np.zeros(forma, dtype=bool)
+        ativo[celulas] = True
+        niveis = np.full(forma, None, dtype=object)
+        niveis[celulas] = niveis_linhas
+        valores = {}
+        for campo, coluna in COLUNAS_FOLHA.items():
+            valores[campo] = np.zeros(forma)
+            valores[campo][celulas] = _valores_arredondados(dados[:, coluna])
+
+        self.cmbh.folhas_efetivos.adiciona_lote(
+            LoteFolhas(
+                competencias=competencias,
+                cms=cms.tolist(),
+                ativo=ativo,
+                niveis=niveis,
+                **valores,
+            )
         )
-        return self.cmbh.folhas_efetivos.adiciona_folha(competencia, cm, folha)
 
-    def _adiciona_pia_da_linha(self, cm: int, linha) -> None:
-        if pd.isna(linha[19]):
-            return
+        com_pia = np.flatnonzero(~pd.isna(dados[:, COLUNA_PIA]))
+        pias = _valores_arredondados(dados[com_pia, COLUNA_PIA])
+        for linha, pia in zip(com_pia, pias.tolist()):
+            self.cmbh.folhas_pia.adiciona_pia(
+                competencias[idx_competencias[linha]], int(cms_linhas[linha]), pia
+            )
+
+
+def _completa_linha(linha: tuple) -> tuple:
+    """Completa com None as linhas mais curtas que a largura esperada."""
+    if len(linha) >= NUM_COLUNAS:
+        return linha
+    return linha + (None,) * (NUM_COLUNAS - len(linha))
+
+
+def _unicos_na_ordem(valores: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Retorna os valores únicos na ordem da primeira ocorrência e, para cada
+    valor, o índice do seu único."""
+    indices = {}
+    posicoes = np.array([indices.setdefault(valor, len(indices)) for valor in valores])
+    unicos = np.empty(len(indices), dtype=valores.dtype)
+    unicos[:] = list(indices)
+    return unicos, posicoes
 
-        competencia = date(year=int(linha[0]), month=int(linha[1]), day=1)
-        pia = round(float(linha[19]), 2)
 
-        return self.cmbh.folhas_pia.adiciona_pia(competencia, cm, pia)
+def _valores_arredondados(valores: np.ndarray) -> np.ndarray:
+    vazios = pd.isna(valores)
+    return arredonda_valores(np.where(vazios, 0.0, valores).astype(float))
@@ -0,0 +1,367 @@
+import copy
+import dataclasses
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from src.calendario import CalendarioCompetencias
+from src.carreira import Carreira
+from src.folha import CalculaFolha
+from src.folhas_efetivos import COLUNAS_TOTAIS, GastoMensalEfetivos
+from src.funcionario import Aposentadoria, DadosFolha, Funcionario
+from src.nivel import LETRAS, NUMERO_MAXIMO, SEM_NIVEL
+from src.regras_reenquadramento import (
+    MENOR_TEMPO_PROGRESSAO,
+    simula_passos,
+    tempos_da_carreira,
+)
+from src.tabela_salario import Tabela
+
+# Elementos das matrizes (replicações × servidores × competências) por bloco
+_ELEMENTOS_POR_BLOCO = 4_000_000
+
+
+def _mes(data: date) -> int:
+    return data.year * 12 + data.month - 1
+
+
+def _mes_compulsoria(aposentadoria: Aposentadoria) -> int:
+    """Mês da aposentadoria compulsória. Sem essa data, a aposentadoria anterior à
+    condição só pode ser a compulsória; se não for anterior, não há limite."""
+    if aposentadoria.data_compulsoria is not None:
+        return _mes(aposentadoria.data_compulsoria)
+    if aposentadoria.data_aposentadoria < aposentadoria.data_condicao_aposentadoria:
+        return _mes(aposentadoria.data_aposentadoria)
+    return np.iinfo(np.int64).max
+
+
+@dataclass(frozen=True)
+class ParametrosMonteCarlo:
+    """Distribuições e quantidade de replicações da simulação.
+
+    O atraso da aposentadoria, em meses contados da data em que o servidor
+    completa as condições, segue uma distribuição geométrica com média
+    `atraso_medio_meses`. Por não ter memória, para quem já completou as
+    condições o atraso é contado do início da projeção."""
+
+    replicacoes: int = 1000
+    atraso_medio_meses: float = 12.0
+    percentis: tuple[float, ...] = (5, 50, 95)
+
+
+@dataclass
+class _ServidorReenquadramento:
+    """Dados de um servidor usados na simulação do reenquadramento."""
+
+    numero: int  # Número do nível da última progressão
+    mes: int
+    dia: int
+    limite: int
+    tempos: np.ndarray  # Ver `tempos_da_carreira`
+    letras: np.ndarray  # Ver `SimulacaoMonteCarlo._letras_da_carreira`
+    letra_maxima: int  # Posição em LETRAS da letra máxima das progressões
+    notas: np.ndarray  # Notas das avaliações registradas, em ordem
+
+
+class _FuncionarioCompilado:
+    """Funcionário com os níveis já codificados, para `CalculaFolha.calcula_lote`."""
+
+    def __init__(self, cm: int, dados_folha: DadosFolha, codigos: np.ndarray):
+        self.cm = cm
+        self.dados_folha = dados_folha
+        self.codigos = codigos
+
+    def niveis_para(self, competencias: list[date]) -> np.ndarray:
+        return self.codigos
+
+
+class SimulacaoMonteCarlo:
+    """Simula a incerteza do gasto mensal com efetivos.
+
+    Em cada replicação são sorteados, para cada servidor:
+    - o atraso da aposentadoria em relação à data em que completa as condições;
+    - com `data_migracao`, as notas dos interstícios sem avaliação registrada,
+      reamostradas das notas do próprio servidor (ou de todos, se ele não tiver
+      nenhuma). O reenquadramento é refeito com as regras de
+      CalculaReenquadramento e a diferença de níveis em relação às notas
+      registradas desloca o nível do servidor a partir da migração.
+
+    As folhas são calculadas uma única vez, na compilação: para cada
+    deslocamento de nível sorteado, os valores de todas as competências como se
+    nenhum servidor se aposentasse no intervalo. Cada replicação é então uma
+    soma mascarada dessas matrizes, sem recalcular folhas nem criar objetos."""
+
+    def __init__(
+        self,
+        funcionarios: list[Funcionario],
+        ano_inicio: int,
+        ano_fim: int,
+        data_migracao: date | None = None,
+        avaliacoes=None,  # Avaliacoes: notas por cm, em `notas_do_cm`
+        tabela: Tabela | None = None,
+        calcula_folha: CalculaFolha = CalculaFolha,
+    ):
+        self.funcionarios = funcionarios
+        self.data_migracao = data_migracao
+        self.avaliacoes = avaliacoes
+        self.calcula_folha = calcula_folha(tabela if tabela is not None else Tabela())
+        self.calendario = CalendarioCompetencias.para(
+            date(ano_inicio, 1, 1), date(ano_fim, 12, 1)
+        )
+        self.mes_inicio = _mes(self.calendario.inicio)
+        # {tipo da carreira: letras máximas por número do nível}
+        self._letras_por_carreira = {}
+
+        self._codigos = self._compila_niveis()
+        self._mes_condicao = np.array(
+            [_mes(f.aposentadoria.data_condicao_aposentadoria) for f in funcionarios],
+            dtype=int,
+        )
+        # Último mês possível de atividade, mesmo com atraso na aposentadoria
+        self._mes_compulsoria = np.array(
+            [_mes_compulsoria(f.aposentadoria) for f in funcionarios], dtype=int
+        )
+        self._reenquadramento = (
+            [self._compila_reenquadramento(f) for f in funcionarios]
+            if data_migracao
+            else []
+        )
+        # Níveis na migração com as notas registradas
+        self._niveis_base = np.array(
+            [
+                self._niveis_reenquadrados(servidor, servidor.notas[None, :])[0]
+                for servidor in self._reenquadramento
+            ],
+            dtype=int,
+        )
+        # {deslocamento: (valores, servidores já calculados)}
+        self._valores = {}
+
+    def _compila_niveis(self) -> np.ndarray:
+        """Níveis codificados (competências × servidores), sem aposentadoria no
+        intervalo. Calculados em cópias, para não alterar as progressões."""
+        fim = self.calendario.fim
+        codigos = np.full(
+            (len(self.calendario), len(self.funcionarios)), SEM_NIVEL, dtype=int
+        )
+        for j, funcionario in enumerate(self.funcionarios):
+            copia = copy.copy(funcionario)
+            copia.aposentadoria = dataclasses.replace(
+                funcionario.aposentadoria, data_aposentadoria=fim
+            )
+            copia.progressoes = funcionario.progressoes[:1]
+            codigos[:, j] = copia.niveis_para(self.calendario.datas)
+        return codigos
+
+    def _compila_reenquadramento(
+        self, funcionario: Funcionario
+    ) -> _ServidorReenquadramento:
+        progressao = funcionario.progressoes[0]
+        carreira = funcionario.carreira
+        registradas = (
+            self.avaliacoes.notas_do_cm(funcionario.cm)
+            if self.avaliacoes is not None
+            else []
+        )
+        return _ServidorReenquadramento(
+            numero=progressao.nivel.numero,
+            mes=_mes(progressao.data),
+            dia=progressao.data.day,
+            limite=carreira._limite(),
+            tempos=tempos_da_carreira(carreira),
+            letras=self._letras_da_carreira(carreira),
+            letra_maxima=LETRAS.index(funcionario.letra_maxima() or LETRAS[-1]),
+            notas=np.array(registradas, dtype=float),
+        )
+
+    def _letras_da_carreira(self, carreira: Carreira) -> np.ndarray:
+        """Posição em LETRAS da maior letra de cada número de nível (índice do
+        array) na carreira, calculada uma vez por carreira."""
+        if type(carreira) not in self._letras_por_carreira:
+            letras = np.zeros(NUMERO_MAXIMO + 1, dtype=int)
+            for numero in range(1, NUMERO_MAXIMO + 1):
+                letras[numero] = LETRAS.index(carreira._letra_maxima_para_nivel(numero))
+            self._letras_por_carreira[type(carreira)] = letras
+        return self._letras_por_carreira[type(carreira)]
+
+    def _max_progressoes(self, servidor: _ServidorReenquadramento) -> int:
+        """Limite para a quantidade de progressões até a migração."""
+        meses = _mes(self.data_migracao) - servidor.mes
+        return max(meses // MENOR_TEMPO_PROGRESSAO + 2, 0)
+
+    def _niveis_reenquadrados(
+        self, servidor: _ServidorReenquadramento, notas: np.ndarray
+    ) -> np.ndarray:
+        """Número do nível na migração em cada replicação (linha de `notas`), com
+        as regras de CalculaReenquadramento (ver `simula_passos`)."""
+        num_replicacoes = len(notas)
+
+        def repete(valor: int) -> np.ndarray:
+            return np.full(num_replicacoes, valor)
+
+        return simula_passos(
+            repete(servidor.numero),
+            repete(servidor.mes),
+            repete(servidor.dia),
+            repete(servidor.limite),
+            np.tile(servidor.tempos, (num_replicacoes, 1)),
+            notas,
+            repete(_mes(self.data_migracao)),
+            repete(self.data_migracao.day),
+        ).final
+
+    def _sorteia_deslocamentos(
+        self, num_replicacoes: int, gerador: np.random.Generator
+    ) -> np.ndarray:
+        """Diferença de níveis na migração (replicações × servidores) entre as
+        notas sorteadas e as registradas."""
+        deslocamentos = np.zeros((num_replicacoes, len(self.funcionarios)), dtype=int)
+        if not self._reenquadramento:
+            return deslocamentos
+
+        todas = np.concatenate([s.notas for s in self._reenquadramento])
+        for j, servidor in enumerate(self._reenquadramento):
+            amostra = servidor.notas if len(servidor.notas) else todas
+            largura = self._max_progressoes(servidor) + 2
+            if not len(amostra) or largura <= len(servidor.notas):
+                continue
+            notas = np.empty((num_replicacoes, largura))
+            notas[:, : len(servidor.notas)] = servidor.notas
+            notas[:, len(servidor.notas) :] = gerador.choice(
+                amostra, size=(num_replicacoes, largura - len(servidor.notas))
+            )
+            deslocamentos[:, j] = (
+                self._niveis_reenquadrados(servidor, notas) - self._niveis_base[j]
+            )
+        return deslocamentos
+
+    def _valores_com_deslocamento(
+        self, deslocamento: int, colunas: np.ndarray
+    ) -> np.ndarray:
+        """Valores (competências × servidores × campos) de COLUNAS_TOTAIS dos
+        servidores em `colunas`, com o número do nível deslocado a partir da
+        migração e limitado à carreira. A letra é limitada à maior do novo número
+        na carreira e, como nas progressões, quem já tinha todas as letras
+        permitidas no número original ganha as do novo, até a letra máxima. Cada
+        servidor é calculado uma única vez por deslocamento, na primeira vez em
+        que for pedido."""
+        num_meses, num_servidores = self._codigos.shape
+        if deslocamento not in self._valores:
+            self._valores[deslocamento] = (
+                np.zeros((num_meses, num_servidores, len(COLUNAS_TOTAIS))),
+                np.zeros(num_servidores, dtype=bool),
+            )
+        valores, calculados = self._valores[deslocamento]
+
+        faltantes = colunas[~calculados[colunas]]
+        if len(faltantes):
+            codigos = self._codigos[:, faltantes]
+            if deslocamento:
+                limites = np.array([self._reenquadramento[j].limite for j in faltantes])
+                meses = self.mes_inicio + np.arange(num_meses)
+                # (números do nível × servidores)
+                da_carreira = np.stack(
+                    [self._reenquadramento[j].letras for j in faltantes], axis=1
+                )
+                letra_maxima = np.array(
+                    [self._reenquadramento[j].letra_maxima for j in faltantes]
+                )
+                numeros, letras = np.divmod(codigos, len(LETRAS))
+                numeros = np.maximum(numeros, 0)
+                completas = letras >= np.minimum(
+                    np.take_along_axis(da_carreira, numeros, axis=0), letra_maxima
+                )
+                numeros = np.clip(numeros + deslocamento, 1, limites)
+                maximas = np.take_along_axis(da_carreira, numeros, axis=0)
+                letras = np.where(
+                    completas,
+                    np.maximum(letras, np.minimum(maximas, letra_maxima)),
+                    letras,
+                )
+                letras = np.minimum(letras, maximas)
+                desloca = (codigos != SEM_NIVEL) & (
+                    meses >= _mes(self.data_migracao)
+                )[:, None]
+                codigos = np.where(desloca, numeros * len(LETRAS) + letras, codigos)
+
+            lote = self.calcula_folha.calcula_lote(
+                [
+                    _FuncionarioCompilado(
+                        self.funcionarios[j].cm,
+                        self.funcionarios[j].dados_folha,
+                        codigos[:, k],
+                    )
+                    for k, j in enumerate(faltantes)
+                ],
+                self.calendario.datas,
+            )
+            valores[:, faltantes] = np.stack(
+                [getattr(lote, campo) for campo in COLUNAS_TOTAIS], axis=-1
+            )
+            calculados[faltantes] = True
+        return valores[:, colunas]
+
+    def gastos(
+        self, parametros: ParametrosMonteCarlo | None = None, semente: int | None = 0
+    ) -> np.ndarray:
+        """Gasto de cada replicação, em (replicações × competências × campos de
+        GastoMensalEfetivos)."""
+        parametros = parametros or ParametrosMonteCarlo()
+        gerador = np.random.default_rng(semente)
+        num_replicacoes = parametros.replicacoes
+        num_meses, num_servidores = self._codigos.shape
+
+        if parametros.atraso_medio_meses > 0:
+            atrasos = (
+                gerador.geometric(
+                    1 / (1 + parametros.atraso_medio_meses),
+                    size=(num_replicacoes, num_servidores),
+                )
+                - 1
+            )
+        else:
+            atrasos = np.zeros((num_replicacoes, num_servidores), dtype=int)
+        # Último mês ativo, em posição no calendário
+        ultimos = np.maximum(self._mes_condicao, self.mes_inicio) + atrasos
+        ultimos = np.minimum(ultimos, self._mes_compulsoria) - self.mes_inicio
+        deslocamentos = self._sorteia_deslocamentos(num_replicacoes, gerador)
+
+        gastos = np.zeros((num_replicacoes, num_meses, len(COLUNAS_TOTAIS)))
+        posicoes = np.arange(num_meses)
+        bloco = max(_ELEMENTOS_POR_BLOCO // max(num_meses * num_servidores, 1), 1)
+        for inicio in range(0, num_replicacoes, bloco):
+            fatia = slice(inicio, inicio + bloco)
+            sorteados = deslocamentos[fatia]
+            # (competências × replicações × servidores)
+            ativo = posicoes[:, None, None] <= ultimos[None, fatia, :]
+            for deslocamento in np.unique(sorteados):
+                # Só os servidores com esse deslocamento em alguma replicação
+                colunas = np.flatnonzero((sorteados == deslocamento).any(axis=0))
+                pesos = ativo[:, :, colunas] & (sorteados[:, colunas] == deslocamento)
+                valores = self._valores_com_deslocamento(int(deslocamento), colunas)
+                gastos[fatia] += np.matmul(pesos.astype(float), valores).transpose(
+                    1, 0, 2
+                )
+        return gastos
+
+    def simula(
+        self, parametros: ParametrosMonteCarlo | None = None, semente: int | None = 0
+    ) -> dict[str, pd.DataFrame]:
+        """Faixas de percentis do gasto mensal, uma tabela por campo de
+        GastoMensalEfetivos, com as competências nas linhas e uma coluna por
+        percentil (P5, P50, P95 por padrão)."""
+        parametros = parametros or ParametrosMonteCarlo()
+        gastos = self.gastos(parametros, semente)
+        faixas = np.percentile(gastos, parametros.percentis, axis=0)
+        colunas = [f"P{percentil:g}" for percentil in parametros.percentis]
+        campos = [campo.name for campo in dataclasses.fields(GastoMensalEfetivos)]
+        return {
+            campo: pd.DataFrame(
+                faixas[:, :, k].T,
+                index=pd.Index(self.calendario.rotulos, name="competencia"),
+                columns=colunas,
+            )
+            for k, campo in enumerate(campos)
+        }
@@ -1,16 +1,65 @@
+from functools import lru_cache
+
 LETRAS = ["0", "A", "B", "C", "D", "E"]
 
+_INDICE_LETRA = {letra: indice for indice, letra in enumerate(LETRAS)}
+
+# Maior número de nível entre as carreiras
+NUMERO_MAXIMO = 48
+
+# Código de "sem nível" (servidor inativo) em `codifica_nivel`
+SEM_NIVEL = -1
+
 
 class Nivel:
-    def __init__(self, numero: int, letra: str) -> None:
+    """Nível da carreira (número e letra).
+
+    Níveis são imutáveis e internados: `Nivel(numero, letra)` devolve sempre a
+    mesma instância para o mesmo par, de modo que comparações, hash e caches
+    indexados por nível são baratos. Todos os níveis até NUMERO_MAXIMO são
+    criados na importação do módulo."""
+
+    __slots__ = ("numero", "letra", "numero_progressoes_horizontais", "_codigo")
+
+    _internados: dict = {}  # {(numero, letra): Nivel}
+    _por_texto: dict = {}  # {texto: Nivel}, preenchido por `from_string`
+
+    def __new__(cls, numero: int, letra: str) -> "Nivel":
         """Espera receber o número e a letra do nível, separadamente."""
+        try:
+            return cls._internados[numero, letra]
+        except (KeyError, TypeError):
+            pass
 
-        self.numero = numero
-        self.letra = letra
+        if numero <= 0:
+            raise ValueError("O número do nível deve ser maior que zero")
+        if letra not in _INDICE_LETRA:
+            raise ValueError(
+                f"Letra: {letra} não reconhecido. As letras devem ser : "
+                + ", ".join(LETRAS)
+            )
+
+        nivel = super().__new__(cls)
+        numero_progressoes_horizontais = _INDICE_LETRA[letra]
+        object.__setattr__(nivel, "numero", numero)
+        object.__setattr__(nivel, "letra", letra)
+        object.__setattr__(
+            nivel, "numero_progressoes_horizontais", numero_progressoes_horizontais
+        )
+        object.__setattr__(
+            nivel, "_codigo", numero * len(LETRAS) + numero_progressoes_horizontais
+        )
+        if numero <= NUMERO_MAXIMO:
+            cls._internados[numero, letra] = nivel
+        return nivel
 
     @classmethod
-    def from_string(cls, nivel: str) -> None:
+    def from_string(cls, nivel: str) -> "Nivel":
         """Espera receber o nível no formato 5.A, por exemplo."""
+        try:
+            return cls._por_texto[nivel]
+        except KeyError:
+            pass
 
         nivel_separado = nivel.strip().split(".")
 
@@ -20,35 +69,16 @@ class Nivel:
                 + "Deve ser 8.B, por exemplo."
             )
 
-        return cls(int(nivel_separado[0]), nivel_separado[1])
+        resultado = cls(int(nivel_separado[0]), nivel_separado[1])
+        cls._por_texto[nivel] = resultado
+        return resultado
 
-    @property
-    def numero(self) -> int:
-        return self._numero
+    def __setattr__(self, nome, valor):
+        raise AttributeError("Nivel é imutável")
 
-    @numero.setter
-    def numero(self, value: int) -> None:
-        if value <= 0:
-            raise ValueError("O número do nível deve ser maior que zero")
-        self._numero = value
-
-    @property
-    def letra(self) -> str:
-        return self._letra
-
-    @letra.setter
-    def letra(self, value: int) -> None:
-        if value not in LETRAS:
-            raise ValueError(
-                f"Letra: {value} não reconhecido. As letras devem ser : "
-                + ", ".join(LETRAS)
-            )
-        self._letra = value
-
-    @property
-    def numero_progressoes_horizontais(self) -> int:
-        """Retorna o número de progressões horizontais que aquela letra representa."""
-        return LETRAS.index(self.letra)
+    def __reduce__(self):
+        # Recria pelo construtor, preservando o internamento ao desserializar
+        return (Nivel, (self.numero, self.letra))
 
     def anterior(self, passos_verticais: int, passos_horizontais: int):
         prox_numero = self.numero - passos_verticais
@@ -63,11 +93,19 @@ class Nivel:
     def __str__(self) -> str:
         return str(self.numero) + "." + self.letra
 
+    def __repr__(self) -> str:
+        return f"Nivel({self.numero}, {self.letra!r})"
+
     def __eq__(self, other):
-        return self.numero == other.numero and self.letra == other.letra
+        if self is other:
+            return True
+        if not isinstance(other, Nivel):
+            return NotImplemented
+        return self._codigo == other._codigo
 
     def __hash__(self) -> int:
-        return self.numero * (self.numero_progressoes_horizontais + 1000)
+        # Código único por (número, letra): não há colisões entre níveis
+        return self._codigo
 
     @staticmethod
     def nivel_horizontal_para_numero(letra: str) -> int:
@@ -79,3 +117,26 @@ class Nivel:
         if letra == LETRAS[-1]:
             return letra  # Já é a última letra
         return LETRAS[LETRAS.index(letra) + 1]
+
+
+for _numero in range(1, NUMERO_MAXIMO + 1):
+    for _letra in LETRAS:
+        Nivel(_numero, _letra)
+del _numero, _letra
+
+
+def codifica_nivel(nivel: Nivel | None) -> int:
+    """Codifica um nível como inteiro (número × quantidade de letras + índice da
+    letra). Ausência de nível é codificada como SEM_NIVEL."""
+    if nivel is None:
+        return SEM_NIVEL
+    return nivel._codigo
+
+
+@lru_cache(maxsize=None)
+def decodifica_nivel(codigo: int) -> Nivel | None:
+    """Inverso de `codifica_nivel`."""
+    if codigo == SEM_NIVEL:
+        return None
+    numero, idx_letra = divmod(codigo, len(LETRAS))
+    return Nivel(numero, LETRAS[idx_letra])
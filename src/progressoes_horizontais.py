@@ -7,30 +7,82 @@ from src.nivel import Nivel
 
 
 class ProgressoesHorizontais:
-    def __init__(self, banco_de_dados: BancoDeDados = BancoDeDados) -> None:
+    """Letras adquiridas e nível atual de cada servidor, usados para limitar a
+    concessão de novas letras.
+
+    Os dados são carregados do Aeros somente quando usados pela primeira vez, a
+    não ser que tenham sido informados antes por `carrega` (ou por `dados`)."""
+
+    def __init__(
+        self,
+        banco_de_dados: BancoDeDados = BancoDeDados,
+        dados: pd.DataFrame | str | None = None,
+    ) -> None:
         self.banco_de_dados = banco_de_dados
-        self.letras_adquiridas = {}  # type: dict[int, str]
-        self.nivel_atual = {}  # type: dict[int, int]
-        self._extrai_do_aeros_letra_maxima()
+        self._letras_adquiridas = None  # type: dict[int, str] | None
+        self._nivel_atual = None  # type: dict[int, int] | None
+        if dados is not None:
+            self.carrega(dados)
 
-    def _extrai_do_aeros_letra_maxima(self) -> None:
-        df_dados_faltantes = self.banco_de_dados().realiza_consulta_arquivo(
-            "progressoes.sql"
-        )
+    @property
+    def letras_adquiridas(self) -> dict[int, str]:
+        self._carrega_se_necessario()
+        return self._letras_adquiridas
+
+    @letras_adquiridas.setter
+    def letras_adquiridas(self, letras_adquiridas: dict[int, str]) -> None:
+        self._carrega_se_necessario(consulta_aeros=False)
+        self._letras_adquiridas = letras_adquiridas
+
+    @property
+    def nivel_atual(self) -> dict[int, int]:
+        self._carrega_se_necessario()
+        return self._nivel_atual
+
+    @nivel_atual.setter
+    def nivel_atual(self, nivel_atual: dict[int, int]) -> None:
+        self._carrega_se_necessario(consulta_aeros=False)
+        self._nivel_atual = nivel_atual
 
-        for _, row in df_dados_faltantes.iterrows():
+    def carrega(self, dados: pd.DataFrame | str) -> None:
+        """Carrega os dados de um DataFrame ou de um arquivo CSV ou Excel, com as
+        colunas da consulta `progressoes.sql` (cm, nivel_atual, letras_adquiridas)."""
+        if isinstance(dados, str):
+            tipos = {"nivel_atual": str, "letras_adquiridas": str}
+            if dados.endswith((".xlsx", ".xls")):
+                dados = pd.read_excel(dados, dtype=tipos)
+            else:
+                dados = pd.read_csv(dados, dtype=tipos)
+
+        self._letras_adquiridas = {}
+        self._nivel_atual = {}
+        for _, row in dados.iterrows():
             cm: int = int(row["cm"])
             letras_adquiridas: str = row["letras_adquiridas"]
             if letras_adquiridas == "BASE" or pd.isna(letras_adquiridas):
                 letras_adquiridas = "0"
-            self.letras_adquiridas[cm] = letras_adquiridas
+            self._letras_adquiridas[cm] = letras_adquiridas
 
             nivel_atual_str: str = row["nivel_atual"]
             if pd.isna(nivel_atual_str):
                 nivel_atual = 1
             else:
                 nivel_atual = int(nivel_atual_str)
-            self.nivel_atual[cm] = nivel_atual
+            self._nivel_atual[cm] = nivel_atual
+
+    def _carrega_se_necessario(self, consulta_aeros: bool = True) -> None:
+        if self._letras_adquiridas is not None:
+            return
+        if consulta_aeros:
+            self._extrai_do_aeros_letra_maxima()
+        else:
+            self._letras_adquiridas = {}
+            self._nivel_atual = {}
+
+    def _extrai_do_aeros_letra_maxima(self) -> None:
+        self.carrega(
+            self.banco_de_dados().realiza_consulta_arquivo("progressoes.sql")
+        )
 
     def obtem_letra_maxima(self, cm: int) -> str | None:
         """Respeita a configuração geral de concessão de letras.
@@ -71,4 +123,5 @@ class ProgressoesHorizontais:
         return False
 
 
+# Instância compartilhada; carregada do Aeros somente no primeiro uso
 progressoes_horizontais = ProgressoesHorizontais()
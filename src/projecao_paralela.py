@@ -0,0 +1,153 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from itertools import repeat
+
+import numpy as np
+
+import config
+from src.armazenamento_folhas import codifica_niveis, decodifica_niveis
+from src.carreira import Progressao
+from src.folha import CAMPOS_VALORES, CalculaFolha, LoteFolhas
+from src.funcionario import Funcionario
+from src.pia import CalculaPIA
+from src.progressoes_horizontais import progressoes_horizontais
+from src.tabela_salario import Tabela
+
+
+@dataclass(frozen=True)
+class TarefaProjecao:
+    """O que cada processo deve calcular para a sua fatia de funcionários."""
+
+    competencias: tuple[date, ...]
+    tabela: Tabela = field(default_factory=Tabela)
+    calcula_folha: CalculaFolha = CalculaFolha
+    tabela_pia: Tabela = field(default_factory=Tabela)
+    calcula_pia: CalculaPIA = CalculaPIA
+
+
+@dataclass
+class ResultadoFatia:
+    """Resultado de uma fatia de funcionários, devolvido ao processo principal.
+
+    As folhas vêm como matrizes (competências × servidores), com os níveis
+    codificados, para que a transferência entre processos seja compacta."""
+
+    cms: list[int]
+    ativo: np.ndarray
+    codigos_niveis: np.ndarray
+    valores: dict[str, np.ndarray]
+    pias: list[float | None]
+    progressoes: list[list[Progressao]]
+
+    def lote(self, competencias: tuple[date, ...]) -> LoteFolhas:
+        return LoteFolhas(
+            competencias=list(competencias),
+            cms=self.cms,
+            ativo=self.ativo,
+            niveis=decodifica_niveis(self.codigos_niveis, self.ativo),
+            **self.valores,
+        )
+
+
+def _inicializa_processo(
+    param: config.Parametros,
+    letras_adquiridas: dict[int, str],
+    nivel_atual: dict[int, int],
+) -> None:
+    """Reproduz no processo filho o estado global usado no cálculo."""
+    config.param = param
+    progressoes_horizontais.letras_adquiridas = letras_adquiridas
+    progressoes_horizontais.nivel_atual = nivel_atual
+
+
+def _calcula_fatia(
+    tarefa: TarefaProjecao, funcionarios: list[Funcionario]
+) -> ResultadoFatia:
+    """Calcula as folhas e os PIAs de uma fatia, na mesma ordem do cálculo serial."""
+    lote = tarefa.calcula_folha(tarefa.tabela).calcula_lote(
+        funcionarios, tarefa.competencias
+    )
+    pias = [
+        tarefa.calcula_pia(funcionario, tarefa.tabela_pia).calcula()
+        for funcionario in funcionarios
+    ]
+    return ResultadoFatia(
+        cms=lote.cms,
+        ativo=lote.ativo,
+        codigos_niveis=codifica_niveis(lote.niveis, lote.ativo),
+        valores={campo: getattr(lote, campo) for campo in CAMPOS_VALORES},
+        pias=pias,
+        progressoes=[funcionario.progressoes for funcionario in funcionarios],
+    )
+
+
+class ProjecaoParalela:
+    """Calcula as folhas e os PIAs dos funcionários dividindo-os entre processos.
+
+    Os funcionários são divididos em fatias contíguas, na ordem recebida, e cada
+    processo calcula as suas folhas em lote. Os resultados são juntados na ordem
+    das fatias, produzindo exatamente as mesmas folhas, PIAs e progressões do
+    cálculo serial. `config.param` e as letras de `progressoes_horizontais` são
+    enviados a cada processo na sua inicialização."""
+
+    def __init__(self, processos: int | None = None, fatias_por_processo: int = 4):
+        """`processos` None usa todos os processadores disponíveis."""
+        self.processos = processos or os.cpu_count() or 1
+        self.fatias_por_processo = fatias_por_processo
+
+    def divide(self, funcionarios: list[Funcionario]) -> list[list[Funcionario]]:
+        """Divide os funcionários em fatias contíguas de tamanhos parecidos."""
+        num_fatias = min(len(funcionarios), self.processos * self.fatias_por_processo)
+        if num_fatias == 0:
+            return []
+        limites = np.linspace(0, len(funcionarios), num_fatias + 1).astype(int)
+        return [
+            funcionarios[inicio:fim] for inicio, fim in zip(limites[:-1], limites[1:])
+        ]
+
+    def calcula(
+        self,
+        funcionarios: list[Funcionario],
+        folhas_efetivos,
+        folhas_pia,
+        inicio: date,
+        fim: date,
+    ) -> None:
+        """Calcula e adiciona as folhas e PIAs em `folhas_efetivos` e `folhas_pia`.
+
+        As progressões calculadas nos processos são copiadas para os funcionários
+        originais, como aconteceria no cálculo serial."""
+        tarefa = TarefaProjecao(
+            competencias=folhas_efetivos.calendario(inicio, fim).datas,
+            tabela=folhas_efetivos.tabela,
+            calcula_folha=folhas_efetivos.calcula_folha,
+            tabela_pia=folhas_pia.tabela,
+            calcula_pia=folhas_pia.calcula_pia,
+        )
+        fatias = self.divide(funcionarios)
+        if not fatias:
+            return
+
+        with ProcessPoolExecutor(
+            max_workers=min(self.processos, len(fatias)),
+            initializer=_inicializa_processo,
+            initargs=(
+                config.param,
+                progressoes_horizontais.letras_adquiridas,
+                progressoes_horizontais.nivel_atual,
+            ),
+        ) as executor:
+            resultados = executor.map(_calcula_fatia, repeat(tarefa), fatias)
+            for fatia, resultado in zip(fatias, resultados):
+                folhas_efetivos.adiciona_lote(resultado.lote(tarefa.competencias))
+                for funcionario, pia, progressoes in zip(
+                    fatia, resultado.pias, resultado.progressoes
+                ):
+                    funcionario.progressoes = progressoes
+                    folhas_pia.adiciona_pia(
+                        funcionario.aposentadoria.data_aposentadoria,
+                        funcionario.cm,
+                        pia,
+                    )
@@ -0,0 +1,178 @@
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+
+from src.carreira import Carreira
+from src.nivel import NUMERO_MAXIMO, Nivel
+
+# Regras do reenquadramento
+NOTA_PADRAO = 70  # Nota de interstícios sem avaliação
+NOTA_MINIMA_PROGRESSAO = 60
+NOTA_MINIMA_DUAS_PROGRESSOES = 70
+DATA_CORTE_AVALIACOES = date(2004, 4, 2)
+
+# Menor tempo de uma progressão vertical (2 interstícios de 9 meses)
+MENOR_TEMPO_PROGRESSAO = 18
+
+
+def _mes(data: date) -> int:
+    return data.year * 12 + data.month - 1
+
+
+def _dias_no_mes(meses: np.ndarray) -> np.ndarray:
+    inicio = (np.asarray(meses) - 1970 * 12).astype("datetime64[M]")
+    return (
+        (inicio + 1).astype("datetime64[D]") - inicio.astype("datetime64[D]")
+    ).astype(int)
+
+
+def _antes(meses, dias, meses_ref, dias_ref) -> np.ndarray:
+    """Se as datas (mês sequencial e dia) são anteriores às de referência."""
+    return (meses < meses_ref) | ((meses == meses_ref) & (dias < dias_ref))
+
+
+_tempos_por_carreira: dict[tuple[type, int], np.ndarray] = {}
+
+
+def tempos_da_carreira(carreira: Carreira) -> np.ndarray:
+    """Meses de uma progressão vertical (2 interstícios) a partir de cada número
+    de nível, até o limite da carreira; posições sem progressão valem 0."""
+    chave = (type(carreira), carreira._limite())
+    if chave not in _tempos_por_carreira:
+        tempos = np.zeros(NUMERO_MAXIMO + 1, dtype=int)
+        for numero in range(1, chave[1] + 1):
+            tempos[numero] = carreira.intersticio.tempo_para_progredir(
+                Nivel(numero, "0"), 2
+            )
+        tempos.flags.writeable = False
+        _tempos_por_carreira[chave] = tempos
+    return _tempos_por_carreira[chave]
+
+
+@dataclass
+class PassosReenquadramento:
+    """Passos do reenquadramento de várias linhas, em matrizes (passos × linhas).
+
+    Cada passo é uma progressão anterior à migração, com a data e o número do
+    nível em que o servidor estava, a nota avaliada e, nos passos ímpares, a média
+    da progressão especial (NaN nos pares)."""
+
+    ativo: np.ndarray
+    meses: np.ndarray
+    dias: np.ndarray
+    numeros: np.ndarray
+    notas: np.ndarray
+    medias: np.ndarray
+    especiais: np.ndarray
+
+    @property
+    def final(self) -> np.ndarray:
+        """Número do nível na migração: o do último passo ativo de cada linha, ou
+        o de partida se não houver nenhum."""
+        ultimo = len(self.ativo) - 1 - self.ativo[::-1].argmax(axis=0)
+        ultimo = np.where(self.ativo.any(axis=0), ultimo, 0)
+        return self.numeros[ultimo, np.arange(self.ativo.shape[1])]
+
+
+def simula_passos(
+    numeros: np.ndarray,
+    meses: np.ndarray,
+    dias: np.ndarray,
+    limites: np.ndarray,
+    tempos: np.ndarray,
+    notas: np.ndarray,
+    meses_migracao: np.ndarray,
+    dias_migracao: np.ndarray,
+) -> PassosReenquadramento:
+    """Aplica as regras de CalculaReenquadramento a várias linhas de uma vez.
+
+    Cada linha parte da última progressão (número do nível, mês sequencial e dia),
+    com o limite e os tempos (`tempos_da_carreira`) da sua carreira, e segue até a
+    sua data de migração. `notas` (linhas × avaliações) traz as notas na ordem em
+    que são consumidas; avaliações além das colunas valem NOTA_PADRAO.
+
+    Linhas que não progridem até a migração têm o primeiro passo inativo; o
+    número do nível de partida fica em `numeros[0]`."""
+    num_linhas = len(numeros)
+    ativo = _antes(meses, dias, meses_migracao, dias_migracao)
+    inicio = meses[ativo].min() if ativo.any() else 0
+    meses_ate_migracao = int(np.max(meses_migracao, initial=0) - inicio)
+    num_passos = max(meses_ate_migracao // MENOR_TEMPO_PROGRESSAO + 2, 1)
+    completas = np.full((num_linhas, num_passos + 1), float(NOTA_PADRAO))
+    colunas = min(notas.shape[1], num_passos + 1)
+    completas[:, :colunas] = notas[:, :colunas]
+    linhas = np.arange(num_linhas)
+
+    numero = np.asarray(numeros, dtype=int).copy()
+    meses = np.asarray(meses, dtype=int).copy()
+    dias = np.asarray(dias, dtype=int).copy()
+    consumidas = np.zeros(num_linhas, dtype=int)
+    historico = {
+        nome: np.zeros((num_passos, num_linhas), dtype=tipo)
+        for nome, tipo in [
+            ("ativo", bool),
+            ("meses", int),
+            ("dias", int),
+            ("numeros", int),
+            ("notas", float),
+            ("medias", float),
+            ("especiais", bool),
+        ]
+    }
+    historico["numeros"][0] = numero
+    for passo in range(num_passos):
+        if not ativo.any():
+            num_passos = max(passo, 1)
+            break
+        tem_proxima = numero < limites
+        meses_proxima = meses + tempos[linhas, np.minimum(numero, limites)]
+        dias_proxima = np.minimum(dias, _dias_no_mes(meses_proxima))
+        consome = (
+            ativo
+            & tem_proxima
+            & ~_antes(
+                meses_proxima,
+                dias_proxima,
+                _mes(DATA_CORTE_AVALIACOES),
+                DATA_CORTE_AVALIACOES.day,
+            )
+        )
+        nota = np.where(consome, completas[linhas, consumidas], NOTA_PADRAO)
+        consumidas += consome
+        qtde = np.where(
+            nota < NOTA_MINIMA_PROGRESSAO,
+            0,
+            np.where(nota < NOTA_MINIMA_DUAS_PROGRESSOES, 1, 2),
+        )
+        media = np.full(num_linhas, np.nan)
+        especial = np.zeros(num_linhas, dtype=bool)
+        if passo % 2 == 1:  # Progressão que pode ser especial
+            anterior = np.where(
+                consumidas <= 1,
+                NOTA_PADRAO,
+                completas[linhas, np.maximum(consumidas - 2, 0)],
+            )
+            media = (nota + anterior) / 2
+            especial = media >= NOTA_MINIMA_DUAS_PROGRESSOES
+            qtde += especial
+
+        for nome, valores in [
+            ("ativo", ativo),
+            ("meses", meses),
+            ("dias", dias),
+            ("numeros", numero),
+            ("notas", nota),
+            ("medias", media),
+            ("especiais", especial),
+        ]:
+            historico[nome][passo] = valores
+
+        avanca = ativo & tem_proxima
+        numero = np.where(avanca, numero + np.minimum(qtde, limites - numero), numero)
+        meses = np.where(avanca, meses_proxima, meses)
+        dias = np.where(avanca, dias_proxima, dias)
+        ativo = avanca & _antes(meses, dias, meses_migracao, dias_migracao)
+    return PassosReenquadramento(
+        **{nome: valores[:num_passos] for nome, valores in historico.items()}
+    )
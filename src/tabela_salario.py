@@ -1,61 +1,223 @@
+from dataclasses import dataclass
 from datetime import date
-from functools import lru_cache
 
-from dateutil.relativedelta import relativedelta
+import numpy as np
 
 import config
 from src.classe import Classe
-from src.nivel import Nivel
+from src.nivel import (
+    LETRAS,
+    NUMERO_MAXIMO,
+    SEM_NIVEL,
+    Nivel,
+    codifica_nivel,
+    decodifica_nivel,
+)
+
+
+@dataclass(frozen=True)
+class _Grade:
+    """Valores da tabela para um conjunto de parâmetros.
+
+    `valores[classe, codigo, regime]` é o valor do nível de código `codigo`
+    (`codifica_nivel`) para a classe (0: E1 e E2, 1: E3), sem reajuste (regime 0)
+    ou com reajuste (regime 1). Códigos que não são níveis (número 0) valem NaN,
+    assim como todos os níveis de uma classe sem valor base nos parâmetros."""
+
+    valores: np.ndarray
+    # Primeiro mês (número sequencial) em que o reajuste é aplicado
+    mes_reajuste: int
+    # Índices das classes sem valor base: consultá-las é um erro
+    sem_valor_base: frozenset[int] = frozenset()
+
+
+def _mes(data: date) -> int:
+    return data.year * 12 + data.month - 1
+
+
+def _indice_classe(classe: Classe) -> int:
+    return 0 if classe == Classe.E1 or classe == Classe.E2 else 1
+
+
+def _erro_valor_base(classe: Classe) -> ValueError:
+    return ValueError(
+        f"Valor base da classe {classe.value} não definido nos parâmetros."
+    )
 
 
 class Tabela:
-    @lru_cache(maxsize=None)
+    """Tabela de salários das carreiras para um conjunto de parâmetros.
+
+    Os valores de todos os níveis até NUMERO_MAXIMO, por classe e com ou sem
+    reajuste, são calculados de uma vez em uma grade e as consultas passam a
+    ser indexação. Sem `param`, a tabela segue `config.param`: a grade é refeita
+    sempre que `config.param` for substituído por outro objeto.
+
+    Uma classe sem valor base nos parâmetros só gera erro (ValueError) quando
+    algum nível dela é consultado; as demais classes continuam disponíveis."""
+
+    def __init__(
+        self, param: config.Parametros | None = None, data_calculo: date | None = None
+    ) -> None:
+        self.param = param
+        self.data_calculo = data_calculo or date.today()
+        self._grade = None
+        self._param_grade = None
+
+    def __getstate__(self) -> dict:
+        # A grade é refeita sob demanda ao desserializar
+        return {**self.__dict__, "_grade": None, "_param_grade": None}
+
+    @property
+    def parametros(self) -> config.Parametros:
+        return self.param if self.param is not None else config.param
+
     @staticmethod
-    def valor_do(nivel: Nivel, valor_inicial: float) -> float:
+    def valor_do(
+        nivel: Nivel, valor_inicial: float, param: config.Parametros | None = None
+    ) -> float:
         """Calcula o valor do nível informado."""
+        param = param or config.param
 
-        progressao_vertical_total = (1 + config.param.INDICE_PROGRESSAO_VERTICAL) ** (
+        progressao_vertical_total = (1 + param.INDICE_PROGRESSAO_VERTICAL) ** (
             nivel.numero - 1
         )
 
-        progressao_horizontal_total = (
-            1 + config.param.INDICE_PROGRESSAO_HORIZONTAL
-        ) ** (nivel.numero_progressoes_horizontais)
+        progressao_horizontal_total = (1 + param.INDICE_PROGRESSAO_HORIZONTAL) ** (
+            nivel.numero_progressoes_horizontais
+        )
 
         valor = valor_inicial * progressao_vertical_total * progressao_horizontal_total
         return round(valor, 2)
 
     @staticmethod
+    def valor_inicial_da_classe(
+        classe: Classe, param: config.Parametros | None = None
+    ) -> float:
+        param = param or config.param
+        if classe == Classe.E1 or classe == Classe.E2:  # Classes E1 e E2
+            return param.VALOR_BASE_E2
+        return param.VALOR_BASE_E3  # Classe E3
+
+    def invalida(self) -> None:
+        """Descarta a grade calculada. Necessário quando os campos dos parâmetros
+        são alterados no próprio objeto, o que a tabela não percebe sozinha."""
+        self._grade = None
+        self._param_grade = None
+
+    def _grade_atual(self) -> _Grade:
+        param = self.parametros
+        if self._grade is None or self._param_grade is not param:
+            self._grade = self._monta_grade(param)
+            self._param_grade = param
+        return self._grade
+
+    def _monta_grade(self, param: config.Parametros) -> _Grade:
+        indices = (1.0, 1 + param.REAJUSTE_ANUAL)
+        valores = np.full((2, (NUMERO_MAXIMO + 1) * len(LETRAS), 2), np.nan)
+        sem_valor_base = set()
+        for idx_classe, classe in enumerate((Classe.E2, Classe.E3)):
+            valor_inicial = self.valor_inicial_da_classe(classe, param)
+            if valor_inicial is None:
+                sem_valor_base.add(idx_classe)
+                continue
+            for numero in range(1, NUMERO_MAXIMO + 1):
+                for letra in LETRAS:
+                    nivel = Nivel(numero, letra)
+                    valor = self.valor_do(nivel, valor_inicial, param)
+                    for regime, indice in enumerate(indices):
+                        valores[idx_classe, codifica_nivel(nivel), regime] = (
+                            valor * indice
+                        )
+        data_reajuste = self.primeira_data_base(self.data_calculo, param)
+        return _Grade(
+            valores=valores,
+            mes_reajuste=_mes(data_reajuste),
+            sem_valor_base=frozenset(sem_valor_base),
+        )
+
     def valor_do_nivel_para_classe(
-        nivel: Nivel, classe: Classe, competencia: date
+        self, nivel: Nivel, classe: Classe, competencia: date
     ) -> float:
         """Calcula o valor do nível informado para uma classe específica."""
-        if classe == Classe.E1 or classe == Classe.E2:  # Classes E1 e E2
-            valor_base = Tabela.valor_do(nivel, config.param.VALOR_BASE_E2)
-        else:  # Classe E3
-            valor_base = Tabela.valor_do(nivel, config.param.VALOR_BASE_E3)
+        if nivel.numero > NUMERO_MAXIMO:  # Fora da grade
+            param = self.parametros
+            valor_inicial = self.valor_inicial_da_classe(classe, param)
+            if valor_inicial is None:
+                raise _erro_valor_base(classe)
+            valor_base = self.valor_do(nivel, valor_inicial, param)
+            return valor_base * self.calcula_indice_reajuste(
+                competencia, self.data_calculo, param
+            )
+
+        grade = self._grade_atual()
+        if _indice_classe(classe) in grade.sem_valor_base:
+            raise _erro_valor_base(classe)
+        regime = 1 if _mes(competencia) >= grade.mes_reajuste else 0
+        return float(
+            grade.valores[_indice_classe(classe), codifica_nivel(nivel), regime]
+        )
+
+    def valores_do_nivel_para_classe(
+        self, niveis: list[Nivel | None], classe: Classe, competencias: list[date]
+    ) -> np.ndarray:
+        """Versão vetorizada de `valor_do_nivel_para_classe`: calcula o valor de cada
+        nível na competência correspondente. Níveis None resultam em 0."""
+        codigos = np.array([codifica_nivel(nivel) for nivel in niveis], dtype=int)
+        return self.valores_dos_codigos_para_classe(codigos, classe, competencias)
+
+    def valores_dos_codigos_para_classe(
+        self, codigos: np.ndarray, classe: Classe, competencias: list[date]
+    ) -> np.ndarray:
+        """Como `valores_do_nivel_para_classe`, com os níveis já codificados por
+        `codifica_nivel` (SEM_NIVEL resulta em 0)."""
+        grade = self._grade_atual()
+        codigos = np.asarray(codigos, dtype=int)
+        meses = np.array([_mes(competencia) for competencia in competencias])
+        regimes = (meses >= grade.mes_reajuste).astype(int)
 
-        return valor_base * Tabela.calcula_indice_reajuste(competencia)
+        if _indice_classe(classe) in grade.sem_valor_base and np.any(
+            codigos != SEM_NIVEL
+        ):
+            raise _erro_valor_base(classe)
+
+        na_grade = (codigos != SEM_NIVEL) & (codigos < grade.valores.shape[1])
+        valores = np.zeros(len(codigos))
+        valores[na_grade] = grade.valores[
+            _indice_classe(classe), codigos[na_grade], regimes[na_grade]
+        ]
+        # Níveis acima de NUMERO_MAXIMO são raros: calcula um a um
+        for i in np.flatnonzero((codigos != SEM_NIVEL) & ~na_grade):
+            valores[i] = self.valor_do_nivel_para_classe(
+                decodifica_nivel(int(codigos[i])), classe, competencias[i]
+            )
+        return valores
+
+    @staticmethod
+    def primeira_data_base(
+        data_calculo: date, param: config.Parametros | None = None
+    ) -> date:
+        """Primeira data base de reajuste depois da data do cálculo.
+
+        Se a projeção for executada no mês ou após o mês da data base, não conta o
+        ano corrente, e a primeira data base será no ano seguinte."""
+        param = param or config.param
+        if data_calculo.month >= param.DATA_BASE_REAJUSTE:
+            return date(data_calculo.year + 1, param.DATA_BASE_REAJUSTE, 1)
+        return date(data_calculo.year, param.DATA_BASE_REAJUSTE, 1)
 
-    @lru_cache(maxsize=None)
     @staticmethod
     def calcula_indice_reajuste(
-        competencia: date, data_calculo: date = date.today()
+        competencia: date,
+        data_calculo: date | None = None,
+        param: config.Parametros | None = None,
     ) -> float:
         """Calcula o índice de reajuste para a competência informada.
         O índice de reajuste é aplicado somente no primeiro ano."""
-
-        # Se a projeção for executada no mês ou após o mês da data base, não conta o
-        # ano corrente, e a primeira data base será no ano seguinte
-        if data_calculo.month >= config.param.DATA_BASE_REAJUSTE:
-            data_base_inicial = date(
-                data_calculo.year + 1, config.param.DATA_BASE_REAJUSTE, 1
-            )
-        else:
-            data_base_inicial = date(
-                data_calculo.year, config.param.DATA_BASE_REAJUSTE, 1
-            )
-
+        param = param or config.param
+        data_base_inicial = Tabela.primeira_data_base(
+            data_calculo or date.today(), param
+        )
         if competencia < data_base_inicial:
             return 1.0
-        return 1 + config.param.REAJUSTE_ANUAL
+        return 1 + param.REAJUSTE_ANUAL
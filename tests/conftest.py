@@ -0,0 +1,12 @@
+import pandas as pd
+import pytest
+
+from src.progressoes_horizontais import progressoes_horizontais
+
+
+@pytest.fixture(autouse=True, scope="session")
+def progressoes_horizontais_sem_aeros():
+    """Evita que a instância compartilhada consulte o Aeros durante os testes."""
+    progressoes_horizontais.carrega(
+        pd.DataFrame(columns=["cm", "nivel_atual", "letras_adquiridas"])
+    )
@@ -22,3 +22,21 @@ class TestAnuenio:
         assert (
             Anuenio(data_inicio_anuenio).obtem_numero_anuenios_para(data) == num_anuenio
         )
+
+    def test_numeros_anuenios_igual_ao_calculo_individual(self):
+        datas_inicio = [date(2018, 7, 13), date(1996, 9, 6), date(2000, 1, 31), None]
+        competencias = [
+            date(2019, 6, 1),
+            date(2019, 7, 13),
+            date(2020, 2, 29),
+            date(2022, 12, 1),
+            date(1990, 5, 20),
+        ]
+
+        anuenios = Anuenio.numeros_anuenios_para(datas_inicio, competencias)
+
+        for j, data_inicio in enumerate(datas_inicio):
+            for i, competencia in enumerate(competencias):
+                assert anuenios[i, j] == Anuenio(
+                    data_inicio
+                ).obtem_numero_anuenios_para(competencia)
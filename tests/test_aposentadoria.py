@@ -1,12 +1,14 @@
-from datetime import date
+from datetime import date, timedelta
 
 from src.aposentadoria import (
     AposentadoriaAntes98,
     AposentadoriaAtual,
     AposentadoriaIntegral,
     DadosPrevidenciarios,
+    ParametrosAposentadoria,
     Sexo,
     atribui_aposentadoria,
+    calcula_aposentadorias,
 )
 
 
@@ -260,3 +262,68 @@ class TesytAtribuiAposentadoria:
         )
         cls = atribui_aposentadoria(servidor)
         assert cls is AposentadoriaIntegral
+
+
+def cria_servidores(quantidade: int) -> list[DadosPrevidenciarios]:
+    servidores = []
+    for i in range(quantidade):
+        nascimento = date(1945, 1, 1) + timedelta(days=i * 611)
+        servidores.append(
+            DadosPrevidenciarios(
+                data_nascimento=nascimento,
+                sexo=Sexo.MASCULINO if i % 2 else Sexo.FEMININO,
+                data_admissao=nascimento + timedelta(days=365 * 18 + i * 2311 % 18000),
+                tempo_INSS=(i * 397) % 6000 if i % 3 else 0,
+                tempo_sevico_publico=(i * 251) % 9000 if i % 4 else 0,
+            )
+        )
+    return servidores
+
+
+class TestCalculaAposentadorias:
+    def test_igual_ao_calculo_individual(self):
+        servidores = cria_servidores(60)
+
+        lote = calcula_aposentadorias(servidores)
+
+        regras = {atribui_aposentadoria(servidor) for servidor in servidores}
+        assert len(regras) == 3
+        assert lote.compulsoria.any()
+        for i, servidor in enumerate(servidores):
+            aposentadoria = atribui_aposentadoria(servidor)(servidor)
+            assert lote.data(i) == aposentadoria.data_aposentadoria
+            assert lote.compulsoria[i] == aposentadoria.compulsoria
+
+    def test_regra_e_parametros_variantes(self):
+        servidores = cria_servidores(30)
+        parametros = ParametrosAposentadoria(
+            idade_compulsoria=70, pontos_masculino=100, pontos_feminino=90
+        )
+
+        lote = calcula_aposentadorias(servidores, AposentadoriaAntes98, parametros)
+
+        for i, servidor in enumerate(servidores):
+            aposentadoria = AposentadoriaAntes98(servidor, parametros)
+            assert lote.data(i) == aposentadoria.data_aposentadoria
+            assert lote.compulsoria[i] == aposentadoria.compulsoria
+
+    def test_regra_transicao_nascido_em_29_de_fevereiro(self):
+        servidor = DadosPrevidenciarios(
+            data_nascimento=date(1968, 2, 29),
+            sexo=Sexo.MASCULINO,
+            data_admissao=date(1990, 8, 13),
+            tempo_INSS=0,
+            tempo_sevico_publico=0,
+        )
+        # 28/02/2027 - 36 anos contribuição e 59 anos idade -> total 95 pontos
+
+        lote = calcula_aposentadorias([servidor], AposentadoriaAntes98)
+
+        assert lote.data(0) == date(2027, 2, 28)
+        assert AposentadoriaAntes98(servidor).data_aposentadoria == date(2027, 2, 28)
+
+    def test_sem_servidores(self):
+        lote = calcula_aposentadorias([])
+
+        assert len(lote.datas) == 0
+        assert len(lote.compulsoria) == 0
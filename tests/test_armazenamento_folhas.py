@@ -0,0 +1,207 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from src.armazenamento_folhas import ArmazenamentoColunar, ArmazenamentoDicionario
+from src.folha import CAMPOS_VALORES, Folha, LoteFolhas
+from src.folhas import Folhas
+from src.nivel import Nivel
+
+
+def cria_folha(total: float, nivel: Nivel = Nivel(5, "B")) -> Folha:
+    return Folha(
+        nivel=nivel,
+        salario=total - 10,
+        anuenio=4.5,
+        ats=5.5,
+        total_antes_limite_prefeito=total,
+        total=total,
+        fufin_patronal=round(total * 0.22, 2),
+        bhprev_patronal=0.0,
+        bhprev_complementar_patronal=1.25,
+    )
+
+
+def cria_lote(competencias: list[date], cms: list[int]) -> LoteFolhas:
+    forma = (len(competencias), len(cms))
+    ativo = np.ones(forma, dtype=bool)
+    ativo[0, 0] = False  # primeiro servidor ainda não admitido
+    niveis = np.full(forma, Nivel(3, "A"), dtype=object)
+    niveis[0, 0] = None
+    total = np.arange(forma[0] * forma[1], dtype=float).reshape(forma) + 1000
+    total[0, 0] = 0.0
+    zeros = np.zeros(forma)
+    return LoteFolhas(
+        competencias=competencias,
+        cms=cms,
+        ativo=ativo,
+        niveis=niveis,
+        salario=total,
+        anuenio=zeros,
+        ats=zeros,
+        total_antes_limite_prefeito=total,
+        total=total,
+        fufin_patronal=zeros,
+        bhprev_patronal=total / 10,
+        bhprev_complementar_patronal=zeros,
+    )
+
+
+@pytest.fixture(params=[ArmazenamentoDicionario, ArmazenamentoColunar])
+def armazenamento(request):
+    if request.param is ArmazenamentoColunar:
+        # Capacidade pequena para exercitar o redimensionamento
+        return ArmazenamentoColunar(capacidade_linhas=1, capacidade_colunas=1)
+    return request.param()
+
+
+class TestArmazenamentoFolhas:
+    def test_adiciona_e_le_como_dicionario(self, armazenamento):
+        competencia = date(2024, 1, 1)
+        folha = cria_folha(1000.0)
+
+        armazenamento.adiciona(competencia, 10, folha)
+        armazenamento.adiciona(competencia, 20, cria_folha(2000.0))
+
+        assert competencia in armazenamento
+        assert date(2024, 2, 1) not in armazenamento
+        assert 10 in armazenamento[competencia]
+        assert 30 not in armazenamento[competencia]
+        assert armazenamento[competencia][10] == folha
+        assert armazenamento.get(competencia, {}).get(30) is None
+        assert len(armazenamento) == 1
+        assert list(armazenamento[competencia]) == [10, 20]
+
+    def test_vazio_e_falso(self, armazenamento):
+        assert not armazenamento
+
+    def test_substitui_folha(self, armazenamento):
+        competencia = date(2024, 1, 1)
+        armazenamento.adiciona(competencia, 10, cria_folha(1000.0))
+        armazenamento.adiciona(competencia, 10, cria_folha(3000.0))
+
+        assert armazenamento[competencia][10].total == 3000.0
+        assert len(armazenamento[competencia]) == 1
+
+    def test_soma(self, armazenamento):
+        competencia = date(2024, 1, 1)
+        for cm in range(5):
+            armazenamento.adiciona(competencia, cm, cria_folha(1000.0 + cm))
+
+        totais = armazenamento.soma(competencia, ("total", "fufin_patronal"))
+
+        assert totais["total"] == 1000.0 + 1001.0 + 1002.0 + 1003.0 + 1004.0
+        assert totais["fufin_patronal"] == sum(
+            round((1000.0 + cm) * 0.22, 2) for cm in range(5)
+        )
+        assert armazenamento.soma(date(2030, 1, 1), ("total",)) == {"total": 0.0}
+
+    def test_adiciona_lote(self, armazenamento):
+        competencias = Folhas.gerar_periodos(date(2024, 1, 1), date(2024, 3, 1))
+        lote = cria_lote(competencias, [7, 8])
+
+        armazenamento.adiciona_lote(lote)
+
+        assert 7 not in armazenamento[competencias[0]]
+        assert armazenamento[competencias[0]][8] == lote.folha(0, 1)
+        for i, competencia in enumerate(competencias[1:], start=1):
+            assert armazenamento[competencia][7] == lote.folha(i, 0)
+            assert armazenamento[competencia][8] == lote.folha(i, 1)
+
+    def test_lote_sem_folhas_nao_cria_competencias(self, armazenamento):
+        lote = cria_lote([date(2024, 1, 1)], [7])
+
+        armazenamento.adiciona_lote(lote)
+
+        assert not armazenamento
+
+    def test_somas_iguais_a_soma_por_competencia(self, armazenamento):
+        competencias = Folhas.gerar_periodos(date(2024, 1, 1), date(2024, 3, 1))
+        armazenamento.adiciona_lote(cria_lote(competencias, [7, 8, 9]))
+        armazenamento.adiciona(date(2025, 1, 1), 4, cria_folha(500.0))
+        campos = ("total", "bhprev_patronal")
+
+        competencias_somas, somas = armazenamento.somas(campos)
+
+        assert competencias_somas == list(armazenamento)
+        for competencia, soma in zip(competencias_somas, somas):
+            assert list(soma) == list(armazenamento.soma(competencia, campos).values())
+
+    def test_extrai(self, armazenamento):
+        competencias = Folhas.gerar_periodos(date(2024, 1, 1), date(2024, 3, 1))
+        armazenamento.adiciona_lote(cria_lote(competencias, [7, 8]))
+
+        janela = [date(2023, 12, 1)] + competencias
+        extraido = armazenamento.extrai(janela, [8, 99, 7])
+
+        assert extraido.total.shape == (4, 3)
+        assert not extraido.ativo[0].any()  # competência inexistente
+        assert not extraido.ativo[:, 1].any()  # CM inexistente
+        assert not extraido.ativo[1, 2]  # folha inexistente
+        assert extraido.folha(1, 0) == armazenamento[competencias[0]][8]
+        assert extraido.folha(3, 2) == armazenamento[competencias[2]][7]
+        assert extraido.niveis[1, 2] is None
+        assert (extraido.total[~extraido.ativo] == 0).all()
+
+    def test_armazenamentos_equivalentes(self):
+        competencias = Folhas.gerar_periodos(date(2024, 1, 1), date(2024, 6, 1))
+        dicionario = ArmazenamentoDicionario()
+        colunar = ArmazenamentoColunar()
+        for armazenamento in (dicionario, colunar):
+            armazenamento.adiciona_lote(cria_lote(competencias, [1, 2, 3]))
+            armazenamento.adiciona(date(2025, 1, 1), 4, cria_folha(500.0))
+
+        assert dicionario == colunar
+
+    def test_remove_servidor(self, armazenamento):
+        competencias = Folhas.gerar_periodos(date(2024, 1, 1), date(2024, 3, 1))
+        armazenamento.adiciona_lote(cria_lote(competencias, [7, 8]))
+        armazenamento.adiciona(date(2025, 1, 1), 8, cria_folha(500.0))
+
+        armazenamento.remove_servidor(8)
+        armazenamento.remove_servidor(99)  # CM inexistente
+
+        # Competências que ficaram sem folhas deixam de existir
+        assert list(armazenamento) == competencias[1:]
+        assert armazenamento.cms() == [7]
+        assert all(8 not in armazenamento[c] for c in competencias[1:])
+        assert armazenamento.soma(competencias[1], ("total",))["total"] == 1002.0
+
+    def test_remove_e_readiciona_igual_a_adicionar_uma_vez(self, armazenamento):
+        competencias = Folhas.gerar_periodos(date(2024, 1, 1), date(2024, 3, 1))
+        lote = cria_lote(competencias, [7, 8])
+        armazenamento.adiciona_lote(lote)
+        esperado = ArmazenamentoDicionario()
+        esperado.adiciona_lote(lote)
+
+        armazenamento.remove_servidor(7)
+        armazenamento.remove_servidor(8)
+        armazenamento.adiciona_lote(lote)
+
+        assert armazenamento == esperado
+        assert armazenamento.cms() == [7, 8]
+
+    @pytest.mark.parametrize("num_competencias", [0, 3])
+    def test_de_matrizes_sem_copia(self, num_competencias):
+        competencias = Folhas.gerar_periodos(date(2024, 1, 1), date(2024, 3, 1))
+        competencias = competencias[:num_competencias]
+        original = ArmazenamentoColunar()
+        if competencias:
+            original.adiciona_lote(cria_lote(competencias, [7, 8]))
+        lote = original.extrai(list(original), original.cms())
+        niveis = original._niveis[: len(original), : len(original.cms())].copy()
+        valores = {campo: getattr(lote, campo) for campo in CAMPOS_VALORES}
+        total = valores["total"] = lote.total.copy()
+
+        armazenamento = ArmazenamentoColunar.de_matrizes(
+            list(original), original.cms(), lote.ativo, niveis, valores
+        )
+
+        assert armazenamento == original
+        assert armazenamento._valores["total"] is total
+        assert armazenamento._niveis is niveis
+        # Continua aceitando folhas novas, além da capacidade das matrizes
+        armazenamento.adiciona(date(2025, 1, 1), 9, cria_folha(500.0))
+        original.adiciona(date(2025, 1, 1), 9, cria_folha(500.0))
+        assert armazenamento == original
@@ -0,0 +1,68 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from reenquadramento.avaliacoes import Avaliacao, Avaliacoes, CarregadorAvaliacoes
+
+
+@pytest.fixture
+def notas():
+    return pd.DataFrame(
+        {
+            "cm": [7, 3, 7, 3, 7],
+            "inicio": [
+                date(2014, 1, 1),
+                date(2012, 6, 1),
+                None,
+                date(2010, 6, 1),
+                date(2010, 1, 1),
+            ],
+            "nota": [80, 65, 90, 70, 55],
+        }
+    )
+
+
+class TestAvaliacoes:
+    def test_ordena_por_cm_e_inicio(self, notas):
+        avaliacoes = Avaliacoes.from_dataframe(notas)
+
+        assert list(avaliacoes.cms) == [3, 7]
+        assert list(avaliacoes.offsets) == [0, 2, 5]
+        assert list(avaliacoes.notas_do_cm(3)) == [70, 65]
+        # Sem início, a avaliação fica por último
+        assert list(avaliacoes.notas_do_cm(7)) == [55, 80, 90]
+        assert avaliacoes.do_cm(3) == [
+            Avaliacao(pd.Timestamp(2010, 6, 1), 70.0),
+            Avaliacao(pd.Timestamp(2012, 6, 1), 65.0),
+        ]
+
+    def test_fatias_sem_copia(self, notas):
+        avaliacoes = Avaliacoes.from_dataframe(notas)
+
+        assert np.shares_memory(avaliacoes.notas_do_cm(7), avaliacoes.notas)
+
+    def test_cm_sem_avaliacoes(self, notas):
+        for avaliacoes in (Avaliacoes(), Avaliacoes.from_dataframe(notas)):
+            assert len(avaliacoes.notas_do_cm(5)) == 0
+            assert len(avaliacoes.notas_do_cm(99)) == 0
+            assert avaliacoes.do_cm(5) is None
+
+
+class TestCarregadorAvaliacoes:
+    def test_cache_em_disco(self, monkeypatch, tmp_path, notas):
+        caminho = str(tmp_path / "notas.xlsx")
+        notas.to_excel(caminho, sheet_name="Sheet0", index=False)
+        diretorio_cache = str(tmp_path / "cache")
+
+        primeira = CarregadorAvaliacoes(caminho, diretorio_cache).avaliacoes
+
+        def falha(*args, **kwargs):
+            raise AssertionError("planilha lida novamente")
+
+        monkeypatch.setattr(pd, "read_excel", falha)
+        segunda = CarregadorAvaliacoes(caminho, diretorio_cache).avaliacoes
+        assert list(segunda.notas_do_cm(7)) == [55, 80, 90]
+        assert np.array_equal(segunda.notas, primeira.notas)
+        assert np.array_equal(segunda.offsets, primeira.offsets)
@@ -0,0 +1,116 @@
+import json
+import os
+import sqlite3
+import time
+from datetime import timedelta
+
+import pandas as pd
+import pytest
+
+from src.banco_de_dados import BancoDeDados, CacheConsultas
+
+
+class ContadorConexoes:
+    """Driver SQLite que conta as conexões abertas."""
+
+    def __init__(self):
+        self.conexoes = 0
+
+    def __call__(self, **dados_conexao):
+        self.conexoes += 1
+        return sqlite3.connect(**dados_conexao)
+
+
+@pytest.fixture
+def banco(tmp_path):
+    caminho_banco = tmp_path / "aeros.db"
+    with sqlite3.connect(caminho_banco) as conn:
+        conn.execute("CREATE TABLE servidores (cm INTEGER, letra TEXT)")
+        conn.executemany(
+            "INSERT INTO servidores VALUES (?, ?)", [(1, "A"), (2, "BASE")]
+        )
+
+    config_path = tmp_path / "db_config.json"
+    config_path.write_text(json.dumps({"database": str(caminho_banco)}))
+    sql_dir = tmp_path / "sql"
+    sql_dir.mkdir()
+    (sql_dir / "servidores.sql").write_text("SELECT cm, letra FROM servidores")
+
+    contador = ContadorConexoes()
+    yield lambda: BancoDeDados(
+        config_path=str(config_path), sql_dir=str(sql_dir), conecta=contador
+    ), contador, tmp_path
+    BancoDeDados.fecha_conexoes()
+    BancoDeDados.configura_cache(None)
+
+
+class TestBancoDeDados:
+    def test_realiza_consulta(self, banco):
+        cria_banco, _, _ = banco
+
+        df = cria_banco().realiza_consulta_arquivo("servidores.sql")
+
+        assert list(df.columns) == ["cm", "letra"]
+        assert df.values.tolist() == [[1, "A"], [2, "BASE"]]
+
+    def test_reaproveita_conexao_entre_instancias(self, banco):
+        cria_banco, contador, _ = banco
+
+        for _ in range(3):
+            cria_banco().realiza_consulta("SELECT 1 AS um")
+
+        assert contador.conexoes == 1
+
+    def test_descarta_conexao_com_erro(self, banco):
+        cria_banco, contador, _ = banco
+
+        with pytest.raises(sqlite3.OperationalError):
+            cria_banco().realiza_consulta("SELECT * FROM inexistente")
+        cria_banco().realiza_consulta("SELECT 1 AS um")
+
+        assert contador.conexoes == 2
+
+    def test_cache_evita_consulta_repetida(self, banco):
+        cria_banco, contador, tmp_path = banco
+        BancoDeDados.configura_cache(str(tmp_path / "cache"))
+
+        primeiro = cria_banco().realiza_consulta_arquivo("servidores.sql")
+        BancoDeDados.fecha_conexoes()
+        segundo = cria_banco().realiza_consulta_arquivo("servidores.sql")
+
+        assert contador.conexoes == 1
+        assert segundo.equals(primeiro)
+
+    def test_cache_depende_do_conteudo_do_arquivo(self, banco):
+        cria_banco, _, tmp_path = banco
+        BancoDeDados.configura_cache(str(tmp_path / "cache"))
+        cria_banco().realiza_consulta_arquivo("servidores.sql")
+
+        (tmp_path / "sql" / "servidores.sql").write_text(
+            "SELECT cm FROM servidores WHERE letra = 'A'"
+        )
+
+        df = cria_banco().realiza_consulta_arquivo("servidores.sql")
+
+        assert df.values.tolist() == [[1]]
+
+
+class TestCacheConsultas:
+    def test_resultado_vencido_nao_e_usado(self, tmp_path):
+        cache = CacheConsultas(str(tmp_path), validade=timedelta(hours=1))
+        chave = CacheConsultas.chave("SELECT 1", {"host": "aeros"})
+        cache.salva(chave, pd.DataFrame({"a": [1]}))
+
+        assert cache.obtem(chave) is not None
+        duas_horas_atras = time.time() - 2 * 3600
+        os.utime(cache._caminho(chave), (duas_horas_atras, duas_horas_atras))
+        assert cache.obtem(chave) is None
+
+    def test_chave_ignora_senha(self):
+        chave = CacheConsultas.chave("SELECT 1", {"host": "aeros", "password": "a"})
+
+        assert chave == CacheConsultas.chave(
+            "SELECT 1", {"host": "aeros", "password": "b"}
+        )
+        assert chave != CacheConsultas.chave("SELECT 1", {"host": "outro"})
+        assert chave != CacheConsultas.chave("SELECT 2", {"host": "aeros"})
@@ -0,0 +1,129 @@
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import config
+from src.cache_projecao import CacheProjecao
+from src.cmbh import CMBH, ImportadorProjecaoExcel
+from src.progressoes_horizontais import ProgressoesHorizontais
+
+PLANILHA = "tests/exemplo_projecao_atual.xlsx"
+
+
+@pytest.fixture(scope="module")
+def cmbh_importado() -> CMBH:
+    return ImportadorProjecaoExcel(funcao_obtem_tempos_licencas=lambda: {}).importa(
+        PLANILHA
+    )
+
+
+class TestCacheProjecao:
+    def test_salva_e_carrega(self, cmbh_importado, tmp_path):
+        cache = CacheProjecao(str(tmp_path))
+        chave = CacheProjecao.chave(PLANILHA, config.Parametros())
+
+        assert cache.carrega(chave) is None
+        cache.salva(chave, cmbh_importado)
+        carregado = cache.carrega(chave)
+
+        original = cmbh_importado.folhas_efetivos
+        assert carregado.folhas_efetivos.servidores == original.servidores
+        assert carregado.folhas_efetivos.folhas == original.folhas
+        assert list(carregado.folhas_efetivos.folhas) == list(original.folhas)
+        assert carregado.folhas_pia.pias == cmbh_importado.folhas_pia.pias
+        assert carregado.folhas_efetivos.total_anual_no_intervalo(2025, 2030).equals(
+            original.total_anual_no_intervalo(2025, 2030)
+        )
+        assert list(carregado.funcionarios) == list(cmbh_importado.funcionarios)
+        for cm, funcionario in cmbh_importado.funcionarios.items():
+            assert carregado.funcionarios[cm].to_dict() == funcionario.to_dict()
+            assert carregado.funcionarios[cm].progressoes == funcionario.progressoes
+
+    def test_arquivos_sao_mapeados(self, cmbh_importado, tmp_path):
+        cache = CacheProjecao(str(tmp_path))
+        cache.salva("chave", cmbh_importado)
+
+        total = np.load(tmp_path / "chave" / "total.npy", mmap_mode="r")
+
+        assert isinstance(total, np.memmap)
+        assert total.shape == (
+            len(cmbh_importado.folhas_efetivos.folhas),
+            len(cmbh_importado.folhas_efetivos.folhas.cms()),
+        )
+
+    def test_folhas_carregadas_sobre_os_mapas(self, cmbh_importado, tmp_path):
+        cache = CacheProjecao(str(tmp_path))
+        cache.salva("chave", cmbh_importado)
+        original = cmbh_importado.folhas_efetivos.folhas
+        cm = original.cms()[0]
+
+        carregado = cache.carrega("chave")
+        folhas = carregado.folhas_efetivos.folhas
+
+        assert isinstance(folhas._valores["total"], np.memmap)
+        assert isinstance(folhas._niveis, np.memmap)
+        # As alterações ficam na memória, sem mudar o cache
+        carregado.folhas_efetivos.remove_servidor(cm)
+        assert cm not in folhas.cms()
+        assert cache.carrega("chave").folhas_efetivos.folhas == original
+
+    def test_nao_sobrescreve_nem_deixa_temporarios(self, cmbh_importado, tmp_path):
+        cache = CacheProjecao(str(tmp_path))
+        cache.salva("chave", cmbh_importado)
+        cache.salva("chave", CMBH())
+
+        assert [p.name for p in tmp_path.iterdir()] == ["chave"]
+        assert cache.carrega("chave").funcionarios.keys() == (
+            cmbh_importado.funcionarios.keys()
+        )
+
+    def test_chave_depende_da_planilha_e_dos_parametros(self, tmp_path):
+        copia = tmp_path / "copia.xlsx"
+        shutil.copy(PLANILHA, copia)
+        param = config.Parametros(VALOR_BASE_E2=5758.83)
+        chave = CacheProjecao.chave(PLANILHA, param, 2025)
+
+        assert CacheProjecao.chave(str(copia), param, 2025) == chave
+        assert CacheProjecao.chave(PLANILHA, param, 2026) != chave
+        assert (
+            CacheProjecao.chave(PLANILHA, config.Parametros(VALOR_BASE_E2=1.0), 2025)
+            != chave
+        )
+        assert (
+            CacheProjecao.chave(
+                PLANILHA,
+                config.Parametros(
+                    VALOR_BASE_E2=5758.83,
+                    CONCESSAO_LETRAS=config.ConcessaoLetras.NAO_CONCEDE,
+                ),
+                2025,
+            )
+            != chave
+        )
+        with open(copia, "ab") as arquivo:
+            arquivo.write(b"\0")
+        assert CacheProjecao.chave(str(copia), param, 2025) != chave
+
+    def test_resumo_depende_das_letras_adquiridas(self):
+        def progressoes(letras: str, nivel: int) -> ProgressoesHorizontais:
+            return ProgressoesHorizontais(
+                dados=pd.DataFrame(
+                    {
+                        "cm": [1, 2],
+                        "nivel_atual": [nivel, 3],
+                        "letras_adquiridas": [letras, "A"],
+                    }
+                )
+            )
+
+        resumo = CacheProjecao.resumo_progressoes(progressoes("B", 5))
+        param = config.Parametros()
+
+        assert CacheProjecao.resumo_progressoes(progressoes("B", 5)) == resumo
+        assert CacheProjecao.resumo_progressoes(progressoes("C", 5)) != resumo
+        assert CacheProjecao.resumo_progressoes(progressoes("B", 6)) != resumo
+        assert CacheProjecao.chave(
+            PLANILHA, param, CacheProjecao.resumo_progressoes(progressoes("C", 5))
+        ) != CacheProjecao.chave(PLANILHA, param, resumo)
@@ -0,0 +1,60 @@
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+
+from src.calendario import CalendarioCompetencias
+
+
+class TestCalendarioCompetencias:
+    def test_datas_mensais_ate_fim(self):
+        calendario = CalendarioCompetencias.para(date(2023, 11, 1), date(2024, 2, 1))
+
+        assert calendario.datas == (
+            date(2023, 11, 1),
+            date(2023, 12, 1),
+            date(2024, 1, 1),
+            date(2024, 2, 1),
+        )
+        assert len(calendario) == 4
+        assert list(calendario) == list(calendario.datas)
+
+    def test_datas_iguais_a_soma_de_um_mes(self):
+        inicio = date(2024, 1, 31)
+        esperado = []
+        atual = inicio
+        while atual <= date(2025, 1, 1):
+            esperado.append(atual)
+            atual += relativedelta(months=1)
+
+        calendario = CalendarioCompetencias.para(inicio, date(2025, 1, 1))
+
+        assert list(calendario.datas) == esperado
+
+    def test_rotulos_anos_e_meses(self):
+        calendario = CalendarioCompetencias.para(date(2024, 11, 1), date(2025, 1, 1))
+
+        assert calendario.rotulos == ("2024-11", "2024-12", "2025-01")
+        assert list(calendario.anos) == [2024, 2024, 2025]
+        assert list(calendario.meses) == [11, 12, 1]
+
+    def test_indice(self):
+        calendario = CalendarioCompetencias.para(date(2024, 1, 1), date(2024, 12, 1))
+
+        assert calendario.indice(date(2024, 1, 1)) == 0
+        assert calendario.indice(date(2024, 12, 1)) == 11
+        assert calendario.indice(date(2025, 1, 1)) is None
+        assert date(2024, 5, 1) in calendario
+        assert date(2024, 5, 2) not in calendario
+
+    def test_intervalo_vazio(self):
+        calendario = CalendarioCompetencias.para(date(2025, 1, 1), date(2024, 1, 1))
+
+        assert len(calendario) == 0
+        assert calendario.rotulos == ()
+
+    def test_reaproveita_calendario_do_mesmo_intervalo(self):
+        primeiro = CalendarioCompetencias.para(date(2024, 1, 1), date(2053, 12, 1))
+        segundo = CalendarioCompetencias.para(date(2024, 1, 1), date(2053, 12, 1))
+
+        assert primeiro is segundo
+        assert not primeiro.anos.flags.writeable
@@ -243,3 +243,56 @@ class TestCarreiraE3PassaDoTetoAtual:
         carreira = CarreiraE3Concurso1998eAnterior()
         prog_antes = Progressao(date(2020, 1, 1), Nivel(39, "E"), progs_sem_especial=0)
         assert carreira.progride_verticalmente(prog_antes) == None
+
+
+def progressoes_passo_a_passo(carreira, progressao, letra_maxima):
+    progressoes = []
+    while True:
+        progressao = carreira.progride_verticalmente_e_horizontalmente(
+            progressao, letra_maxima=letra_maxima
+        )
+        if not progressao:
+            return progressoes
+        progressoes.append(progressao)
+
+
+class TestTrajetoria:
+    @pytest.mark.parametrize(
+        "carreira",
+        [
+            CarreiraE2(),
+            CarreiraE2Concurso2008(),
+            CarreiraE2Concurso2004(),
+            CarreiraE2Concurso1998eAnterior(),
+            CarreiraE3(),
+            CarreiraE3Concurso2008(),
+            CarreiraE3Concurso2004(),
+            CarreiraE3Concurso1998eAnterior(),
+        ],
+    )
+    @pytest.mark.parametrize("letra_maxima", [None, "0", "B", "E"])
+    def test_igual_a_progredir_passo_a_passo(self, carreira, letra_maxima):
+        for numero, letra, progs, data in [
+            (1, "0", 0, date(2020, 1, 1)),
+            (4, "A", 1, date(2019, 8, 31)),
+            (11, "C", 0, date(2021, 3, 15)),
+            (30, "E", 1, date(2022, 1, 29)),
+        ]:
+            inicio = Progressao(data, Nivel(numero, letra), progs_sem_especial=progs)
+
+            esperado = progressoes_passo_a_passo(carreira, inicio, letra_maxima)
+
+            assert list(carreira.trajetoria(inicio, letra_maxima)) == esperado
+            # Segunda consulta usa a tabela já calculada
+            assert list(carreira.trajetoria(inicio, letra_maxima)) == esperado
+
+    def test_trajetoria_vazia_no_fim_da_carreira(self):
+        inicio = Progressao(date(2020, 1, 1), Nivel(32, "E"))
+
+        assert list(CarreiraE2().trajetoria(inicio)) == []
+
+    def test_nivel_invalido_lanca_excecao(self):
+        inicio = Progressao(date(2020, 1, 1), Nivel(33, "E"))
+
+        with pytest.raises(ValueError):
+            next(CarreiraE2().trajetoria(inicio))
@@ -0,0 +1,191 @@
+import json
+from datetime import date
+
+import openpyxl
+import pytest
+
+import config
+from src.carreira import Progressao, atribui_carreira
+from src.cenarios import (
+    Cenario,
+    VarreduraCenarios,
+    _agrupa_por_concessao,
+    carrega_cenarios,
+    cenarios_da_grade,
+)
+from src.classe import Classe
+from src.cmbh import CMBH
+from src.funcionario import Aposentadoria, DadosFolha, Funcionario, TipoPrevidencia
+from src.nivel import Nivel
+from src.progressoes_horizontais import progressoes_horizontais
+
+BASE = config.Parametros(
+    VALOR_BASE_E2=5758.83,
+    VALOR_BASE_E3=10047.80,
+    TETO_PREFEITO=34604.05,
+    TETO_PROCURADORES=41845.49,
+    TETO_INSS=8157.41,
+)
+
+
+def cria_funcionario(cm: int) -> Funcionario:
+    tipos = list(TipoPrevidencia)
+    classe = Classe.E2 if cm % 2 else Classe.E3
+    return Funcionario(
+        cm=cm,
+        data_admissao=date(2000 + cm % 20, 1 + cm % 12, 1),
+        dados_folha=DadosFolha(
+            classe=classe,
+            data_anuenio=date(2000 + cm % 20, 1 + cm % 12, 10),
+            num_ats=cm % 5,
+            procurador=cm % 7 == 0,
+            tipo_previdencia=tipos[cm % len(tipos)],
+        ),
+        aposentadoria=Aposentadoria(
+            data_condicao_aposentadoria=date(2026 + cm % 6, 3, 1),
+            data_aposentadoria=date(2026 + cm % 6, 1 + cm % 12, 15),
+            num_art_98_data_aposentadoria=cm % 90,
+            aderiu_pia=cm % 3 != 0,
+        ),
+        ultima_progressao=Progressao(
+            data=date(2023, 1 + cm % 12, 1), nivel=Nivel(1 + cm % 10, "A")
+        ),
+        carreira=atribui_carreira(cm * 37, classe),
+    )
+
+
+@pytest.fixture
+def funcionarios(monkeypatch):
+    monkeypatch.setattr(config, "param", BASE)
+    for cm in range(1, 21):
+        monkeypatch.setitem(progressoes_horizontais.letras_adquiridas, cm, "B")
+        monkeypatch.setitem(progressoes_horizontais.nivel_atual, cm, 1 + cm % 10)
+    return [cria_funcionario(cm) for cm in range(1, 21)]
+
+
+CENARIOS = [
+    Cenario("Base", BASE),
+    Cenario(
+        "Sem letras",
+        config.Parametros(
+            **{
+                **vars(BASE),
+                "CONCESSAO_LETRAS": config.ConcessaoLetras.NAO_CONCEDE,
+            }
+        ),
+    ),
+    Cenario(
+        "Reajuste",
+        config.Parametros(
+            **{**vars(BASE), "REAJUSTE_ANUAL": 0.05, "ALIQUOTA_PATRONAL": 0.2}
+        ),
+    ),
+]
+
+
+def totais_calculados_isoladamente(cenario: Cenario, monkeypatch):
+    monkeypatch.setattr(config, "param", cenario.param)
+    cmbh = CMBH()
+    cmbh.funcionarios = {cm: cria_funcionario(cm) for cm in range(1, 21)}
+    cmbh.calcula_projecao(2025, 2030)
+    return cmbh.totais_anuais(2025, 2030)
+
+
+class TestVarreduraCenarios:
+    def test_igual_a_calcular_cada_cenario_isoladamente(
+        self, funcionarios, monkeypatch
+    ):
+        totais = VarreduraCenarios(funcionarios, 2025, 2030).calcula(CENARIOS)
+
+        assert config.param is BASE
+        assert [len(f.progressoes) for f in funcionarios] == [1] * 20
+        assert not totais["Base"].equals(totais["Sem letras"])
+        assert not totais["Base"].equals(totais["Reajuste"])
+        for cenario in CENARIOS:
+            esperado = totais_calculados_isoladamente(cenario, monkeypatch)
+            assert totais[cenario.nome].equals(esperado)
+
+    def test_paralelo_igual_ao_serial(self, funcionarios):
+        serial = VarreduraCenarios(funcionarios, 2025, 2030).calcula(CENARIOS)
+        paralelo = VarreduraCenarios(funcionarios, 2025, 2030, processos=2).calcula(
+            CENARIOS
+        )
+
+        assert list(paralelo) == list(serial)
+        for nome in serial:
+            assert paralelo[nome].equals(serial[nome])
+
+    def test_tarefas_com_uma_so_concessao_de_letras(self):
+        cenarios = cenarios_da_grade(
+            BASE,
+            {
+                "REAJUSTE_ANUAL": [0.0, 0.05, 0.1],
+                "CONCESSAO_LETRAS": ["NAO_CONCEDE", "CONCEDE_UMA"],
+            },
+        )
+
+        for processos, num_tarefas in [(1, 2), (2, 2), (4, 4), (8, 6)]:
+            tarefas = _agrupa_por_concessao(cenarios, processos)
+
+            assert len(tarefas) == num_tarefas
+            assert sorted(c.nome for t in tarefas for c in t) == sorted(
+                c.nome for c in cenarios
+            )
+            for tarefa in tarefas:
+                assert len({c.param.CONCESSAO_LETRAS for c in tarefa}) == 1
+
+    def test_exporta_planilha_comparativa(self, funcionarios, tmp_path):
+        totais = VarreduraCenarios(funcionarios, 2025, 2026).calcula(CENARIOS)
+        caminho = tmp_path / "cenarios.xlsx"
+
+        VarreduraCenarios.exporta(CENARIOS, totais, str(caminho))
+
+        planilha = openpyxl.load_workbook(caminho, read_only=True)
+        assert planilha.sheetnames == ["Cenários", "Comparativo", "Totais Anuais"]
+        comparativo = list(planilha["Comparativo"].values)
+        assert comparativo[0] == ("ano", "Base", "Sem letras", "Reajuste")
+        assert [linha[0] for linha in comparativo[1:]] == [2025, 2026]
+        assert len(list(planilha["Totais Anuais"].values)) == 1 + 2 * len(CENARIOS)
+
+
+class TestCarregaCenarios:
+    def test_grade_gera_todas_as_combinacoes(self):
+        cenarios = cenarios_da_grade(
+            BASE,
+            {
+                "REAJUSTE_ANUAL": [0.0, 0.05],
+                "CONCESSAO_LETRAS": ["NAO_CONCEDE", "CONCEDE_UMA"],
+            },
+        )
+
+        assert len(cenarios) == 4
+        assert cenarios[1].nome == "REAJUSTE_ANUAL=0.0, CONCESSAO_LETRAS=CONCEDE_UMA"
+        assert cenarios[1].param.CONCESSAO_LETRAS == config.ConcessaoLetras.CONCEDE_UMA
+        assert cenarios[3].param.REAJUSTE_ANUAL == 0.05
+        assert cenarios[3].param.VALOR_BASE_E2 == BASE.VALOR_BASE_E2
+
+    def test_carrega_cenarios_nomeados_e_grade(self, tmp_path):
+        caminho = tmp_path / "cenarios.json"
+        caminho.write_text(
+            json.dumps(
+                {
+                    "cenarios": [{"nome": "Alíquota", "ALIQUOTA_PATRONAL": 0.2}, {}],
+                    "grade": {"DATA_BASE_REAJUSTE": [1, 5]},
+                }
+            )
+        )
+
+        cenarios = carrega_cenarios(str(caminho), BASE)
+
+        assert [c.nome for c in cenarios] == [
+            "Alíquota",
+            "Cenário 2",
+            "DATA_BASE_REAJUSTE=1",
+            "DATA_BASE_REAJUSTE=5",
+        ]
+        assert cenarios[0].param.ALIQUOTA_PATRONAL == 0.2
+        assert cenarios[1].param == BASE
+
+    def test_parametro_desconhecido(self):
+        with pytest.raises(ValueError):
+            cenarios_da_grade(BASE, {"REAJUSTE": [0.1]})
@@ -1,5 +1,16 @@
+import dataclasses
+from datetime import date
+
 import pandas as pd
+import pytest
+
+import config
+from src.carreira import Progressao, atribui_carreira
+from src.classe import Classe
 from src.cmbh import CMBH
+from src.funcionario import Aposentadoria, DadosFolha, Funcionario, TipoPrevidencia
+from src.nivel import Nivel
+from src.progressoes_horizontais import progressoes_horizontais
 
 
 class DummyFolhasEfetivos:
@@ -104,3 +115,127 @@ class TestCMBH:
         assert set(df.columns) == {"cm", "nome"}
         assert set(df["cm"]) == {1, 2}
         assert set(df["nome"]) == {"Alice", "Bob"}
+
+
+def cria_funcionario(cm: int) -> Funcionario:
+    tipos = list(TipoPrevidencia)
+    classe = Classe.E2 if cm % 2 else Classe.E3
+    return Funcionario(
+        cm=cm,
+        data_admissao=date(2000 + cm % 20, 1 + cm % 12, 1),
+        dados_folha=DadosFolha(
+            classe=classe,
+            data_anuenio=date(2000 + cm % 20, 1 + cm % 12, 10),
+            num_ats=cm % 5,
+            procurador=cm % 7 == 0,
+            tipo_previdencia=tipos[cm % len(tipos)],
+        ),
+        aposentadoria=Aposentadoria(
+            data_condicao_aposentadoria=date(2026 + cm % 6, 3, 1),
+            data_aposentadoria=date(2026 + cm % 6, 1 + cm % 12, 15),
+            num_art_98_data_aposentadoria=cm % 90,
+            aderiu_pia=cm % 3 != 0,
+        ),
+        ultima_progressao=Progressao(
+            data=date(2023, 1 + cm % 12, 1), nivel=Nivel(1 + cm % 10, "A")
+        ),
+        carreira=atribui_carreira(cm * 37, classe),
+    )
+
+
+def corrige_cm_3(funcionario: Funcionario) -> None:
+    funcionario.dados_folha.num_ats = 4
+    funcionario.aposentadoria.data_aposentadoria = date(2029, 7, 15)
+
+
+@pytest.fixture
+def parametros(monkeypatch):
+    monkeypatch.setattr(
+        config,
+        "param",
+        config.Parametros(
+            VALOR_BASE_E2=5758.83,
+            VALOR_BASE_E3=10047.80,
+            TETO_PREFEITO=34604.05,
+            TETO_PROCURADORES=41845.49,
+            TETO_INSS=8157.41,
+        ),
+    )
+    for cm in range(1, 21):
+        monkeypatch.setitem(progressoes_horizontais.letras_adquiridas, cm, "B")
+        monkeypatch.setitem(progressoes_horizontais.nivel_atual, cm, 1 + cm % 10)
+
+
+def projecao_completa(funcionarios: dict[int, Funcionario]) -> CMBH:
+    cmbh = CMBH()
+    cmbh.funcionarios = funcionarios
+    cmbh.calcula_projecao(2025, 2030)
+    return cmbh
+
+
+def assert_projecoes_iguais(cmbh: CMBH, esperado: CMBH) -> None:
+    assert cmbh.totais_anuais(2025, 2030).equals(esperado.totais_anuais(2025, 2030))
+    assert cmbh.folhas_efetivos.folhas == esperado.folhas_efetivos.folhas
+    assert cmbh.folhas_efetivos.servidores == esperado.folhas_efetivos.servidores
+    assert cmbh.folhas_pia.pias == esperado.folhas_pia.pias
+    for cm, funcionario in esperado.funcionarios.items():
+        assert cmbh.funcionarios[cm].progressoes == funcionario.progressoes
+
+
+@pytest.mark.usefixtures("parametros")
+class TestAtualizaProjecao:
+    def test_sem_projecao_anterior_calcula_tudo(self):
+        cmbh = CMBH()
+        cmbh.funcionarios = {cm: cria_funcionario(cm) for cm in range(1, 21)}
+
+        assert cmbh.atualiza_projecao(2025, 2030) == set(range(1, 21))
+        assert_projecoes_iguais(
+            cmbh, projecao_completa({cm: cria_funcionario(cm) for cm in range(1, 21)})
+        )
+
+    def test_correcao_de_um_servidor(self):
+        cmbh = projecao_completa({cm: cria_funcionario(cm) for cm in range(1, 21)})
+        assert cmbh.atualiza_projecao(2025, 2030) == set()
+
+        corrige_cm_3(cmbh.funcionarios[3])
+        recalculados = cmbh.atualiza_projecao(2025, 2030)
+
+        funcionarios = {cm: cria_funcionario(cm) for cm in range(1, 21)}
+        corrige_cm_3(funcionarios[3])
+        assert recalculados == {3}
+        assert_projecoes_iguais(cmbh, projecao_completa(funcionarios))
+
+    def test_inclusao_e_remocao_de_servidores(self):
+        cmbh = projecao_completa({cm: cria_funcionario(cm) for cm in range(1, 20)})
+
+        del cmbh.funcionarios[5]
+        cmbh.funcionarios[20] = cria_funcionario(20)
+        recalculados = cmbh.atualiza_projecao(2025, 2030)
+
+        cms = [cm for cm in range(1, 21) if cm != 5]
+        assert recalculados == {5, 20}
+        assert_projecoes_iguais(
+            cmbh, projecao_completa({cm: cria_funcionario(cm) for cm in cms})
+        )
+
+    def test_parametro_alterado_recalcula_apenas_dependentes(self):
+        cmbh = projecao_completa({cm: cria_funcionario(cm) for cm in range(1, 21)})
+
+        # Alterado no próprio objeto, como a tabela não perceberia sozinha
+        config.param.VALOR_BASE_E3 = 11000.0
+        recalculados = cmbh.atualiza_projecao(2025, 2030)
+
+        assert recalculados == {cm for cm in range(1, 21) if cm % 2 == 0}
+        assert_projecoes_iguais(
+            cmbh, projecao_completa({cm: cria_funcionario(cm) for cm in range(1, 21)})
+        )
+
+    def test_parametro_sem_dependencia_conhecida_recalcula_todos(self):
+        cmbh = projecao_completa({cm: cria_funcionario(cm) for cm in range(1, 21)})
+
+        config.param = dataclasses.replace(config.param, REAJUSTE_ANUAL=0.05)
+
+        assert cmbh.atualiza_projecao(2025, 2030) == set(range(1, 21))
+        assert_projecoes_iguais(
+            cmbh, projecao_completa({cm: cria_funcionario(cm) for cm in range(1, 21)})
+        )
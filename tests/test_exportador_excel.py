@@ -5,7 +5,11 @@ import pandas as pd
 import pytest
 from openpyxl import load_workbook
 
-from src.exportador_excel import ExportadorExcel, para_excel_formatado
+from src.exportador_excel import (
+    EscritorExcelStreaming,
+    ExportadorExcel,
+    para_excel_formatado,
+)
 
 
 class TestExcelExporter:
@@ -313,3 +317,133 @@ class TestExcelExporter:
         # Coluna A deve ser a mais larga (texto longo)
         assert col_a_width > col_b_width
         assert col_a_width > col_c_width
+
+
+class TestEscritorExcelStreaming:
+
+    @pytest.fixture
+    def arquivo_excel_temporario(self):
+        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx")
+        temp_file.close()
+        yield temp_file.name
+        if os.path.exists(temp_file.name):
+            os.unlink(temp_file.name)
+
+    @pytest.fixture
+    def dataframe_misto(self):
+        return pd.DataFrame(
+            {
+                "Nome Completo do Funcionário": ["João", "Maria", None],
+                "Salário": [1500.50, None, 1800.00],
+                "Data": pd.to_datetime(["2024-01-01", None, "2024-03-01"]),
+                "Idade": [25, 30, 28],
+                "Ativo": [True, False, True],
+                "Misto": ["Texto", 2.5, 3],
+            }
+        )
+
+    def _escreve(self, escritor, df, caminho, **kwargs):
+        with escritor(caminho) as writer:
+            para_excel_formatado(df, writer, "Planilha", **kwargs)
+        return load_workbook(caminho)["Planilha"]
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {},
+            {"index": True},
+            {"startrow": 2, "startcol": 1},
+            {"index": True, "index_label": "Linha"},
+            {"columns": ["Misto", "Salário", "Idade"]},
+            {"na_rep": "sem valor"},
+            {"float_format": "%.0f"},
+            {"header": False, "startrow": 1},
+        ],
+    )
+    def test_equivalente_ao_exportador_pandas(
+        self, dataframe_misto, arquivo_excel_temporario, kwargs
+    ):
+        """O modo streaming gera os mesmos valores, estilos e larguras."""
+        esperado = self._escreve(
+            lambda caminho: pd.ExcelWriter(caminho, engine="openpyxl"),
+            dataframe_misto,
+            arquivo_excel_temporario,
+            **kwargs,
+        )
+        celulas_esperadas = [
+            [(c.value, c.style, c.font.b, c.alignment.wrap_text) for c in linha]
+            for linha in esperado.iter_rows()
+        ]
+        larguras_esperadas = {
+            letra: dimensao.width
+            for letra, dimensao in esperado.column_dimensions.items()
+            if letra >= chr(ord("A") + kwargs.get("startcol", 0))
+        }
+
+        obtido = self._escreve(
+            EscritorExcelStreaming,
+            dataframe_misto,
+            arquivo_excel_temporario,
+            **kwargs,
+        )
+
+        celulas = [
+            [(c.value, c.style, c.font.b, c.alignment.wrap_text) for c in linha]
+            for linha in obtido.iter_rows()
+        ]
+        assert celulas == celulas_esperadas
+        assert {
+            letra: dimensao.width
+            for letra, dimensao in obtido.column_dimensions.items()
+        } == larguras_esperadas
+
+    def test_colunas_selecionadas(self, dataframe_misto, arquivo_excel_temporario):
+        planilha = self._escreve(
+            EscritorExcelStreaming,
+            dataframe_misto,
+            arquivo_excel_temporario,
+            columns=["Misto", "Salário"],
+        )
+
+        assert [c.value for c in planilha[1]] == ["Misto", "Salário"]
+        assert planilha["B2"].value == 1500.50
+        assert planilha["B2"].style == "formato_numerico"
+
+    def test_argumento_nao_suportado(self, dataframe_misto, arquivo_excel_temporario):
+        with pytest.raises(TypeError):
+            self._escreve(
+                EscritorExcelStreaming,
+                dataframe_misto,
+                arquivo_excel_temporario,
+                freeze_panes=(1, 0),
+            )
+
+    def test_altura_do_cabecalho(self, arquivo_excel_temporario):
+        df = pd.DataFrame({"Texto do cabeçalho " * 4: [1.5], "B": [2.5]})
+
+        planilha = self._escreve(EscritorExcelStreaming, df, arquivo_excel_temporario)
+
+        assert planilha.column_dimensions["A"].width == 50
+        assert planilha.row_dimensions[1].height == 30
+
+    def test_multiplas_planilhas_e_dataframe_vazio(self, arquivo_excel_temporario):
+        with EscritorExcelStreaming(arquivo_excel_temporario) as writer:
+            para_excel_formatado(pd.DataFrame({"A": [1.5]}), writer, "Dados")
+            para_excel_formatado(pd.DataFrame(), writer, "Vazio")
+
+        workbook = load_workbook(arquivo_excel_temporario)
+        assert workbook.sheetnames == ["Dados", "Vazio"]
+        assert workbook["Dados"]["A2"].style == "formato_numerico"
+        assert workbook["Vazio"].max_row == 1
+        assert workbook["Vazio"]["A1"].value is None
+
+    def test_converte_objetos_em_texto(self, arquivo_excel_temporario):
+        class Nivel:
+            def __str__(self):
+                return "10-A"
+
+        df = pd.DataFrame({"Nível": [Nivel()]})
+
+        planilha = self._escreve(EscritorExcelStreaming, df, arquivo_excel_temporario)
+
+        assert planilha["A2"].value == "10-A"
@@ -0,0 +1,136 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+import config
+
+from src.carreira import CarreiraE2, CarreiraE3, Progressao
+from src.classe import Classe
+from src.fluxo_pessoal import FluxoPessoal, PoliticaReposicao, Substituto
+from src.funcionario import Aposentadoria, DadosFolha, Funcionario, TipoPrevidencia
+from src.nivel import Nivel
+
+
+def cria_funcionario(
+    cm: int, data_aposentadoria: date, classe: Classe = Classe.E2
+) -> Funcionario:
+    return Funcionario(
+        cm=cm,
+        data_admissao=date(2000, 3, 1),
+        dados_folha=DadosFolha(
+            classe=classe,
+            data_anuenio=date(2000, 3, 1),
+            num_ats=3,
+            procurador=cm == 2,
+            tipo_previdencia=TipoPrevidencia.Fufin,
+        ),
+        aposentadoria=Aposentadoria(
+            data_condicao_aposentadoria=data_aposentadoria,
+            data_aposentadoria=data_aposentadoria,
+            num_art_98_data_aposentadoria=0,
+            aderiu_pia=True,
+        ),
+        ultima_progressao=Progressao(data=date(2020, 1, 1), nivel=Nivel(12, "C")),
+        carreira=CarreiraE2(),
+    )
+
+
+@pytest.fixture
+def funcionarios():
+    return [
+        cria_funcionario(1, date(2026, 5, 20)),
+        cria_funcionario(2, date(2027, 1, 10), Classe.E3),
+        cria_funcionario(3, date(2040, 1, 1)),  # Depois do intervalo
+        cria_funcionario(4, date(2024, 6, 1)),  # Antes do intervalo
+    ]
+
+
+class TestFluxoPessoal:
+    def test_substitui_aposentados_no_intervalo(self, funcionarios):
+        resultado = FluxoPessoal().projeta(funcionarios, 2025, 2030)
+
+        assert [f.cm for f in resultado.admitidos] == [-1, -2]
+        substituto, procurador = resultado.admitidos
+        assert substituto.data_admissao == date(2026, 5, 1)
+        assert substituto.dados_folha.classe == Classe.E2
+        assert isinstance(substituto.carreira, CarreiraE2)
+        assert substituto.progressoes[0].nivel == Nivel(1, "A")
+        assert substituto.dados_folha.tipo_previdencia == (
+            TipoPrevidencia.BHPrevComplementar
+        )
+        assert substituto.aposentadoria.data_aposentadoria > date(2050, 1, 1)
+        assert procurador.dados_folha.procurador
+        assert procurador.dados_folha.classe == Classe.E3
+        assert isinstance(procurador.carreira, CarreiraE3)
+        assert procurador.progressoes[0].nivel == Nivel(10, "A")
+
+    def test_substitutos_ganham_letras_pela_politica(self, funcionarios, monkeypatch):
+        monkeypatch.setattr(
+            config.param, "CONCESSAO_LETRAS", config.ConcessaoLetras.NAO_CONCEDE
+        )
+        # Os CMs dos substitutos não colidem com os do Aeros, mesmo se já houver
+        # substitutos entre os servidores
+        funcionarios.append(cria_funcionario(-3, date(2040, 1, 1)))
+
+        substituto, *_ = FluxoPessoal().projeta(funcionarios, 2025, 2040).admitidos
+        limitado, *_ = (
+            FluxoPessoal(PoliticaReposicao(letra_maxima="A"))
+            .projeta(funcionarios, 2025, 2040)
+            .admitidos
+        )
+
+        assert isinstance(substituto, Substituto)
+        assert substituto.cm == -4
+        assert substituto.data_admissao == date(2026, 5, 1)
+        # Admitido na letra A, chega à E em menos de dez anos
+        assert substituto.progressoes[0].nivel.letra == "A"
+        assert substituto.obtem_nivel_para(date(2036, 5, 1)).letra == "E"
+        assert limitado.obtem_nivel_para(date(2036, 5, 1)).letra == "A"
+
+    def test_quadro_sem_vagas_abertas(self, funcionarios):
+        resultado = FluxoPessoal().projeta(funcionarios, 2025, 2030)
+        quadro = resultado.quadro.set_index("competencia")
+
+        assert len(quadro) == 72
+        assert (quadro["Ativos"] == 3).all()
+        assert quadro.loc["2026-05", "Aposentadorias"] == 1
+        assert quadro.loc["2026-05", "Admissões"] == 1
+        assert quadro["Aposentadorias"].sum() == 2
+
+    def test_defasagem_e_taxa_de_reposicao(self, funcionarios):
+        politica = PoliticaReposicao(taxa_reposicao=0.0, meses_ate_reposicao=2)
+
+        resultado = FluxoPessoal(politica).projeta(funcionarios, 2025, 2030)
+
+        assert resultado.admitidos == []
+        ativos = resultado.quadro["Ativos"]
+        # Saídas em 2026-05 e 2027-01, contadas a partir do mês seguinte
+        assert list(ativos[[0, 16, 17, 24, 25, 71]]) == [3, 3, 2, 2, 1, 1]
+
+    def test_substitutos_tambem_sao_substituidos(self):
+        funcionarios = [cria_funcionario(1, date(2025, 1, 1))]
+        politica = PoliticaReposicao(idade_ingresso=70)
+
+        resultado = FluxoPessoal(politica).projeta(funcionarios, 2025, 2040)
+
+        # Admitidos aos 70 anos, aposentam-se compulsoriamente aos 75
+        admissoes = [f.data_admissao for f in resultado.admitidos]
+        assert admissoes == [date(ano, 1, 1) for ano in range(2025, 2041, 5)]
+        assert (resultado.quadro["Ativos"] == 1).all()
+
+    def test_mesma_semente_mesmo_resultado(self, funcionarios):
+        politica = PoliticaReposicao(taxa_reposicao=0.5, proporcao_feminino=0.3)
+        funcionarios = [
+            cria_funcionario(cm, date(2025 + cm % 10, 1 + cm % 12, 1))
+            for cm in range(1, 200)
+        ]
+
+        primeiro = FluxoPessoal(politica, semente=7).projeta(funcionarios, 2025, 2035)
+        segundo = FluxoPessoal(politica, semente=7).projeta(funcionarios, 2025, 2035)
+        outro = FluxoPessoal(politica, semente=8).projeta(funcionarios, 2025, 2035)
+
+        assert primeiro.quadro.equals(segundo.quadro)
+        assert not primeiro.quadro.equals(outro.quadro)
+        assert 0 < len(primeiro.admitidos) < 199
+        assert np.all(np.diff(primeiro.quadro["Ativos"]) <= 0)
@@ -3,6 +3,7 @@ from datetime import date
 import config
 from src.classe import Classe
 from src.folha import CalculaFolha, DadosFolha
+from src.folhas import Folhas
 from src.funcionario import Funcionario, TipoPrevidencia
 from src.nivel import Nivel
 from src.tabela_salario import Tabela
@@ -26,6 +27,18 @@ class DummyFuncionario(Funcionario):
         return self.nivel
 
 
+class DummyFuncionarioMensal(Funcionario):
+    """Funcionário cujo nível muda a cada ano de competência."""
+
+    def __init__(self, cm: int, dados_folha: DadosFolha, niveis: dict[int, Nivel]):
+        self.cm = cm
+        self.dados_folha = dados_folha
+        self.niveis = niveis  # {ano: Nivel}
+
+    def obtem_nivel_para(self, competencia: date) -> Nivel:
+        return self.niveis.get(competencia.year)
+
+
 class DummyTabela(Tabela):
     def valor_do_nivel_para_classe(self, nivel: Nivel, classe: Classe, competencia: date) -> float:
         if nivel == Nivel(1, "0") and classe == Classe.E2:
@@ -323,3 +336,67 @@ class TestCalculoFolha:
         ).bhprev_complementar_patronal == round(
             (p.TETO_PREFEITO - p.TETO_INSS) * p.ALIQUOTA_PATRONAL_COMPLEMENTAR, 2
         )
+
+
+class TestCalculaFolhaLote:
+    def funcionarios(self) -> list[DummyFuncionarioMensal]:
+        niveis = {2024: Nivel(20, "B"), 2025: Nivel(22, "C"), 2026: Nivel(35, "E")}
+        return [
+            DummyFuncionarioMensal(
+                cm=1,
+                dados_folha=DadosFolha(
+                    classe=Classe.E2,
+                    data_anuenio=date(2001, 7, 31),
+                    num_ats=3,
+                    procurador=False,
+                    tipo_previdencia=TipoPrevidencia.Fufin,
+                ),
+                niveis=niveis,
+            ),
+            DummyFuncionarioMensal(
+                cm=2,
+                dados_folha=DadosFolha(
+                    classe=Classe.E3,
+                    data_anuenio=date(1995, 2, 13),
+                    num_ats=7,
+                    procurador=True,
+                    tipo_previdencia=TipoPrevidencia.BHPrev,
+                ),
+                niveis=niveis,
+            ),
+            DummyFuncionarioMensal(
+                cm=3,
+                dados_folha=DadosFolha(
+                    classe=Classe.E1,
+                    data_anuenio=date(2025, 3, 2),
+                    num_ats=0,
+                    procurador=False,
+                    tipo_previdencia=TipoPrevidencia.BHPrevComplementar,
+                ),
+                niveis={2025: Nivel(1, "A"), 2026: Nivel(30, "E")},
+            ),
+        ]
+
+    def test_lote_igual_ao_calculo_individual(self):
+        calculadora = CalculaFolha(Tabela())
+        competencias = Folhas.gerar_periodos(date(2024, 1, 1), date(2026, 12, 1))
+        funcionarios = self.funcionarios()
+
+        lote = calculadora.calcula_lote(funcionarios, competencias)
+
+        assert lote.cms == [1, 2, 3]
+        assert lote.total.shape == (len(competencias), len(funcionarios))
+        for j, funcionario in enumerate(funcionarios):
+            for i, competencia in enumerate(competencias):
+                esperado = calculadora.calcula(funcionario, competencia)
+                assert lote.folha(i, j) == esperado
+
+    def test_lote_zera_celulas_sem_folha(self):
+        calculadora = CalculaFolha(Tabela())
+        competencias = Folhas.gerar_periodos(date(2024, 1, 1), date(2024, 12, 1))
+
+        lote = calculadora.calcula_lote(self.funcionarios(), competencias)
+
+        assert not lote.ativo[:, 2].any()
+        assert (lote.total[:, 2] == 0).all()
+        assert lote.folha(0, 2) is None
@@ -1,10 +1,15 @@
 from datetime import date
 
+import numpy as np
 import pandas as pd
 
+import config
+from src.classe import Classe
 from src.folha import Folha
+from src.folhas import Folhas
 from src.folhas_efetivos import FolhasEfetivos, GastoMensalEfetivos
-from src.nivel import Nivel
+from src.funcionario import DadosFolha, TipoPrevidencia
+from src.nivel import Nivel, codifica_nivel
 from src.tabela_salario import Tabela
 
 
@@ -33,6 +38,18 @@ class DummyFuncionario:
     def obtem_nivel_para(self, competencia):
         return self.niveis.get(competencia, None)
 
+    def niveis_para(self, competencias):
+        return np.array(
+            [codifica_nivel(self.obtem_nivel_para(c)) for c in competencias],
+            dtype=np.int16,
+        )
+
+
+class DummyFuncionarioComDados(DummyFuncionario):
+    def __init__(self, cm, niveis, dados_folha: DadosFolha):
+        super().__init__(cm, niveis)
+        self.dados_folha = dados_folha
+
 
 class DummyCalculaFolha:
     def __init__(self, tabela):
@@ -69,6 +86,44 @@ class TestFolhasEfetivos:
         assert gasto.bhprev_patronal == 10
         assert gasto.bhprev_complementar_patronal == 4
 
+    def test_calculo_vetorizado_igual_ao_individual(self, monkeypatch):
+        monkeypatch.setattr(
+            config,
+            "param",
+            config.Parametros(
+                VALOR_BASE_E2=5758.83,
+                VALOR_BASE_E3=10047.80,
+                TETO_PREFEITO=34604.05,
+                TETO_PROCURADORES=41845.49,
+                TETO_INSS=8157.41,
+            ),
+        )
+        inicio = date(2024, 1, 1)
+        fim = date(2025, 12, 1)
+        competencias = Folhas.gerar_periodos(inicio, fim)
+        funcionarios = [
+            DummyFuncionarioComDados(
+                cm,
+                {c: Nivel(10 + cm + c.year - 2024, "B") for c in competencias[cm:]},
+                DadosFolha(
+                    classe=Classe.E2,
+                    data_anuenio=date(2010, cm, 15),
+                    num_ats=cm,
+                    procurador=False,
+                    tipo_previdencia=tipo,
+                ),
+            )
+            for cm, tipo in enumerate(TipoPrevidencia, start=1)
+        ]
+
+        vetorizado = FolhasEfetivos(Tabela(), vetorizado=True)
+        vetorizado.calcula_folhas(funcionarios, inicio, fim)
+        individual = FolhasEfetivos(Tabela(), vetorizado=False)
+        individual.calcula_folhas(funcionarios, inicio, fim)
+
+        assert vetorizado.servidores == individual.servidores
+        assert vetorizado.folhas == individual.folhas
+
     def test_total_por_competencia_sem_folhas(self):
         tabela = Tabela()
         folhas = FolhasEfetivos(tabela, DummyCalculaFolha)
@@ -137,6 +192,41 @@ class TestFolhasEfetivos:
         assert all(df["BHPrev Patronal"] == 0)
         assert all(df["BHPrev Complementar Patronal"] == 0)
 
+    def test_totais_atualizados_apos_adicionar_folha(self):
+        folhas = FolhasEfetivos(Tabela(), DummyCalculaFolha)
+        competencia = date(2024, 3, 1)
+        folhas.adiciona_folha(competencia, 1, DummyFolha(total=100))
+        assert folhas.total_por_competencia(competencia).total_efetivos == 100
+
+        folhas.adiciona_folha(competencia, 2, DummyFolha(total=50))
+        assert folhas.total_por_competencia(competencia).total_efetivos == 150
+
+        folhas.remove_servidor(1)
+        assert folhas.total_por_competencia(competencia).total_efetivos == 50
+
+    def test_total_mensal_no_intervalo(self):
+        folhas = FolhasEfetivos(Tabela(), DummyCalculaFolha)
+        folhas.adiciona_folha(date(2024, 12, 1), 1, DummyFolha(total=100))
+        folhas.adiciona_folha(date(2025, 1, 1), 1, DummyFolha(total=300))
+
+        df = folhas.total_mensal_no_intervalo(2024, 2025)
+
+        assert df.shape[0] == 28
+        assert list(df["ano"]) == [2024] * 14 + [2025] * 14
+        assert list(df["competencia"][11:15]) == [
+            "2024-12",
+            "2024-13o",
+            "2024-férias",
+            "2025-01",
+        ]
+        assert list(df["Total Efetivos"][11:15]) == [100, 100, 33.33, 300]
+        assert df.equals(
+            pd.concat(
+                [folhas.total_anual(2024), folhas.total_anual(2025)],
+                ignore_index=True,
+            )
+        )
+
     def test_exporta_folhas_do_funcionario(self):
 
         folhas = FolhasEfetivos(Tabela(), DummyCalculaFolha)
@@ -215,3 +305,33 @@ class TestFolhasEfetivos:
                 2,
             )
             assert row["Soma Total"] == 300
+
+    def test_calcula_metricas_com_meses_sem_folha(self):
+        folhas = FolhasEfetivos(Tabela(), DummyCalculaFolha)
+        inicio = date(2024, 1, 1)
+        fim = date(2024, 4, 1)
+        folhas.adiciona_folha(
+            date(2024, 2, 1), 1, Folha(nivel=Nivel(2, "A"), salario=900, total=100)
+        )
+        folhas.adiciona_folha(
+            date(2024, 3, 1), 1, Folha(nivel=Nivel(3, "A"), salario=950, total=200)
+        )
+        folhas.servidores.add(2)  # Servidor sem folhas no intervalo
+
+        df = folhas.calcula_metricas(inicio, fim)
+
+        assert list(df["CM"]) == [1, 2]
+        servidor = df.iloc[0]
+        assert servidor["Nível inicial"] == Nivel(2, "A")
+        assert servidor["Salário Inicial"] == 900
+        assert servidor["Valor Inicial lim. teto"] == 100
+        assert servidor["Valor Final lim. teto"] == 200
+        assert servidor["Média"] == 150
+        assert servidor["VPL (0,5%)"] == round(100 / 1.005 + 200 / 1.005**2, 2)
+        assert servidor["Soma Total"] == 300
+        sem_folha = df.iloc[1]
+        assert sem_folha["Nível inicial"] is None
+        assert sem_folha["Salário Inicial"] == 0
+        assert sem_folha["Valor Final lim. teto"] == 0
+        assert sem_folha["Média"] == 0
+        assert sem_folha["Soma Total"] == 0
@@ -2,10 +2,10 @@ from datetime import date
 
 from dateutil.relativedelta import relativedelta
 
-from src.carreira import Carreira, Progressao
+from src.carreira import Carreira, CarreiraE2, Progressao
 from src.classe import Classe
 from src.funcionario import Aposentadoria, DadosFolha, Funcionario, TipoPrevidencia
-from src.nivel import Nivel
+from src.nivel import SEM_NIVEL, Nivel, codifica_nivel
 from src.progressoes_horizontais import progressoes_horizontais
 
 
@@ -100,3 +100,41 @@ class TesteFuncionario:
     def retorna_none_se_antes_da_admissao(self):
         funcionario = self.default_funcionario()
         assert funcionario.obtem_nivel_para(date(2019, 12, 31)) is None
+
+    def test_niveis_para_igual_a_obtem_nivel_para(self):
+        competencias = [
+            date(2019, 12, 1) + relativedelta(months=i) for i in range(12 * 27)
+        ]
+
+        codigos = self.default_funcionario().niveis_para(competencias)
+
+        funcionario = self.default_funcionario()
+        esperado = [
+            codifica_nivel(funcionario.obtem_nivel_para(competencia))
+            for competencia in competencias
+        ]
+        assert codigos.tolist() == esperado
+        assert codigos[0] == SEM_NIVEL and codigos[-1] == SEM_NIVEL
+
+    def test_progressao_no_mes_vale_para_a_competencia(self):
+        funcionario = self.default_funcionario()
+        funcionario.progressoes.append(
+            Progressao(data=date(2021, 6, 20), nivel=Nivel(4, "C"))
+        )
+
+        assert funcionario.obtem_nivel_para(date(2021, 5, 1)) == Nivel(1, "A")
+        assert funcionario.obtem_nivel_para(date(2021, 6, 1)) == Nivel(4, "C")
+        assert funcionario.niveis_para([date(2021, 6, 1)]).tolist() == [
+            codifica_nivel(Nivel(4, "C"))
+        ]
+
+    def test_progride_com_carreira_real(self):
+        funcionario = self.default_funcionario()
+        funcionario.carreira = CarreiraE2()
+        progressoes_horizontais.letras_adquiridas[funcionario.cm] = "C"
+
+        assert funcionario.obtem_nivel_para(date(2021, 1, 1)) == Nivel(1, "A")
+        # Progressão especial após 2 interstícios de 9 meses: 3 níveis e letra B,
+        # a máxima do nível 4
+        assert funcionario.obtem_nivel_para(date(2022, 6, 1)) == Nivel(1, "A")
+        assert funcionario.obtem_nivel_para(date(2022, 7, 1)) == Nivel(4, "B")
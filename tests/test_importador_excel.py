@@ -1,10 +1,15 @@
 from datetime import date
 
+import numpy as np
+import openpyxl
+import pandas as pd
 import pytest
 
 from src.carreira import CarreiraE2Concurso1998eAnterior
 from src.classe import Classe
 from src.cmbh import CMBH, ImportadorProjecaoExcel
+from src.importador_excel import COLUNAS_FOLHA
+from src.folha import Folha
 from src.funcionario import TipoPrevidencia
 from src.nivel import Nivel
 
@@ -21,6 +26,38 @@ def cmbh_fixture() -> CMBH:
     ).importa("tests/exemplo_projecao_atual.xlsx")
 
 
+def importa_linha_a_linha(caminho_excel: str) -> CMBH:
+    """Importação de referência, uma aba e uma linha de cada vez (pandas), como
+    antes da importação em lote."""
+    importador = ImportadorProjecaoExcel(
+        funcao_obtem_tempos_licencas=dummy_obtem_tempos_licencas
+    )
+    cmbh = CMBH()
+    xls = pd.ExcelFile(caminho_excel)
+    for sheet_name in xls.sheet_names:
+        df = pd.read_excel(xls, sheet_name=sheet_name, header=None)
+        funcionario = importador._cria_funcionario_da_linha(df.iloc[0:2].values)
+        cmbh.funcionarios[int(sheet_name)] = funcionario
+        for _, linha in df.iloc[3:].iterrows():
+            if pd.isna(linha[4]):
+                continue
+            competencia = date(int(linha[0]), int(linha[1]), 1)
+            valores = {
+                campo: 0.0 if pd.isna(linha[coluna]) else round(float(linha[coluna]), 2)
+                for campo, coluna in COLUNAS_FOLHA.items()
+            }
+            cmbh.folhas_efetivos.adiciona_folha(
+                competencia,
+                funcionario.cm,
+                Folha(nivel=Nivel.from_string(linha[4]), **valores),
+            )
+            if not pd.isna(linha[19]):
+                cmbh.folhas_pia.adiciona_pia(
+                    competencia, funcionario.cm, round(float(linha[19]), 2)
+                )
+    return cmbh
+
+
 class TestImportadorProjecaoExcel:
 
     def test_funcionario_e2(self, cmbh_fixture: CMBH):
@@ -40,6 +77,8 @@ class TestImportadorProjecaoExcel:
         assert funcionario.aposentadoria.data_aposentadoria == date(2049, 3, 31)
         assert funcionario.aposentadoria.num_art_98_data_aposentadoria == 393
         assert funcionario.aposentadoria.aderiu_pia
+        # Nascimento em 04/04/1992: compulsória aos 75 anos
+        assert funcionario.aposentadoria.data_compulsoria == date(2067, 4, 4)
 
     def test_progressao_funcionario_com_licenca(self, cmbh_fixture: CMBH):
 
@@ -140,3 +179,38 @@ class TestImportadorProjecaoExcel:
 
         assert not cmbh.folhas_efetivos.folhas
         assert not cmbh.folhas_pia.pias
+
+    def test_importacao_em_lote_igual_a_linha_a_linha(self, tmp_path):
+        """Abas fora de ordem, linhas de folha embaralhadas e um CM repetido em
+        duas abas ("2" e "002")."""
+        original = openpyxl.load_workbook("tests/exemplo_projecao_atual.xlsx")
+        gerador = np.random.default_rng(0)
+        workbook = openpyxl.Workbook()
+        workbook.remove(workbook.active)
+        abas = [("3", "3"), ("002", "2"), ("1", "1"), ("4", "4"), ("2", "2")]
+        for titulo, origem in abas:
+            linhas = list(original[origem].iter_rows(values_only=True))
+            planilha = workbook.create_sheet(titulo)
+            for linha in linhas[:3]:
+                planilha.append(linha)
+            for i in gerador.permutation(np.arange(3, len(linhas))):
+                planilha.append(linhas[i])
+        caminho = str(tmp_path / "embaralhada.xlsx")
+        workbook.save(caminho)
+
+        lote = ImportadorProjecaoExcel(
+            funcao_obtem_tempos_licencas=dummy_obtem_tempos_licencas
+        ).importa(caminho)
+        referencia = importa_linha_a_linha(caminho)
+
+        assert list(lote.funcionarios) == list(referencia.funcionarios)
+        for cm, funcionario in referencia.funcionarios.items():
+            assert lote.funcionarios[cm].to_dict() == funcionario.to_dict()
+            assert lote.funcionarios[cm].progressoes == funcionario.progressoes
+        folhas = referencia.folhas_efetivos.folhas
+        assert set(lote.folhas_efetivos.folhas) == set(folhas)
+        for competencia in folhas:
+            assert dict(lote.folhas_efetivos.folhas[competencia]) == dict(
+                folhas[competencia]
+            )
+        assert lote.folhas_pia.pias == referencia.folhas_pia.pias
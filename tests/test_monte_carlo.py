@@ -0,0 +1,186 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import config
+from reenquadramento.avaliacoes import Avaliacoes
+from src.carreira import CarreiraE2, CarreiraE2Concurso1998eAnterior, Progressao
+from src.classe import Classe
+from src.folha import CalculaFolha
+from src.folhas_efetivos import FolhasEfetivos
+from src.funcionario import Aposentadoria, DadosFolha, Funcionario, TipoPrevidencia
+from src.monte_carlo import ParametrosMonteCarlo, SimulacaoMonteCarlo
+from src.nivel import Nivel, decodifica_nivel
+
+
+def cria_funcionario(cm: int) -> Funcionario:
+    tipos = list(TipoPrevidencia)
+    data_aposentadoria = date(2025 + cm % 4, 1 + cm % 12, 10)
+    return Funcionario(
+        cm=cm,
+        data_admissao=date(2000 + cm % 20, 1 + cm % 12, 1),
+        dados_folha=DadosFolha(
+            classe=Classe.E2,
+            data_anuenio=date(2000 + cm % 20, 1 + cm % 12, 10),
+            num_ats=cm % 5,
+            procurador=False,
+            tipo_previdencia=tipos[cm % len(tipos)],
+        ),
+        aposentadoria=Aposentadoria(
+            data_condicao_aposentadoria=data_aposentadoria,
+            data_aposentadoria=data_aposentadoria,
+            num_art_98_data_aposentadoria=0,
+            aderiu_pia=False,
+        ),
+        ultima_progressao=Progressao(
+            data=date(2023, 1 + cm % 12, 1), nivel=Nivel(1 + cm % 10, "A")
+        ),
+        carreira=CarreiraE2(),
+    )
+
+
+@pytest.fixture
+def funcionarios(monkeypatch):
+    monkeypatch.setattr(
+        config,
+        "param",
+        config.Parametros(
+            VALOR_BASE_E2=5758.83,
+            VALOR_BASE_E3=10047.80,
+            TETO_PREFEITO=34604.05,
+            TETO_PROCURADORES=41845.49,
+            TETO_INSS=8157.41,
+        ),
+    )
+    return [cria_funcionario(cm) for cm in range(1, 13)]
+
+
+class CalculaFolhaRegistrada(CalculaFolha):
+    """Guarda os níveis do último lote calculado."""
+
+    niveis = []
+
+    def calcula_lote(self, funcionarios, competencias):
+        CalculaFolhaRegistrada.niveis = [
+            [decodifica_nivel(int(codigo)) for codigo in f.niveis_para(competencias)]
+            for f in funcionarios
+        ]
+        return super().calcula_lote(funcionarios, competencias)
+
+
+def totais_deterministicos(funcionarios, ano_inicio, ano_fim) -> np.ndarray:
+    folhas = FolhasEfetivos()
+    folhas.calcula_folhas(funcionarios, date(ano_inicio, 1, 1), date(ano_fim, 12, 1))
+    return np.array(
+        [
+            list(vars(folhas.total_por_competencia(competencia)).values())
+            for competencia in folhas.calendario(
+                date(ano_inicio, 1, 1), date(ano_fim, 12, 1)
+            )
+        ]
+    )
+
+
+class TestSimulacaoMonteCarlo:
+    def test_sem_atraso_igual_a_projecao(self, funcionarios):
+        simulacao = SimulacaoMonteCarlo(funcionarios, 2025, 2028)
+
+        faixas = simulacao.simula(
+            ParametrosMonteCarlo(replicacoes=20, atraso_medio_meses=0)
+        )
+
+        assert [len(f.progressoes) for f in funcionarios] == [1] * 12
+        esperado = totais_deterministicos(funcionarios, 2025, 2028)
+        assert list(faixas) == [
+            "total_efetivos",
+            "fufin_patronal",
+            "bhprev_patronal",
+            "bhprev_complementar_patronal",
+        ]
+        for k, faixa in enumerate(faixas.values()):
+            assert list(faixa.columns) == ["P5", "P50", "P95"]
+            assert faixa.index[0] == "2025-01"
+            for coluna in faixa.columns:
+                assert faixa[coluna].to_numpy() == pytest.approx(esperado[:, k])
+
+    def test_atraso_so_aumenta_o_gasto(self, funcionarios):
+        simulacao = SimulacaoMonteCarlo(funcionarios, 2025, 2028)
+        parametros = ParametrosMonteCarlo(replicacoes=200, atraso_medio_meses=6)
+
+        gastos = simulacao.gastos(parametros, semente=1)
+        faixas = simulacao.simula(parametros, semente=1)["total_efetivos"]
+
+        esperado = totais_deterministicos(funcionarios, 2025, 2028)[:, 0]
+        assert gastos.shape == (200, 48, 4)
+        assert np.all(gastos[:, :, 0] >= esperado - 1e-6)
+        assert (faixas["P95"] > esperado + 1).any()
+        assert np.all(faixas["P5"] <= faixas["P50"])
+        assert np.all(faixas["P50"] <= faixas["P95"])
+        assert np.array_equal(gastos, simulacao.gastos(parametros, semente=1))
+        assert not np.array_equal(gastos, simulacao.gastos(parametros, semente=2))
+
+    def test_notas_baixas_reduzem_o_nivel_apos_a_migracao(self, funcionarios):
+        funcionario = cria_funcionario(12)
+        funcionario.aposentadoria.data_condicao_aposentadoria = date(2040, 1, 1)
+        funcionario.aposentadoria.data_aposentadoria = date(2040, 1, 1)
+        avaliacoes = Avaliacoes.from_dataframe(
+            pd.DataFrame({"cm": [12], "inicio": [date(2023, 1, 1)], "nota": [50.0]})
+        )
+        parametros = ParametrosMonteCarlo(replicacoes=10, atraso_medio_meses=0)
+
+        sem_notas = SimulacaoMonteCarlo(
+            [funcionario], 2025, 2028, data_migracao=date(2027, 1, 1)
+        ).simula(parametros)["total_efetivos"]
+        com_notas = SimulacaoMonteCarlo(
+            [funcionario],
+            2025,
+            2028,
+            data_migracao=date(2027, 1, 1),
+            avaliacoes=avaliacoes,
+        ).simula(parametros)["total_efetivos"]
+
+        # Sem notas registradas, todas as notas valem 70 e não há incerteza
+        assert sem_notas["P5"].equals(sem_notas["P95"])
+        # As notas sorteadas (50, a única do servidor) rebaixam o nível na migração
+        antes = sem_notas.index < "2027-01"
+        assert com_notas["P50"][antes].equals(sem_notas["P50"][antes])
+        assert np.all(com_notas["P95"][~antes] < sem_notas["P5"][~antes])
+
+    def test_atraso_limitado_pela_compulsoria(self, funcionarios):
+        funcionario = cria_funcionario(12)
+        compulsoria = date(2026, 6, 10)
+        funcionario.aposentadoria.data_condicao_aposentadoria = compulsoria
+        funcionario.aposentadoria.data_aposentadoria = compulsoria
+        funcionario.aposentadoria.data_compulsoria = compulsoria
+        simulacao = SimulacaoMonteCarlo([funcionario], 2025, 2028)
+
+        gastos = simulacao.gastos(
+            ParametrosMonteCarlo(replicacoes=50, atraso_medio_meses=60), semente=3
+        )
+
+        # Recebe até o mês da compulsória, como na projeção, e nunca depois dele
+        assert np.all(gastos[:, : 12 + 6, 0] > 0)
+        assert np.all(gastos[:, 12 + 6 :, :] == 0)
+
+    def test_deslocamento_limita_a_letra_ao_novo_nivel(self, funcionarios):
+        funcionario = cria_funcionario(12)
+        funcionario.aposentadoria.data_condicao_aposentadoria = date(2040, 1, 1)
+        funcionario.aposentadoria.data_aposentadoria = date(2040, 1, 1)
+        funcionario.carreira = CarreiraE2Concurso1998eAnterior()
+        funcionario.progressoes = [Progressao(date(2026, 6, 1), Nivel(11, "E"))]
+        simulacao = SimulacaoMonteCarlo(
+            [funcionario],
+            2026,
+            2027,
+            data_migracao=date(2027, 1, 1),
+            calcula_folha=CalculaFolhaRegistrada,
+        )
+
+        simulacao._valores_com_deslocamento(-4, np.array([0]))
+
+        niveis = CalculaFolhaRegistrada.niveis[0]
+        assert niveis[5:12] == [Nivel(11, "E")] * 7
+        # Na carreira, o nível 7 vai no máximo até a letra C
+        assert niveis[12:] == [Nivel(7, "C")] * 12
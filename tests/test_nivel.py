@@ -1,7 +1,9 @@
+import pickle
+
 import pytest
 
 from src.classe import Classe
-from src.nivel import Nivel
+from src.nivel import LETRAS, NUMERO_MAXIMO, Nivel
 
 
 class TestClasse:
@@ -82,3 +84,32 @@ class TestNivel:
         self, nivel: Nivel, passo_vert, passo_hor, nivel_anterior
     ):
         assert nivel.anterior(passo_vert, passo_hor) == nivel_anterior
+
+    def test_niveis_sao_internados(self):
+        assert Nivel(12, "C") is Nivel(12, "C")
+        assert Nivel.from_string(" 12.C ") is Nivel(12, "C")
+        assert Nivel(10, "B").proximo(2, 1) is Nivel(12, "C")
+        assert pickle.loads(pickle.dumps(Nivel(12, "C"))) is Nivel(12, "C")
+
+    def test_nivel_e_imutavel(self):
+        nivel = Nivel(12, "C")
+
+        with pytest.raises(AttributeError):
+            nivel.numero = 13
+        assert Nivel(12, "C").numero == 12
+
+    def test_hash_nao_colide(self):
+        niveis = [Nivel(numero, letra) for numero in range(1, 60) for letra in LETRAS]
+
+        assert len({hash(nivel) for nivel in niveis}) == len(niveis)
+
+    def test_niveis_acima_do_maximo(self):
+        nivel = Nivel(NUMERO_MAXIMO + 1, "A")
+
+        assert nivel == Nivel(NUMERO_MAXIMO + 1, "A")
+        assert nivel.anterior(1, 0) is Nivel(NUMERO_MAXIMO, "A")
+
+    @pytest.mark.parametrize("numero, letra", [(0, "A"), (-1, "0"), (3, "F")])
+    def test_nao_aceita_numero_ou_letra_invalidos(self, numero, letra):
+        with pytest.raises(ValueError):
+            _ = Nivel(numero, letra)
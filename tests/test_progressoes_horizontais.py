@@ -95,3 +95,61 @@ class TestProgressoesHorizontais:
             assert result == "0"
         finally:
             config.param.CONCESSAO_LETRAS = original
+
+    def test_carrega_somente_no_primeiro_uso(self, mock_banco_de_dados):
+        progressoes_horizontais = ProgressoesHorizontais(
+            banco_de_dados=mock_banco_de_dados
+        )
+        mock_banco_de_dados.assert_not_called()
+
+        progressoes_horizontais.obtem_letra_maxima(1)
+        progressoes_horizontais.obtem_letra_maxima(2)
+
+        mock_banco_de_dados.assert_called_once()
+
+    def test_carrega_de_dataframe(self, mock_banco_de_dados):
+        dados = mock_banco_de_dados.return_value.realiza_consulta_arquivo.return_value
+        mock_banco_de_dados.reset_mock()
+
+        progressoes_horizontais = ProgressoesHorizontais(
+            banco_de_dados=mock_banco_de_dados, dados=dados
+        )
+
+        assert progressoes_horizontais.letras_adquiridas == {1: "A", 2: "0", 3: "0"}
+        assert progressoes_horizontais.nivel_atual == {1: 5, 2: 10, 3: 1}
+        mock_banco_de_dados.assert_not_called()
+
+    @pytest.mark.parametrize("extensao", ["csv", "xlsx"])
+    def test_carrega_de_arquivo(self, mock_banco_de_dados, tmp_path, extensao):
+        dados = pd.DataFrame(
+            {
+                "cm": [1, 2, 3],
+                "nivel_atual": ["05", "10", None],
+                "letras_adquiridas": ["0", "BASE", None],
+            }
+        )
+        caminho = str(tmp_path / f"progressoes.{extensao}")
+        if extensao == "csv":
+            dados.to_csv(caminho, index=False)
+        else:
+            dados.to_excel(caminho, index=False)
+
+        progressoes_horizontais = ProgressoesHorizontais(
+            banco_de_dados=mock_banco_de_dados
+        )
+        progressoes_horizontais.carrega(caminho)
+
+        assert progressoes_horizontais.letras_adquiridas == {1: "0", 2: "0", 3: "0"}
+        assert progressoes_horizontais.nivel_atual == {1: 5, 2: 10, 3: 1}
+        mock_banco_de_dados.assert_not_called()
+
+    def test_atribuicao_nao_consulta_o_banco(self, mock_banco_de_dados):
+        progressoes_horizontais = ProgressoesHorizontais(
+            banco_de_dados=mock_banco_de_dados
+        )
+
+        progressoes_horizontais.letras_adquiridas = {7: "B"}
+
+        assert progressoes_horizontais.letras_adquiridas == {7: "B"}
+        assert progressoes_horizontais.nivel_atual == {}
+        mock_banco_de_dados.assert_not_called()
@@ -0,0 +1,128 @@
+from datetime import date
+
+import pytest
+from dateutil.relativedelta import relativedelta
+
+import config
+from src.carreira import Carreira, Progressao
+from src.classe import Classe
+from src.cmbh import CMBH
+from src.funcionario import Aposentadoria, DadosFolha, Funcionario, TipoPrevidencia
+from src.nivel import LETRAS, Nivel
+from src.progressoes_horizontais import progressoes_horizontais
+from src.projecao_paralela import ProjecaoParalela, _inicializa_processo
+
+
+class DummyCarreira(Carreira):
+    def progride_verticalmente_e_horizontalmente(
+        self, ultima_progressao, letra_maxima=None, data_condicao_aposentadoria=None
+    ):
+        letra = ultima_progressao.nivel.letra
+        progs_horizontais = 0 if letra in (letra_maxima, LETRAS[-1]) else 1
+        return Progressao(
+            data=ultima_progressao.data + relativedelta(years=2),
+            nivel=ultima_progressao.nivel.proximo(1, progs_horizontais),
+            progs_sem_especial=ultima_progressao.progs_sem_especial + 1,
+        )
+
+    def progride_verticalmente(self, ultima_progressao):
+        raise NotImplementedError
+
+
+def cria_funcionario(cm: int) -> Funcionario:
+    tipos = list(TipoPrevidencia)
+    return Funcionario(
+        cm=cm,
+        data_admissao=date(2010 + cm % 20, 1 + cm % 12, 1),
+        dados_folha=DadosFolha(
+            classe=Classe.E2 if cm % 2 else Classe.E3,
+            data_anuenio=date(2005 + cm % 20, 1 + cm % 12, 10),
+            num_ats=cm % 5,
+            procurador=cm % 7 == 0,
+            tipo_previdencia=tipos[cm % len(tipos)],
+        ),
+        aposentadoria=Aposentadoria(
+            data_condicao_aposentadoria=date(2026 + cm % 10, 3, 1),
+            data_aposentadoria=date(2026 + cm % 10, 1 + cm % 12, 15),
+            num_art_98_data_aposentadoria=cm % 90,
+            aderiu_pia=cm % 3 != 0,
+        ),
+        ultima_progressao=Progressao(
+            data=date(2022, 1 + cm % 12, 1), nivel=Nivel(1 + cm % 15, "A")
+        ),
+        carreira=DummyCarreira(),
+    )
+
+
+@pytest.fixture
+def parametros(monkeypatch):
+    monkeypatch.setattr(
+        config,
+        "param",
+        config.Parametros(
+            VALOR_BASE_E2=5758.83,
+            VALOR_BASE_E3=10047.80,
+            TETO_PREFEITO=34604.05,
+            TETO_PROCURADORES=41845.49,
+            TETO_INSS=8157.41,
+        ),
+    )
+    for cm in range(1, 31):
+        monkeypatch.setitem(progressoes_horizontais.letras_adquiridas, cm, "C")
+        monkeypatch.setitem(progressoes_horizontais.nivel_atual, cm, 1 + cm % 15)
+
+
+def cria_cmbh(cms) -> CMBH:
+    cmbh = CMBH()
+    cmbh.funcionarios = {cm: cria_funcionario(cm) for cm in cms}
+    return cmbh
+
+
+class TestProjecaoParalela:
+    def test_resultado_igual_ao_serial(self, parametros):
+        cms = range(1, 31)
+        serial = cria_cmbh(cms)
+        serial.calcula_projecao(2024, 2030)
+        paralelo = cria_cmbh(cms)
+        paralelo.calcula_projecao(2024, 2030, processos=2)
+
+        assert paralelo.folhas_efetivos.servidores == serial.folhas_efetivos.servidores
+        assert paralelo.folhas_efetivos.folhas == serial.folhas_efetivos.folhas
+        assert list(paralelo.folhas_efetivos.folhas) == list(
+            serial.folhas_efetivos.folhas
+        )
+        assert paralelo.folhas_pia.pias == serial.folhas_pia.pias
+        for cm in cms:
+            assert (
+                paralelo.funcionarios[cm].progressoes
+                == serial.funcionarios[cm].progressoes
+            )
+        assert paralelo.folhas_efetivos.total_anual_no_intervalo(2024, 2030).equals(
+            serial.folhas_efetivos.total_anual_no_intervalo(2024, 2030)
+        )
+
+    def test_divide_em_fatias_contiguas(self):
+        funcionarios = list(range(10))
+
+        fatias = ProjecaoParalela(processos=2, fatias_por_processo=2).divide(
+            funcionarios
+        )
+
+        assert len(fatias) == 4
+        assert [f for fatia in fatias for f in fatia] == funcionarios
+        assert ProjecaoParalela(processos=8).divide(funcionarios[:3]) == [[0], [1], [2]]
+        assert ProjecaoParalela(processos=2).divide([]) == []
+
+    def test_inicializa_processo_reproduz_estado(self, monkeypatch):
+        monkeypatch.setattr(config, "param", config.Parametros())
+        monkeypatch.setattr(progressoes_horizontais, "letras_adquiridas", {})
+        monkeypatch.setattr(progressoes_horizontais, "nivel_atual", {})
+        param = config.Parametros(
+            VALOR_BASE_E2=1.0, CONCESSAO_LETRAS=config.ConcessaoLetras.NAO_CONCEDE
+        )
+
+        _inicializa_processo(param, {7: "B"}, {7: 3})
+
+        assert config.param == param
+        assert progressoes_horizontais.obtem_letra_maxima(7) == "B"
+        assert progressoes_horizontais.nivel_atual == {7: 3}
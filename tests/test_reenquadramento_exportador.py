@@ -0,0 +1,104 @@
+from datetime import date
+
+import openpyxl
+import pytest
+
+from reenquadramento.dados_faltantes_aeros import DadosFaltantesAeros
+from reenquadramento.exportador_excel import (
+    CAMINHO_MODELO,
+    ModeloReenquadramento,
+    escreve_planilhas,
+)
+from reenquadramento.trajetoria_simulada import TrajetoriaSimulada
+from src.carreira import CarreiraE2, Progressao
+from src.classe import Classe
+from src.exportador_excel import EscritorExcelStreaming
+from src.funcionario import Aposentadoria, DadosFolha, Funcionario, TipoPrevidencia
+from src.nivel import Nivel
+
+
+@pytest.fixture
+def modelo():
+    return openpyxl.load_workbook(CAMINHO_MODELO).active
+
+
+class TestModeloReenquadramento:
+    def test_leiaute_do_modelo_com_valores(self, tmp_path, modelo):
+        caminho = str(tmp_path / "reenquadramento.xlsx")
+        planilhas = [
+            ("7", {(3, 5): date(2025, 1, 1), (5, 3): 7, (13, 2): date(2010, 1, 31)}),
+            ("12", {(5, 3): 12, (34, 3): "E2", (50, 2): "fora do modelo"}),
+        ]
+
+        escreve_planilhas(caminho, planilhas)
+
+        resultado = openpyxl.load_workbook(caminho)
+        assert resultado.sheetnames == ["7", "12"]
+        for planilha in resultado.worksheets:
+            assert planilha["B3"].value == modelo["B3"].value
+            assert planilha["A1"].font.b == modelo["A1"].font.b
+            assert planilha["B12"].border.top.style == modelo["B12"].border.top.style
+            assert set(map(str, planilha.merged_cells.ranges)) == set(
+                map(str, modelo.merged_cells.ranges)
+            )
+            assert planilha.column_dimensions["B"].width == pytest.approx(
+                modelo.column_dimensions["B"].width
+            )
+            assert planilha.row_dimensions[1].height == modelo.row_dimensions[1].height
+        # Datas mantêm o formato de data do modelo
+        assert resultado["7"]["E3"].value.date() == date(2025, 1, 1)
+        assert resultado["7"]["E3"].number_format == modelo["E3"].number_format
+        assert resultado["7"]["B13"].value.date() == date(2010, 1, 31)
+        assert resultado["12"]["C34"].value == "E2"
+        assert resultado["12"]["E3"].value is None
+        assert resultado["12"]["B50"].value == "fora do modelo"
+
+    def test_modelo_reaproveitado_em_varios_arquivos(self, tmp_path, modelo):
+        leiaute = ModeloReenquadramento()
+
+        for nome in ("a.xlsx", "b.xlsx"):
+            with EscritorExcelStreaming(str(tmp_path / nome)) as writer:
+                leiaute.escreve(writer.book, "1", {(5, 3): 1})
+
+        for nome in ("a.xlsx", "b.xlsx"):
+            planilha = openpyxl.load_workbook(tmp_path / nome)["1"]
+            assert planilha["C5"].value == 1
+            assert planilha["A1"].font.sz == modelo["A1"].font.sz
+
+    def test_cm_sem_progressoes_simuladas(self, tmp_path):
+        funcionario = Funcionario(
+            cm=3,
+            data_admissao=date(2020, 1, 1),
+            dados_folha=DadosFolha(
+                classe=Classe.E2,
+                data_anuenio=date(2020, 1, 1),
+                num_ats=0,
+                procurador=False,
+                tipo_previdencia=TipoPrevidencia.Fufin,
+            ),
+            aposentadoria=Aposentadoria(
+                data_condicao_aposentadoria=date(2050, 1, 1),
+                data_aposentadoria=date(2050, 1, 1),
+                num_art_98_data_aposentadoria=0,
+                aderiu_pia=True,
+            ),
+            ultima_progressao=Progressao(date(2024, 6, 1), Nivel(4, "B")),
+            carreira=CarreiraE2(),
+        )
+        trajetoria = TrajetoriaSimulada(
+            funcionario,
+            date(2025, 1, 1),
+            progressoes=[],
+            dados_faltantes_aeros=DadosFaltantesAeros("Ana", 0, "B"),
+        )
+        caminho = str(tmp_path / "reenquadramento.xlsx")
+
+        escreve_planilhas(caminho, [("3", trajetoria.celulas())])
+
+        # O resultado vem da última progressão registrada
+        planilha = openpyxl.load_workbook(caminho)["3"]
+        assert planilha["C35"].value == 4
+        assert planilha["C36"].value == "B"
+        assert planilha["E37"].value.date() == date(2024, 6, 1)
+        assert planilha["E38"].value is False
+        assert planilha["B13"].value is None
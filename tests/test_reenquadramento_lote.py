@@ -0,0 +1,147 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from reenquadramento.avaliacoes import Avaliacoes
+from reenquadramento.lote import (
+    DecisaoReenquadramento,
+    MotivoDecisao,
+    ProgressaoSimulada,
+    ReenquadramentoEmLote,
+)
+from src.carreira import CarreiraE2, CarreiraE3Concurso2004, Progressao
+from src.classe import Classe
+from src.funcionario import Aposentadoria, DadosFolha, Funcionario, TipoPrevidencia
+from src.nivel import Nivel
+
+
+def cria_funcionario(cm: int, progressao: Progressao, carreira=None) -> Funcionario:
+    return Funcionario(
+        cm=cm,
+        data_admissao=date(2000, 1, 1),
+        dados_folha=DadosFolha(
+            classe=Classe.E2,
+            data_anuenio=date(2000, 1, 1),
+            num_ats=0,
+            procurador=False,
+            tipo_previdencia=TipoPrevidencia.Fufin,
+        ),
+        aposentadoria=Aposentadoria(
+            data_condicao_aposentadoria=date(2040, 1, 1),
+            data_aposentadoria=date(2040, 1, 1),
+            num_art_98_data_aposentadoria=0,
+            aderiu_pia=True,
+        ),
+        ultima_progressao=progressao,
+        carreira=carreira or CarreiraE2(),
+    )
+
+
+def cria_avaliacoes(notas: dict[int, list[float]]) -> Avaliacoes:
+    linhas = [(cm, None, nota) for cm, notas_cm in notas.items() for nota in notas_cm]
+    return Avaliacoes.from_dataframe(
+        pd.DataFrame(linhas, columns=["cm", "inicio", "nota"])
+    )
+
+
+@pytest.fixture
+def funcionarios():
+    return {
+        1: cria_funcionario(1, Progressao(date(2010, 1, 31), Nivel(10, "A"))),
+        2: cria_funcionario(
+            2,
+            Progressao(date(2003, 5, 31), Nivel(3, "B")),
+            CarreiraE3Concurso2004(),
+        ),
+        3: cria_funcionario(3, Progressao(date(2012, 8, 31), Nivel(31, "C"))),
+        4: cria_funcionario(4, Progressao(date(2030, 1, 1), Nivel(5, "A"))),
+    }
+
+
+class TestReenquadramentoEmLote:
+    def test_progressoes_e_decisoes(self, funcionarios):
+        avaliacoes = cria_avaliacoes({1: [50, 65, 80]})
+
+        resultado = ReenquadramentoEmLote(funcionarios, avaliacoes).calcula(
+            date(2017, 1, 1)
+        )
+
+        assert resultado.progressoes[1] == [
+            ProgressaoSimulada(date(2010, 1, 31), Nivel(10, "A"), False, None, 50),
+            ProgressaoSimulada(date(2012, 1, 31), Nivel(10, "A"), False, 57.5, 65),
+            ProgressaoSimulada(date(2014, 1, 31), Nivel(11, "A"), False, None, 80),
+            # Média 75 com a avaliação anterior: progressão especial
+            ProgressaoSimulada(date(2016, 1, 31), Nivel(13, "A"), True, None, None),
+        ]
+        assert [d for d in resultado.decisoes if d.cm == 1] == [
+            DecisaoReenquadramento(
+                1, date(2010, 1, 31), MotivoDecisao.PROGRESSAO_NAO_CONCEDIDA, 50
+            ),
+            DecisaoReenquadramento(
+                1, date(2012, 1, 31), MotivoDecisao.SOMENTE_UMA_PROGRESSAO, 65
+            ),
+            DecisaoReenquadramento(
+                1, date(2012, 1, 31), MotivoDecisao.ESPECIAL_NAO_CONCEDIDA, 57.5
+            ),
+        ]
+        # Sem avaliação registrada, todas as notas valem 70
+        assert not [d for d in resultado.decisoes if d.cm != 1]
+        # Limite da carreira (32): sobe só um nível e não progride mais
+        assert [(p.data, p.nivel) for p in resultado.progressoes[3]] == [
+            (date(2012, 8, 31), Nivel(31, "C")),
+            (date(2015, 2, 28), Nivel(32, "C")),
+        ]
+        # Última progressão posterior à migração
+        assert resultado.progressoes[4] == []
+
+    def test_dia_ajustado_ao_fim_do_mes(self, funcionarios):
+        resultado = ReenquadramentoEmLote(funcionarios).calcula(date(2006, 1, 1))
+
+        # Progressões de 18 meses a partir de 31/05: o dia cai para 30 em novembro
+        assert [p.data for p in resultado.progressoes[2]] == [
+            date(2003, 5, 31),
+            date(2004, 11, 30),
+        ]
+        assert resultado.progressoes[2][-1].nivel == Nivel(5, "B")
+
+    def test_varias_datas_de_migracao(self, funcionarios):
+        avaliacoes = cria_avaliacoes({1: [50, 65, 80], 2: [90, 55, 60]})
+        lote = ReenquadramentoEmLote(funcionarios, avaliacoes)
+        datas = [date(2012, 2, 1), date(2017, 1, 1), date(2031, 6, 1)]
+
+        resultados = lote.calcula_datas(datas)
+
+        assert list(resultados) == datas
+        for data in datas:
+            assert resultados[data] == lote.calcula(data)
+        assert len(resultados[datas[0]].progressoes[1]) == 2
+        assert len(resultados[datas[2]].progressoes[4]) == 1
+
+    def test_trajetoria_de_data_posterior_estende_a_anterior(self, funcionarios):
+        avaliacoes = cria_avaliacoes({1: [50, 65, 80, 40], 2: [90, 55, 60]})
+        datas = [date(2031, 6, 1), date(2012, 2, 1), date(2017, 1, 1)]
+
+        resultados = ReenquadramentoEmLote(funcionarios, avaliacoes).calcula_datas(
+            datas
+        )
+
+        for cm in funcionarios:
+            curta = resultados[date(2012, 2, 1)].progressoes[cm]
+            longa = resultados[date(2017, 1, 1)].progressoes[cm]
+            assert [p.data for p in longa[: len(curta)]] == [p.data for p in curta]
+            assert [p.nivel for p in longa[: len(curta)]] == [p.nivel for p in curta]
+        # Só a última progressão de cada data perde a nota
+        assert resultados[date(2012, 2, 1)].progressoes[1][-1].nota_avaliacao is None
+        assert resultados[date(2017, 1, 1)].progressoes[1][1].nota_avaliacao == 65
+
+    def test_paralelo_igual_ao_serial(self, funcionarios):
+        avaliacoes = cria_avaliacoes({1: [50, 65, 80], 2: [90, 55, 60]})
+        datas = [date(2017, 1, 1), date(2031, 6, 1)]
+
+        serial = ReenquadramentoEmLote(funcionarios, avaliacoes).calcula_datas(datas)
+        paralelo = ReenquadramentoEmLote(
+            funcionarios, avaliacoes, processos=2
+        ).calcula_datas(datas)
+
+        assert paralelo == serial
@@ -121,3 +121,79 @@ class TestTabela:
             )
             == 1.1
         )
+
+
+class TestGradeTabela:
+    def parametros(self, **valores) -> config.Parametros:
+        return config.Parametros(
+            **{"VALOR_BASE_E2": 5758.83, "VALOR_BASE_E3": 10047.80, **valores}
+        )
+
+    def test_grade_refeita_quando_parametros_mudam(self, monkeypatch):
+        monkeypatch.setattr(config, "param", self.parametros())
+        tabela = Tabela()
+        nivel = Nivel(5, "A")
+        antes = tabela.valor_do_nivel_para_classe(nivel, Classe.E2, date.today())
+
+        monkeypatch.setattr(config, "param", self.parametros(VALOR_BASE_E2=1000.0))
+
+        depois = tabela.valor_do_nivel_para_classe(nivel, Classe.E2, date.today())
+        assert depois != antes
+        assert depois == Tabela.valor_do(nivel, 1000.0)
+
+    def test_tabela_com_parametros_proprios(self, monkeypatch):
+        monkeypatch.setattr(config, "param", self.parametros())
+        param = self.parametros(REAJUSTE_ANUAL=0.1, DATA_BASE_REAJUSTE=5)
+        tabela = Tabela(param, data_calculo=date(2024, 1, 1))
+
+        assert tabela.valor_do_nivel_para_classe(
+            Nivel(1, "0"), Classe.E3, date(2024, 4, 1)
+        ) == 10047.80
+        assert tabela.valor_do_nivel_para_classe(
+            Nivel(1, "0"), Classe.E3, date(2024, 5, 1)
+        ) == 10047.80 * 1.1
+
+    def test_valores_vetorizados_iguais_aos_individuais(self, monkeypatch):
+        monkeypatch.setattr(config, "param", self.parametros(REAJUSTE_ANUAL=0.05))
+        tabela = Tabela(data_calculo=date(2024, 3, 1))
+        competencias = [date(2024, mes, 1) for mes in range(1, 13)]
+        niveis = [Nivel(mes * 4, "C") for mes in range(1, 12)] + [None]
+
+        valores = tabela.valores_do_nivel_para_classe(niveis, Classe.E2, competencias)
+
+        assert valores.tolist() == [
+            tabela.valor_do_nivel_para_classe(nivel, Classe.E2, competencia)
+            if nivel
+            else 0.0
+            for nivel, competencia in zip(niveis, competencias)
+        ]
+        # Acima do último nível da grade, o valor é calculado diretamente
+        assert valores[-2] == Tabela.valor_do(Nivel(44, "C"), 5758.83) * 1.05
+
+    def test_valor_base_indefinido(self, monkeypatch):
+        monkeypatch.setattr(config, "param", config.Parametros())
+
+        with pytest.raises(ValueError):
+            Tabela().valor_do_nivel_para_classe(Nivel(1, "0"), Classe.E2, date.today())
+
+    def test_valor_base_indefinido_em_uma_classe(self, monkeypatch):
+        monkeypatch.setattr(config, "param", self.parametros(VALOR_BASE_E3=None))
+        tabela = Tabela()
+        competencias = [date.today()] * 2
+
+        # A classe com valor base continua disponível
+        assert tabela.valor_do_nivel_para_classe(
+            Nivel(1, "0"), Classe.E2, date.today()
+        ) == pytest.approx(5758.83)
+        # Sem níveis a consultar, não há erro
+        assert tabela.valores_do_nivel_para_classe(
+            [None, None], Classe.E3, competencias
+        ).tolist() == [0.0, 0.0]
+        with pytest.raises(ValueError, match="E3"):
+            tabela.valor_do_nivel_para_classe(Nivel(1, "0"), Classe.E3, date.today())
+        with pytest.raises(ValueError, match="E3"):
+            tabela.valores_do_nivel_para_classe(
+                [None, Nivel(2, "A")], Classe.E3, competencias
+            )
+        with pytest.raises(ValueError, match="E3"):
+            tabela.valor_do_nivel_para_classe(Nivel(50, "0"), Classe.E3, date.today())
@@ -0,0 +1,159 @@
+from datetime import date
+from unittest.mock import Mock
+
+import pandas as pd
+import pytest
+
+from reenquadramento import trajetoria_simulada
+from reenquadramento.avaliacoes import Avaliacoes, CarregadorAvaliacoes
+from reenquadramento.dados_faltantes_aeros import (
+    CarregadorDadosFaltantes,
+    DadosFaltantesAeros,
+)
+from reenquadramento.lote import ReenquadramentoEmLote
+from reenquadramento.trajetoria_simulada import (
+    CalculaReenquadramento,
+    TrajetoriasSimuladas,
+)
+from src.carreira import CarreiraE2, CarreiraE3, Progressao
+from src.classe import Classe
+from src.funcionario import Aposentadoria, DadosFolha, Funcionario, TipoPrevidencia
+from src.nivel import Nivel
+
+
+def cria_funcionario(cm: int) -> Funcionario:
+    classe = [Classe.E1, Classe.E2, Classe.E3][cm % 3]
+    dia = [1, 15, 28, 31][cm % 4]
+    return Funcionario(
+        cm=cm,
+        data_admissao=date(1995, 1, 1),
+        dados_folha=DadosFolha(
+            classe=classe,
+            data_anuenio=date(1995, 1, 1),
+            num_ats=0,
+            procurador=False,
+            tipo_previdencia=TipoPrevidencia.Fufin,
+        ),
+        aposentadoria=Aposentadoria(
+            data_condicao_aposentadoria=date(2040, 1, 1),
+            data_aposentadoria=date(2040, 1, 1),
+            num_art_98_data_aposentadoria=0,
+            aderiu_pia=True,
+        ),
+        ultima_progressao=Progressao(
+            date(1996 + cm % 25, [1, 3, 5, 7, 8, 10, 12][cm % 7], dia),
+            Nivel(1 + cm % 30, "A"),
+        ),
+        carreira=CarreiraE3() if classe == Classe.E3 else CarreiraE2(),
+    )
+
+
+@pytest.fixture
+def funcionarios():
+    return {cm: cria_funcionario(cm) for cm in range(1, 41)}
+
+
+@pytest.fixture
+def avaliacoes():
+    notas = [50, 65, 70, 80, 95, 100]
+    linhas = [
+        (cm, None, notas[(cm + i) % len(notas)])
+        for cm in range(1, 41, 2)
+        for i in range(cm % 9)
+    ]
+    return Avaliacoes.from_dataframe(
+        pd.DataFrame(linhas, columns=["cm", "inicio", "nota"])
+    )
+
+
+@pytest.fixture
+def banco_de_dados():
+    banco = Mock()
+    banco.return_value.realiza_consulta_arquivo.return_value = pd.DataFrame(
+        {
+            "cm": [1, 2],
+            "nome": ["Ana", "Bia"],
+            "qtde_dias_licenca": [10, None],
+            "letra_maxima": ["C", "BASE"],
+        }
+    )
+    return banco
+
+
+class TestTrajetoriasSimuladas:
+    def test_instancias_compartilham_dados_lidos_no_primeiro_uso(
+        self, monkeypatch, funcionarios, avaliacoes, banco_de_dados
+    ):
+        carregador_avaliacoes = CarregadorAvaliacoes()
+        carregador_avaliacoes.carrega(avaliacoes)
+        monkeypatch.setattr(
+            trajetoria_simulada, "avaliacoes_reenquadramento", carregador_avaliacoes
+        )
+        monkeypatch.setattr(
+            trajetoria_simulada,
+            "dados_faltantes_reenquadramento",
+            CarregadorDadosFaltantes(banco_de_dados),
+        )
+
+        primeira = TrajetoriasSimuladas(funcionarios, date(2025, 1, 1))
+        segunda = TrajetoriasSimuladas(funcionarios, date(2026, 1, 1))
+        assert not banco_de_dados.called
+
+        primeira.calcula()
+        segunda.calcula()
+
+        assert banco_de_dados.return_value.realiza_consulta_arquivo.call_count == 1
+        assert primeira.dados_faltantes is segunda.dados_faltantes
+        assert primeira.avaliacoes is segunda.avaliacoes is avaliacoes
+        assert primeira.trajetorias_simuladas[1].dados_faltantes_aeros == (
+            DadosFaltantesAeros("Ana", 10, "C")
+        )
+        assert primeira.trajetorias_simuladas[2].dados_faltantes_aeros == (
+            DadosFaltantesAeros("Bia", 0, "0")
+        )
+
+    def test_lote_igual_ao_calculo_por_servidor(self, funcionarios, avaliacoes):
+        datas = [date(2012, 3, 1), date(2025, 1, 1)]
+        dados_faltantes = {cm: DadosFaltantesAeros("", 0, "E") for cm in funcionarios}
+        trajetorias = TrajetoriasSimuladas(
+            funcionarios, datas[0], avaliacoes, dados_faltantes
+        )
+
+        por_data = trajetorias.calcula_datas(datas)
+
+        resumo = TrajetoriasSimuladas.resumo(por_data)
+        assert len(resumo) == len(datas) * len(funcionarios)
+        for data in datas:
+            lote = ReenquadramentoEmLote(funcionarios, avaliacoes).calcula(data)
+            decisoes = []
+            for cm, funcionario in funcionarios.items():
+                calculo = CalculaReenquadramento(
+                    funcionario, data, avaliacoes.do_cm(cm), dados_faltantes[cm]
+                )
+                assert por_data[data][cm].progressoes == calculo.calcula().progressoes
+                decisoes.extend(calculo.decisoes)
+            assert lote.decisoes == decisoes
+
+            linhas = resumo[resumo["Data de migração"] == data].set_index("CM")
+            for cm, trajetoria in por_data[data].items():
+                ultima = trajetoria.ultima_progressao()
+                assert linhas.loc[cm, "Nível"] == ultima.nivel.numero
+                assert linhas.loc[cm, "Classe"] == trajetoria.classe_final()
+        assert set(resumo["Classe"]) == {"E2", "E3"}  # E1 passa a E2
+
+
+    def test_cms_sem_dados_no_aeros_sao_listados(self, funcionarios, avaliacoes):
+        dados_faltantes = {
+            cm: DadosFaltantesAeros("", 0, "E") for cm in funcionarios if cm % 10
+        }
+        trajetorias = TrajetoriasSimuladas(
+            funcionarios, date(2025, 1, 1), avaliacoes, dados_faltantes
+        )
+
+        resumo = TrajetoriasSimuladas.resumo(
+            trajetorias.calcula_datas([date(2025, 1, 1)])
+        ).set_index("CM")
+
+        assert trajetorias.sem_dados_aeros() == [10, 20, 30, 40]
+        assert list(resumo.index[resumo["Sem dados no Aeros"]]) == [10, 20, 30, 40]
+        assert (resumo.loc[[10, 20, 30, 40], "Letra"] == "0").all()